@@ -1,104 +1,130 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+"""
+Статьи.
+
+Ответы собираются заранее в каталоге статей (app/db/article_catalog.py)
+и отдаются из памяти со строгим ETag; при совпадении If-None-Match — 304.
+Список отдаёт краткие карточки постранично, полный текст — только /articles/{id}.
+Карточка дня и отметки о прочтении — единственные обращения к БД.
+"""
+
+import random
+from datetime import datetime, timezone
 from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 import aiosqlite
 
-from app.db.database import get_db
+from app.db.article_catalog import (
+    get_article_catalog,
+    parse_cursor,
+    ARTICLES_PAGE_SIZE,
+    ARTICLES_PAGE_SIZE_MAX,
+)
+from app.db.database import get_db, get_read_db
+from app.api.auth import get_current_user
+from app.services.streaks import local_day_bounds
+from app.utils.http import cached_response
 
 router = APIRouter()
 
+# Статьи, прочитанные до начала локального дня
+DAILY_READS_QUERY = "SELECT article_id FROM article_reads WHERE user_id = ? AND read_at < ?"
 
-class ArticleResponse(BaseModel):
-    id: int
-    title: str
-    content: str
-    category: str
-
+MARK_READ_QUERY = "INSERT INTO article_reads (user_id, article_id) VALUES (?, ?) ON CONFLICT DO NOTHING"
 
-class ArticleShort(BaseModel):
-    id: int
-    title: str
-    category: str
-    content: str  # Полный контент для превью
 
-
-@router.get("", response_model=list[ArticleShort])
+@router.get("")
 async def get_articles(
+    request: Request,
     category: Optional[str] = None,
-    db: aiosqlite.Connection = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(ARTICLES_PAGE_SIZE, ge=1, le=ARTICLES_PAGE_SIZE_MAX),
 ):
-    """Получает список всех статей."""
-    if category:
-        cursor = await db.execute(
-            "SELECT id, title, category, content FROM articles WHERE category = ? ORDER BY order_index",
-            (category,)
-        )
-    else:
-        cursor = await db.execute(
-            "SELECT id, title, category, content FROM articles ORDER BY order_index"
-        )
-
-    rows = await cursor.fetchall()
-
-    return [
-        ArticleShort(
-            id=row["id"],
-            title=row["title"],
-            category=row["category"],
-            content=row["content"],
-        )
-        for row in rows
-    ]
-
-
-@router.get("/random", response_model=ArticleResponse)
-async def get_random_article(db: aiosqlite.Connection = Depends(get_db)):
+    """Список статей: id, title, category, readTime и отрывок.
+
+    Следующая страница — с cursor из nextCursor предыдущей (null — статей больше нет).
+    """
+    after = None
+    if cursor:
+        try:
+            after = parse_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    cached = get_article_catalog().page(category, after, limit)
+    return cached_response(request, cached.body, cached.etag)
+
+
+@router.get("/random")
+async def get_random_article():
     """Получает случайную статью (карточка дня)."""
-    cursor = await db.execute(
-        "SELECT * FROM articles ORDER BY RANDOM() LIMIT 1"
-    )
-    row = await cursor.fetchone()
-    
-    if not row:
+    bodies = get_article_catalog().ordered_bodies
+    if not bodies:
         raise HTTPException(status_code=404, detail="No articles found")
-    
-    return ArticleResponse(
-        id=row["id"],
-        title=row["title"],
-        content=row["content"],
-        category=row["category"],
+
+    # Каждый запрос — новая статья, кэшировать ответ нельзя
+    return Response(
+        content=random.choice(bodies).body,
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
     )
 
 
-@router.get("/categories")
-async def get_categories(db: aiosqlite.Connection = Depends(get_db)):
-    """Получает список категорий."""
-    cursor = await db.execute(
-        "SELECT DISTINCT category FROM articles"
-    )
-    rows = await cursor.fetchall()
-    
-    return [row["category"] for row in rows]
+@router.get("/daily")
+async def get_daily_article(
+    request: Request,
+    user_id: int = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_read_db)
+):
+    """Карточка дня: одна и та же статья весь локальный день пользователя.
 
+    Пропускаются статьи, прочитанные до начала дня, поэтому прочтение
+    самой карточки не меняет её до завтра.
+    """
+    cursor = await db.execute("SELECT timezone FROM users WHERE id = ?", (user_id,))
+    user_row = await cursor.fetchone()
+    day_start, day_end = local_day_bounds(user_row["timezone"] if user_row else None)
 
-@router.get("/{article_id}", response_model=ArticleResponse)
-async def get_article(
+    cursor = await db.execute(DAILY_READS_QUERY, (user_id, day_start))
+    read_ids = {row[0] for row in await cursor.fetchall()}
+
+    cached = get_article_catalog().daily(user_id, day_start, read_ids)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="No articles found")
+
+    # Ответ не меняется до конца локального дня
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    seconds_left = datetime.strptime(day_end, "%Y-%m-%d %H:%M:%S") - now
+    max_age = max(int(seconds_left.total_seconds()), 0)
+    return cached_response(request, cached.body, cached.etag, cache_control=f"private, max-age={max_age}")
+
+
+@router.post("/{article_id}/read")
+async def mark_article_read(
     article_id: int,
+    user_id: int = Depends(get_current_user),
     db: aiosqlite.Connection = Depends(get_db)
 ):
+    """Отмечает статью прочитанной (повторная отметка ничего не меняет)."""
+    if get_article_catalog().get(article_id) is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    await db.execute(MARK_READ_QUERY, (user_id, article_id))
+    await db.commit()
+    return {"ok": True}
+
+
+@router.get("/categories")
+async def get_categories(request: Request):
+    """Получает список категорий."""
+    cached = get_article_catalog().categories_body
+    return cached_response(request, cached.body, cached.etag)
+
+
+@router.get("/{article_id}")
+async def get_article(article_id: int, request: Request):
     """Получает конкретную статью."""
-    cursor = await db.execute(
-        "SELECT * FROM articles WHERE id = ?",
-        (article_id,)
-    )
-    row = await cursor.fetchone()
-    
-    if not row:
+    cached = get_article_catalog().get(article_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Article not found")
-    
-    return ArticleResponse(
-        id=row["id"],
-        title=row["title"],
-        content=row["content"],
-        category=row["category"],
-    )
+    return cached_response(request, cached.body, cached.etag)
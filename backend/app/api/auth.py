@@ -3,19 +3,24 @@ API для авторизации.
 Версия 3 — с get_current_user и /me.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import aiosqlite
-import jwt
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.utils import (
     validate_telegram_init_data,
+    InitDataError,
     create_anon_hash,
     generate_recovery_code,
-    create_jwt_token,
+    create_tokens,
+    verify_refresh_token,
+    get_current_user,
 )
 from app.config import settings
+from app.services.streaks import is_valid_timezone
+from app.services.reminder_scheduler import schedule_reminder
+from app.services.user_stats import reset_user_stats
 
 router = APIRouter()
 
@@ -29,80 +34,84 @@ class AuthResponse(BaseModel):
     user_id: int
     is_new_user: bool
     recovery_code: str | None = None
+    refresh_token: str | None = None
 
 
 class RecoveryRequest(BaseModel):
     recovery_code: str
 
 
-async def get_current_user(authorization: str = Header(None)) -> int:
-    """Извлекает user_id из JWT токена."""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header missing")
-    
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Invalid auth scheme")
-        
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
-        return user_id
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception:
-        raise HTTPException(status_code=401, detail="Authorization failed")
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+# Профиль, настройки уведомлений и серия — одной строкой (и для /bootstrap)
+ME_COLUMNS = """u.recovery_code, u.reminder_enabled, u.reminder_hour, u.reminder_minute, u.timezone,
+       p.track, p.onboarding_completed,
+       s.current_streak, s.best_streak, s.last_checkin_date"""
+
+ME_JOINS = """LEFT JOIN user_profiles p ON p.user_id = u.id
+LEFT JOIN streaks s ON s.user_id = u.id"""
+
+
+LOGIN_QUERY = "SELECT id, recovery_code, token_generation FROM users WHERE anon_hash = ?"
+
+# Восстановление по коду сразу отзывает выданные раньше refresh-токены
+RECOVER_QUERY = """
+UPDATE users SET token_generation = token_generation + 1 WHERE recovery_code = ?
+RETURNING id, token_generation
+"""
+
+TOKEN_GENERATION_QUERY = "SELECT token_generation FROM users WHERE id = ?"
+
+# Сброс прогресса: данные пользователя (эмоции — по записям, пока они есть)
+RESET_DELETE_QUERIES = (
+    "DELETE FROM checkins WHERE user_id = ?",
+    "DELETE FROM test_results WHERE user_id = ?",
+    "DELETE FROM thought_entry_emotions WHERE entry_id IN (SELECT id FROM thought_entries WHERE user_id = ?)",
+    "DELETE FROM thought_entries WHERE user_id = ?",
+    "DELETE FROM article_reads WHERE user_id = ?",
+    "DELETE FROM money_entries WHERE user_id = ?",
+)
+
+
+def format_me(user_id: int, row) -> dict:
+    """Ответ /auth/me из строки с колонками ME_COLUMNS (None — пользователя нет)."""
+    has_streak = row is not None and row["current_streak"] is not None
+    return {
+        "userId": str(user_id),
+        "track": row["track"] if row else None,
+        "onboardingCompleted": bool(row["onboarding_completed"]) if row else False,
+        "recoveryCode": row["recovery_code"] if row else None,
+        "reminderEnabled": bool(row["reminder_enabled"]) if row else True,
+        "reminderHour": row["reminder_hour"] if row else 20,
+        "reminderMinute": (row["reminder_minute"] or 0) if row else 0,
+        "timezone": row["timezone"] if row else None,
+        "streak": {
+            "current": row["current_streak"],
+            "best": row["best_streak"],
+            "lastCheckinDate": row["last_checkin_date"],
+        } if has_streak else {"current": 0, "best": 0, "lastCheckinDate": None},
+    }
 
 
 @router.get("/me")
 async def get_me(
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
     """Получить данные текущего пользователя."""
-    # Профиль
     cursor = await db.execute(
-        "SELECT track, onboarding_completed FROM user_profiles WHERE user_id = ?",
+        f"SELECT {ME_COLUMNS} FROM users u {ME_JOINS} WHERE u.id = ?",
         (user_id,)
     )
-    profile_row = await cursor.fetchone()
-
-    # User data с настройками уведомлений
-    cursor = await db.execute(
-        "SELECT recovery_code, reminder_enabled, reminder_hour FROM users WHERE id = ?",
-        (user_id,)
-    )
-    user_row = await cursor.fetchone()
-
-    # Streak
-    cursor = await db.execute(
-        "SELECT current_streak, best_streak, last_checkin_date FROM streaks WHERE user_id = ?",
-        (user_id,)
-    )
-    streak_row = await cursor.fetchone()
-
-    return {
-        "userId": str(user_id),
-        "track": profile_row["track"] if profile_row else None,
-        "onboardingCompleted": bool(profile_row["onboarding_completed"]) if profile_row else False,
-        "recoveryCode": user_row["recovery_code"] if user_row else None,
-        "reminderEnabled": bool(user_row["reminder_enabled"]) if user_row else True,
-        "reminderHour": user_row["reminder_hour"] if user_row else 20,
-        "streak": {
-            "current": streak_row["current_streak"] if streak_row else 0,
-            "best": streak_row["best_streak"] if streak_row else 0,
-            "lastCheckinDate": streak_row["last_checkin_date"] if streak_row else None,
-        } if streak_row else {"current": 0, "best": 0, "lastCheckinDate": None},
-    }
+    return format_me(user_id, await cursor.fetchone())
 
 
 class ReminderSettingsRequest(BaseModel):
     enabled: bool
-    hour: int  # 0-23
+    hour: int  # 0-23, по времени пользователя
+    minute: int = 0  # 0-59
 
 
 @router.put("/reminders")
@@ -114,14 +123,41 @@ async def update_reminder_settings(
     """Обновить настройки уведомлений."""
     if not 0 <= request.hour <= 23:
         raise HTTPException(status_code=400, detail="Hour must be 0-23")
+    if not 0 <= request.minute <= 59:
+        raise HTTPException(status_code=400, detail="Minute must be 0-59")
+
+    await db.execute(
+        "UPDATE users SET reminder_enabled = ?, reminder_hour = ?, reminder_minute = ? WHERE id = ?",
+        (request.enabled, request.hour, request.minute, user_id)
+    )
+    await schedule_reminder(db, user_id)
+    await db.commit()
+
+    return {"ok": True, "enabled": request.enabled, "hour": request.hour, "minute": request.minute}
+
+
+class TimezoneRequest(BaseModel):
+    timezone: str  # IANA, например "Europe/Moscow"
+
+
+@router.put("/timezone")
+async def update_timezone(
+    request: TimezoneRequest,
+    user_id: int = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db)
+):
+    """Обновить часовой пояс пользователя (границы дня для серий и чек-инов)."""
+    if not is_valid_timezone(request.timezone):
+        raise HTTPException(status_code=400, detail="Unknown timezone")
 
     await db.execute(
-        "UPDATE users SET reminder_enabled = ?, reminder_hour = ? WHERE id = ?",
-        (request.enabled, request.hour, user_id)
+        "UPDATE users SET timezone = ? WHERE id = ?",
+        (request.timezone, user_id)
     )
+    await schedule_reminder(db, user_id)
     await db.commit()
 
-    return {"ok": True, "enabled": request.enabled, "hour": request.hour}
+    return {"ok": True, "timezone": request.timezone}
 
 
 @router.post("/verify", response_model=AuthResponse)
@@ -130,32 +166,33 @@ async def verify_auth(request: AuthRequest, db: aiosqlite.Connection = Depends(g
     if settings.DEBUG and request.init_data == "debug":
         telegram_id = 12345678
     else:
-        user = validate_telegram_init_data(request.init_data)
-        if not user:
-            raise HTTPException(status_code=401, detail="Invalid init_data")
+        try:
+            user = validate_telegram_init_data(request.init_data)
+        except InitDataError as e:
+            raise HTTPException(status_code=401, detail=str(e))
         telegram_id = user.id
 
     anon_hash = create_anon_hash(telegram_id)
 
-    cursor = await db.execute(
-        "SELECT id, recovery_code FROM users WHERE anon_hash = ?",
-        (anon_hash,)
-    )
+    cursor = await db.execute(LOGIN_QUERY, (anon_hash,))
     row = await cursor.fetchone()
 
     if row:
         user_id = row["id"]
         # Обновляем telegram_id (может измениться при восстановлении)
-        await db.execute(
-            "UPDATE users SET telegram_id = ? WHERE id = ?",
-            (telegram_id, user_id)
+        cursor = await db.execute(
+            "UPDATE users SET telegram_id = ? WHERE id = ? AND telegram_id IS NOT ?",
+            (telegram_id, user_id, telegram_id)
         )
+        if cursor.rowcount:
+            await schedule_reminder(db, user_id)
         await db.commit()
-        token = create_jwt_token(user_id)
+        token, refresh_token = create_tokens(user_id, row["token_generation"] or 0)
         return AuthResponse(
             token=token,
             user_id=user_id,
             is_new_user=False,
+            refresh_token=refresh_token,
         )
 
     # Новый пользователь
@@ -184,15 +221,17 @@ async def verify_auth(request: AuthRequest, db: aiosqlite.Connection = Depends(g
         "INSERT OR IGNORE INTO money_settings (user_id) VALUES (?)",
         (user_id,)
     )
-    
+
+    await schedule_reminder(db, user_id)
     await db.commit()
 
-    token = create_jwt_token(user_id)
+    token, refresh_token = create_tokens(user_id)
     return AuthResponse(
         token=token,
         user_id=user_id,
         is_new_user=True,
         recovery_code=recovery_code,
+        refresh_token=refresh_token,
     )
 
 
@@ -201,23 +240,52 @@ async def recover_account(
     request: RecoveryRequest,
     db: aiosqlite.Connection = Depends(get_db)
 ):
-    """Восстановление аккаунта по recovery code."""
-    cursor = await db.execute(
-        "SELECT id FROM users WHERE recovery_code = ?",
-        (request.recovery_code.upper(),)
-    )
-    row = await cursor.fetchone()
+    """Восстановление аккаунта по recovery code.
 
-    if not row:
+    Refresh-токены, выданные до восстановления, перестают действовать.
+    """
+    rows = await db.execute_fetchall(RECOVER_QUERY, (request.recovery_code.upper(),))
+    if not rows:
         raise HTTPException(status_code=404, detail="Invalid recovery code")
+    await db.commit()
 
-    user_id = row["id"]
-    token = create_jwt_token(user_id)
+    user_id = rows[0]["id"]
+    token, refresh_token = create_tokens(user_id, rows[0]["token_generation"])
 
     return AuthResponse(
         token=token,
         user_id=user_id,
         is_new_user=False,
+        refresh_token=refresh_token,
+    )
+
+
+@router.post("/refresh", response_model=AuthResponse)
+async def refresh_tokens(
+    request: RefreshRequest,
+    db: aiosqlite.Connection = Depends(get_read_db)
+):
+    """Новая пара токенов по refresh-токену.
+
+    Токен отклоняется, если после его выдачи был сброс прогресса
+    или восстановление аккаунта (поколение токенов изменилось).
+    """
+    verified = verify_refresh_token(request.refresh_token)
+    if not verified:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    user_id, generation = verified
+
+    cursor = await db.execute(TOKEN_GENERATION_QUERY, (user_id,))
+    row = await cursor.fetchone()
+    if not row or (row["token_generation"] or 0) != generation:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    token, refresh_token = create_tokens(user_id, generation)
+    return AuthResponse(
+        token=token,
+        user_id=user_id,
+        is_new_user=False,
+        refresh_token=refresh_token,
     )
 
 
@@ -226,24 +294,27 @@ async def reset_progress(
     user_id: int = Depends(get_current_user),
     db: aiosqlite.Connection = Depends(get_db)
 ):
-    """Полный сброс прогресса пользователя."""
+    """Полный сброс прогресса пользователя.
+
+    Выданные раньше refresh-токены перестают действовать.
+    """
+    await db.execute(
+        "UPDATE users SET token_generation = token_generation + 1 WHERE id = ?",
+        (user_id,)
+    )
+
     # Сбрасываем streak
     await db.execute(
         "UPDATE streaks SET current_streak = 0, best_streak = 0, last_checkin_date = NULL WHERE user_id = ?",
         (user_id,)
     )
 
-    # Удаляем чек-ины
-    await db.execute("DELETE FROM checkins WHERE user_id = ?", (user_id,))
-
-    # Удаляем результаты тестов
-    await db.execute("DELETE FROM test_results WHERE user_id = ?", (user_id,))
-
-    # Удаляем записи дневника
-    await db.execute("DELETE FROM thought_entries WHERE user_id = ?", (user_id,))
+    # Удаляем чек-ины, результаты тестов, дневник, прочтения и историю денег
+    for query in RESET_DELETE_QUERIES:
+        await db.execute(query, (user_id,))
 
-    # Удаляем историю денег
-    await db.execute("DELETE FROM money_history WHERE user_id = ?", (user_id,))
+    # Сводка по удалённым записям
+    await reset_user_stats(db, user_id)
 
     # Сбрасываем профиль (онбординг заново)
     await db.execute(
@@ -0,0 +1,99 @@
+"""
+Данные главного экрана одним запросом.
+
+GET /bootstrap заменяет пачку запросов при открытии приложения
+(/auth/me, /checkins/today, /money/settings, /money/stats, /diary/stats,
+/tests/profile, /tests/next): одно соединение, одна проверка токена.
+Профиль, серия, деньги, последний чек-ин и счётчики (user_stats)
+читаются одной строкой, история тестов — вторым запросом и только после онбординга.
+Поля ответа совпадают с ответами отдельных эндпоинтов.
+"""
+
+from fastapi import APIRouter, Depends
+import aiosqlite
+
+from app.db.database import get_read_db
+from app.api.auth import get_current_user, format_me, ME_COLUMNS, ME_JOINS
+from app.api.checkins import format_today
+from app.api.money import format_money_settings, format_money_stats
+from app.api.tests import format_test_profile
+from app.services.streaks import local_day_bounds
+from app.services.test_engine import TestEngine
+
+router = APIRouter()
+
+# Последний чек-ин пользователя; он сегодняшний, если попадает в границы
+# текущего дня — отдельный запрос с границами дня не нужен
+BOOTSTRAP_QUERY = f"""
+SELECT {ME_COLUMNS},
+       p.onboarding_day, p.risk_level,
+       m.enabled, m.average_amount, m.show_saved, m.track_losses,
+       c.id, c.urge, c.stress, c.mood, c.relapse, c.note, c.loss_amount, c.created_at,
+       COALESCE(us.loss_total, 0) AS lost_total,
+       COALESCE(us.loss_count, 0) AS loss_count,
+       COALESCE(us.diary_count, 0) AS diary_total
+FROM users u
+{ME_JOINS}
+LEFT JOIN money_settings m ON m.user_id = u.id
+LEFT JOIN user_stats us ON us.user_id = u.id
+LEFT JOIN checkins c ON c.id = (
+    SELECT id FROM checkins WHERE user_id = u.id
+    ORDER BY created_at DESC LIMIT 1
+)
+WHERE u.id = ?
+"""
+
+
+@router.get("")
+async def get_bootstrap(
+    user_id: int = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_read_db)
+):
+    """Всё, что нужно главному экрану при открытии приложения."""
+    cursor = await db.execute(BOOTSTRAP_QUERY, (user_id,))
+    row = await cursor.fetchone()
+
+    me = format_me(user_id, row)
+    if row is None:
+        return {
+            "me": me,
+            "today": format_today(None),
+            "moneySettings": format_money_settings(None),
+            "money": format_money_stats(0, 0, 0, 0),
+            "diary": {"totalEntries": 0},
+            "testProfile": format_test_profile(None),
+            "nextTest": None,
+        }
+
+    day_start, _ = local_day_bounds(row["timezone"])
+    last_checkin = row["created_at"]
+    has_today = last_checkin is not None and last_checkin >= day_start
+
+    if row["onboarding_day"] is not None:
+        profile = {
+            "onboarding_completed": row["onboarding_completed"],
+            "onboarding_day": row["onboarding_day"],
+            "track": row["track"],
+            "risk_level": row["risk_level"],
+        }
+    else:
+        profile = None
+
+    # Без профиля /tests/next начинает онбординг с первого дня
+    hint_profile = profile or {"onboarding_completed": False, "onboarding_day": 1}
+    next_test = await TestEngine(db).get_test_hint(user_id, hint_profile, last_checkin)
+
+    return {
+        "me": me,
+        "today": format_today(row if has_today else None),
+        "moneySettings": format_money_settings(row if row["enabled"] is not None else None),
+        "money": format_money_stats(
+            row["average_amount"] or 0,
+            me["streak"]["current"],
+            row["lost_total"],
+            row["loss_count"],
+        ),
+        "diary": {"totalEntries": row["diary_total"]},
+        "testProfile": format_test_profile(profile),
+        "nextTest": next_test,
+    }
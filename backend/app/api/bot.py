@@ -0,0 +1,53 @@
+"""
+Webhook Telegram-бота.
+
+Ответ Telegram уходит сразу: проверка секрета, отсев повторов update_id
+и постановка в очередь. Команды обрабатывает app.services.bot.
+"""
+
+import hmac
+import json
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.config import settings
+from app.services.bot import seen_updates, submit_update
+
+router = APIRouter()
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+# Готовый ответ, чтобы не сериализовать его на каждый запрос
+OK_RESPONSE = b'{"ok":true}'
+
+
+def _ok() -> Response:
+    return Response(content=OK_RESPONSE, media_type="application/json")
+
+
+@router.post("/webhook")
+async def telegram_webhook(request: Request):
+    """Принимает обновление от Telegram и сразу подтверждает его."""
+    if settings.BOT_WEBHOOK_SECRET:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, settings.BOT_WEBHOOK_SECRET):
+            raise HTTPException(status_code=403, detail="Invalid secret token")
+
+    try:
+        update = json.loads(await request.body())
+    except ValueError:
+        # Повтор не поможет — подтверждаем, чтобы Telegram не слал его снова
+        return _ok()
+    if not isinstance(update, dict):
+        return _ok()
+
+    update_id = update.get("update_id")
+    if update_id is not None and not seen_updates.add(update_id):
+        return _ok()
+
+    if not submit_update(update):
+        if update_id is not None:
+            seen_updates.discard(update_id)
+        raise HTTPException(status_code=503, detail="Bot queue is full")
+
+    return _ok()
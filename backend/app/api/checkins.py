@@ -3,17 +3,47 @@ API для чек-инов.
 Версия 3 — с поддержкой суммы потерь при срыве.
 """
 
-from datetime import date
+from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 import aiosqlite
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.api.auth import get_current_user
+from app.services.user_stats import record_money_entry
+from app.services.streaks import (
+    apply_checkin,
+    load_streak_state,
+    save_streak,
+    local_day_bounds,
+)
 
 router = APIRouter()
 
+# Уже синхронизированные чек-ины из пачки ({placeholders} — по числу clientId)
+CHECKINS_BY_CLIENT_ID_QUERY = """
+SELECT client_id, id, created_at FROM checkins
+WHERE user_id = ? AND client_id IN ({placeholders})
+"""
+
+CHECKINS_LIST_QUERY = """
+SELECT id, user_id, urge, stress, mood, relapse, note, loss_amount, created_at
+FROM checkins
+WHERE user_id = ?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+
+# Последний чек-ин в границах локального дня
+CHECKINS_TODAY_QUERY = """
+SELECT id, urge, stress, mood, relapse, note, loss_amount, created_at
+FROM checkins
+WHERE user_id = ? AND created_at >= ? AND created_at < ?
+ORDER BY created_at DESC
+LIMIT 1
+"""
+
 
 class CheckInCreate(BaseModel):
     urge: int = Field(..., ge=0, le=10, description="Уровень тяги (0-10)")
@@ -24,6 +54,15 @@ class CheckInCreate(BaseModel):
     lossAmount: Optional[int] = Field(default=None, description="Сумма потерь при срыве")
 
 
+class CheckInBatchItem(CheckInCreate):
+    clientId: str = Field(..., min_length=1, max_length=64, description="Ключ идемпотентности")
+    createdAt: Optional[datetime] = Field(default=None, description="Время чек-ина на клиенте")
+
+
+class CheckInBatch(BaseModel):
+    items: List[CheckInBatchItem] = Field(..., min_length=1, max_length=100)
+
+
 class CheckInResponse(BaseModel):
     id: int
     urge: int
@@ -38,109 +77,161 @@ class CheckInResponse(BaseModel):
     previousStreak: int = 0
 
 
+def _client_timestamp(value: Optional[datetime], now: datetime) -> str:
+    """Приводит время с клиента к UTC в формате CURRENT_TIMESTAMP (не позже now)."""
+    if value is None:
+        value = now
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(value, now).strftime("%Y-%m-%d %H:%M:%S")
+
+
 @router.post("")
 async def create_checkin(
     checkin: CheckInCreate,
     user_id: int = Depends(get_current_user),
     db: aiosqlite.Connection = Depends(get_db)
 ):
-    """Создаёт новый чек-ин и обновляет streak."""
-    
-    # Сохраняем предыдущую серию (для показа после срыва)
-    cursor = await db.execute(
-        "SELECT current_streak FROM streaks WHERE user_id = ?",
-        (user_id,)
-    )
-    row = await cursor.fetchone()
-    previous_streak = row[0] if row else 0
-    
-    # Создаём чек-ин
-    cursor = await db.execute(
-        """
-        INSERT INTO checkins (user_id, urge, stress, mood, relapse, note, loss_amount)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (user_id, checkin.urge, checkin.stress, checkin.mood, 
-         checkin.relapse, checkin.note, checkin.lossAmount)
-    )
-    await db.commit()
-    checkin_id = cursor.lastrowid
-    
-    # Записываем потерю в money_entries если есть
-    if checkin.relapse and checkin.lossAmount and checkin.lossAmount > 0:
-        await db.execute(
-            "INSERT INTO money_entries (user_id, amount, entry_type) VALUES (?, ?, 'loss')",
-            (user_id, checkin.lossAmount)
-        )
-        await db.commit()
-    
-    # Обновляем streak
-    today = date.today().isoformat()
-    
-    cursor = await db.execute(
-        "SELECT current_streak, best_streak, last_checkin_date FROM streaks WHERE user_id = ?",
-        (user_id,)
-    )
-    streak_row = await cursor.fetchone()
-    
-    streak_updated = False
-    new_streak = 0
-    
-    if streak_row:
-        current_streak = streak_row[0]
-        best_streak = streak_row[1]
-        last_date = streak_row[2]
-        
-        if checkin.relapse:
-            # Срыв — сбрасываем streak
-            new_streak = 0
-        elif last_date == today:
-            # Уже был чек-ин сегодня
-            new_streak = current_streak
-        else:
-            # Новый день без срыва
-            new_streak = current_streak + 1
-        
-        new_best = max(best_streak, new_streak)
-        
-        await db.execute(
-            """UPDATE streaks 
-               SET current_streak = ?, best_streak = ?, last_checkin_date = ?
-               WHERE user_id = ?""",
-            (new_streak, new_best, today, user_id)
+    """Создаёт новый чек-ин и обновляет streak одной транзакцией."""
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        # Предыдущая серия (для показа после срыва)
+        streak, tz_name = await load_streak_state(db, user_id)
+        previous_streak = streak["current_streak"] if streak else 0
+
+        # Создаём чек-ин
+        rows = await db.execute_fetchall(
+            """
+            INSERT INTO checkins (user_id, urge, stress, mood, relapse, note, loss_amount)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            RETURNING id, urge, stress, mood, relapse, note, loss_amount, created_at
+            """,
+            (user_id, checkin.urge, checkin.stress, checkin.mood,
+             checkin.relapse, checkin.note, checkin.lossAmount)
         )
+        row = rows[0]
+
+        # Записываем потерю в money_entries если есть
+        if checkin.relapse and checkin.lossAmount and checkin.lossAmount > 0:
+            await db.execute(
+                "INSERT INTO money_entries (user_id, amount, entry_type) VALUES (?, ?, 'loss')",
+                (user_id, checkin.lossAmount)
+            )
+            await record_money_entry(db, user_id, checkin.lossAmount, "loss")
+
+        # Обновляем streak (день — по часовому поясу пользователя)
+        streak = await apply_checkin(db, user_id, streak, checkin.relapse, row["created_at"], tz_name)
+        await save_streak(db, user_id, streak)
+
         await db.commit()
-        streak_updated = True
-    else:
-        # Создаём запись streak если нет
-        new_streak = 0 if checkin.relapse else 1
-        await db.execute(
-            """INSERT INTO streaks (user_id, current_streak, best_streak, last_checkin_date)
-               VALUES (?, ?, ?, ?)""",
-            (user_id, new_streak, new_streak, today)
+    except Exception:
+        await db.rollback()
+        raise
+
+    return {
+        "id": row["id"],
+        "urge": row["urge"],
+        "stress": row["stress"],
+        "mood": row["mood"],
+        "relapse": bool(row["relapse"]),
+        "note": row["note"],
+        "lossAmount": row["loss_amount"],
+        "date": row["created_at"],
+        "streakUpdated": True,
+        "newStreak": streak["current_streak"],
+        "previousStreak": previous_streak,
+    }
+
+
+@router.post("/batch")
+async def create_checkins_batch(
+    batch: CheckInBatch,
+    user_id: int = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db)
+):
+    """Синхронизирует очередь офлайн-чек-инов одной транзакцией.
+
+    Элементы применяются по порядку; повторно присланные clientId
+    не создают дублей и возвращаются со статусом duplicate.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    client_ids = [item.clientId for item in batch.items]
+
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        streak, tz_name = await load_streak_state(db, user_id)
+        previous_streak = streak["current_streak"] if streak else 0
+
+        # Уже синхронизированные ранее чек-ины
+        placeholders = ",".join("?" for _ in client_ids)
+        cursor = await db.execute(
+            CHECKINS_BY_CLIENT_ID_QUERY.format(placeholders=placeholders),
+            [user_id] + client_ids
         )
+        known = {row["client_id"]: row for row in await cursor.fetchall()}
+
+        results = []
+        streak_changed = False
+        for item in batch.items:
+            existing = known.get(item.clientId)
+            if existing:
+                results.append({
+                    "clientId": item.clientId,
+                    "status": "duplicate",
+                    "id": existing["id"],
+                    "date": existing["created_at"],
+                })
+                continue
+
+            created_at = _client_timestamp(item.createdAt, now)
+            rows = await db.execute_fetchall(
+                """
+                INSERT INTO checkins
+                    (user_id, urge, stress, mood, relapse, note, loss_amount, client_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                RETURNING id, created_at
+                """,
+                (user_id, item.urge, item.stress, item.mood, item.relapse,
+                 item.note, item.lossAmount, item.clientId, created_at)
+            )
+            row = rows[0]
+            known[item.clientId] = row
+
+            if item.relapse and item.lossAmount and item.lossAmount > 0:
+                await db.execute(
+                    """INSERT INTO money_entries (user_id, amount, entry_type, created_at)
+                       VALUES (?, ?, 'loss', ?)""",
+                    (user_id, item.lossAmount, created_at)
+                )
+                await record_money_entry(db, user_id, item.lossAmount, "loss")
+
+            # Серию пересчитываем в памяти и пишем один раз в конце
+            streak = await apply_checkin(db, user_id, streak, item.relapse, row["created_at"], tz_name)
+            streak_changed = True
+
+            results.append({
+                "clientId": item.clientId,
+                "status": "created",
+                "id": row["id"],
+                "date": row["created_at"],
+            })
+
+        if streak_changed:
+            await save_streak(db, user_id, streak)
+
         await db.commit()
-        streak_updated = True
-    
-    # Получаем созданный чек-ин
-    cursor = await db.execute(
-        "SELECT * FROM checkins WHERE id = ?",
-        (checkin_id,)
-    )
-    row = await cursor.fetchone()
-    
+    except Exception:
+        await db.rollback()
+        raise
+
     return {
-        "id": row[0],
-        "urge": row[2],
-        "stress": row[3],
-        "mood": row[4],
-        "relapse": bool(row[5]),
-        "note": row[6],
-        "lossAmount": row[7] if len(row) > 7 else None,
-        "date": row[8] if len(row) > 8 else row[7],  # created_at
-        "streakUpdated": streak_updated,
-        "newStreak": new_streak,
+        "results": results,
         "previousStreak": previous_streak,
+        "streak": {
+            "current": streak["current_streak"] if streak else 0,
+            "best": streak["best_streak"] if streak else 0,
+            "lastCheckinDate": streak["last_checkin_date"] if streak else None,
+        },
     }
 
 
@@ -148,17 +239,10 @@ async def create_checkin(
 async def get_checkins(
     limit: int = 30,
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
     """Получает историю чек-инов пользователя."""
-    cursor = await db.execute(
-        """SELECT id, user_id, urge, stress, mood, relapse, note, loss_amount, created_at
-           FROM checkins 
-           WHERE user_id = ? 
-           ORDER BY created_at DESC 
-           LIMIT ?""",
-        (user_id, limit)
-    )
+    cursor = await db.execute(CHECKINS_LIST_QUERY, (user_id, limit))
     rows = await cursor.fetchall()
     
     return [
@@ -179,33 +263,31 @@ async def get_checkins(
 @router.get("/today")
 async def get_today_checkin(
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
-    """Проверяет был ли чек-ин сегодня."""
-    today = date.today().isoformat()
-    
-    cursor = await db.execute(
-        """SELECT id, urge, stress, mood, relapse, note, loss_amount, created_at
-           FROM checkins 
-           WHERE user_id = ? AND date(created_at) = ?
-           ORDER BY created_at DESC
-           LIMIT 1""",
-        (user_id, today)
-    )
-    row = await cursor.fetchone()
-    
+    """Проверяет был ли чек-ин сегодня (по часовому поясу пользователя)."""
+    cursor = await db.execute("SELECT timezone FROM users WHERE id = ?", (user_id,))
+    user_row = await cursor.fetchone()
+    day_start, day_end = local_day_bounds(user_row["timezone"] if user_row else None)
+
+    cursor = await db.execute(CHECKINS_TODAY_QUERY, (user_id, day_start, day_end))
+    return format_today(await cursor.fetchone())
+
+
+def format_today(row) -> dict:
+    """Ответ /checkins/today из строки чек-ина (None — чек-ина сегодня не было)."""
     if row:
         return {
             "hasCheckin": True,
             "checkin": {
-                "id": str(row[0]),
-                "urge": row[1],
-                "stress": row[2],
-                "mood": row[3],
-                "relapse": bool(row[4]),
-                "note": row[5],
-                "lossAmount": row[6],
-                "date": row[7],
+                "id": str(row["id"]),
+                "urge": row["urge"],
+                "stress": row["stress"],
+                "mood": row["mood"],
+                "relapse": bool(row["relapse"]),
+                "note": row["note"],
+                "lossAmount": row["loss_amount"],
+                "date": row["created_at"],
             }
         }
     
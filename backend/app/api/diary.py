@@ -2,16 +2,74 @@
 API для дневника мыслей (КПТ).
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, List
 import json
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.api.auth import get_current_user
+from app.services.user_stats import parse_emotions, record_diary_entry, top_emotions
 
 router = APIRouter()
 
+# Сколько эмоций показывать в аналитике
+ANALYTICS_TOP_EMOTIONS = 10
+
+DIARY_LIST_QUERY = """
+SELECT id, situation, thought, emotions_json, emotion_intensity,
+       reaction, created_at
+FROM thought_entries
+WHERE user_id = ?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+
+DIARY_DELETE_QUERY = "DELETE FROM thought_entries WHERE id = ? AND user_id = ? RETURNING emotions_json"
+
+DIARY_DELETE_EMOTIONS_QUERY = "DELETE FROM thought_entry_emotions WHERE entry_id = ?"
+
+DIARY_STATS_QUERY = "SELECT diary_count, emotion_counts_json FROM user_stats WHERE user_id = ?"
+
+# Частые эмоции со средней интенсивностью записей, где они отмечены
+ANALYTICS_TOP_QUERY = """
+SELECT t.emotion, COUNT(*) AS count, ROUND(AVG(e.emotion_intensity), 1)
+FROM thought_entries e
+JOIN thought_entry_emotions t ON t.entry_id = e.id
+WHERE e.user_id = ? AND e.created_at >= ?
+GROUP BY t.emotion
+ORDER BY count DESC, t.emotion
+LIMIT ?
+"""
+
+# Эмоции по неделям (неделя начинается с понедельника, UTC)
+ANALYTICS_WEEKLY_QUERY = """
+SELECT date(e.created_at, '-6 days', 'weekday 1') AS week, t.emotion, COUNT(*)
+FROM thought_entries e
+JOIN thought_entry_emotions t ON t.entry_id = e.id
+WHERE e.user_id = ? AND e.created_at >= ?
+GROUP BY week, t.emotion
+ORDER BY week
+"""
+
+# Распределение интенсивности (1-10)
+ANALYTICS_INTENSITY_QUERY = """
+SELECT emotion_intensity, COUNT(*)
+FROM thought_entries
+WHERE user_id = ? AND created_at >= ? AND emotion_intensity IS NOT NULL
+GROUP BY emotion_intensity
+ORDER BY emotion_intensity
+"""
+
+
+async def save_entry_emotions(db, entry_id: int, user_id: int, emotions: List[str]):
+    """Пишет эмоции записи в thought_entry_emotions (без commit)."""
+    await db.executemany(
+        "INSERT INTO thought_entry_emotions (entry_id, user_id, emotion) VALUES (?, ?, ?)",
+        [(entry_id, user_id, emotion) for emotion in emotions]
+    )
+
 
 class ThoughtEntryCreate(BaseModel):
     situation: str
@@ -35,18 +93,10 @@ class ThoughtEntryResponse(BaseModel):
 async def get_thought_entries(
     limit: int = 50,
     user_id: int = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Получить записи дневника (схема СМЭР)."""
-    async with db.execute(
-        """SELECT id, situation, thought, emotions_json, emotion_intensity,
-                  reaction, created_at
-           FROM thought_entries
-           WHERE user_id = ?
-           ORDER BY created_at DESC
-           LIMIT ?""",
-        (user_id, limit)
-    ) as cursor:
+    async with db.execute(DIARY_LIST_QUERY, (user_id, limit)) as cursor:
         rows = await cursor.fetchall()
 
     entries = []
@@ -87,9 +137,10 @@ async def create_thought_entry(
         (user_id, entry.situation, entry.thought, emotions_json,
          entry.emotionIntensity, entry.reaction)
     )
-    await db.commit()
-
     entry_id = cursor.lastrowid
+    await save_entry_emotions(db, entry_id, user_id, entry.emotions)
+    await record_diary_entry(db, user_id, entry.emotions)
+    await db.commit()
 
     # Получаем созданную запись
     async with db.execute(
@@ -116,14 +167,13 @@ async def delete_thought_entry(
     db=Depends(get_db)
 ):
     """Удалить запись из дневника."""
-    result = await db.execute(
-        "DELETE FROM thought_entries WHERE id = ? AND user_id = ?",
-        (entry_id, user_id)
-    )
-    await db.commit()
-    
-    if result.rowcount == 0:
+    rows = await db.execute_fetchall(DIARY_DELETE_QUERY, (entry_id, user_id))
+    if not rows:
         raise HTTPException(status_code=404, detail="Entry not found")
+
+    await db.execute(DIARY_DELETE_EMOTIONS_QUERY, (entry_id,))
+    await record_diary_entry(db, user_id, parse_emotions(rows[0][0]), delta=-1)
+    await db.commit()
     
     return {"success": True}
 
@@ -131,37 +181,54 @@ async def delete_thought_entry(
 @router.get("/stats")
 async def get_diary_stats(
     user_id: int = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Получить статистику дневника (схема СМЭР)."""
-    # Общее количество записей
-    async with db.execute(
-        "SELECT COUNT(*) FROM thought_entries WHERE user_id = ?",
-        (user_id,)
-    ) as cursor:
-        total = (await cursor.fetchone())[0]
+    # Количество записей и частоты эмоций — готовая сводка (user_stats)
+    async with db.execute(DIARY_STATS_QUERY, (user_id,)) as cursor:
+        row = await cursor.fetchone()
 
-    # Частые эмоции
-    async with db.execute(
-        "SELECT emotions_json FROM thought_entries WHERE user_id = ?",
-        (user_id,)
-    ) as cursor:
-        rows = await cursor.fetchall()
+    return {
+        "totalEntries": row[0] if row else 0,
+        "topEmotions": top_emotions(row[1]) if row else [],
+    }
 
-    emotion_counts = {}
-    for row in rows:
-        if row[0]:
-            try:
-                emotions = json.loads(row[0])
-                for e in emotions:
-                    emotion_counts[e] = emotion_counts.get(e, 0) + 1
-            except:
-                pass
 
-    # Сортируем по частоте
-    top_emotions = sorted(emotion_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+@router.get("/analytics")
+async def get_diary_analytics(
+    weeks: int = Query(8, ge=1, le=52),
+    user_id: int = Depends(get_current_user),
+    db=Depends(get_read_db)
+):
+    """Эмоции дневника за последние недели: частые эмоции, динамика по неделям
+    и распределение интенсивности.
+
+    Каждый срез — один запрос: записи за период по idx_thought_entries_user,
+    их эмоции по idx_thought_entry_emotions_entry. Группировка — во временном
+    B-дереве, его размер ограничен записями пользователя за период.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(weeks=weeks)).strftime("%Y-%m-%d %H:%M:%S")
+
+    async with db.execute(ANALYTICS_TOP_QUERY, (user_id, since, ANALYTICS_TOP_EMOTIONS)) as cursor:
+        top = [
+            {"id": emotion, "count": count, "avgIntensity": avg_intensity}
+            for emotion, count, avg_intensity in await cursor.fetchall()
+        ]
+
+    async with db.execute(ANALYTICS_WEEKLY_QUERY, (user_id, since)) as cursor:
+        weekly = {}
+        for week, emotion, count in await cursor.fetchall():
+            weekly.setdefault(week, {})[emotion] = count
+
+    async with db.execute(ANALYTICS_INTENSITY_QUERY, (user_id, since)) as cursor:
+        intensity = [
+            {"intensity": value, "count": count}
+            for value, count in await cursor.fetchall()
+        ]
 
     return {
-        "totalEntries": total,
-        "topEmotions": [{"id": e[0], "count": e[1]} for e in top_emotions],
+        "weeks": weeks,
+        "topEmotions": top,
+        "weekly": [{"week": week, "emotions": emotions} for week, emotions in weekly.items()],
+        "intensity": intensity,
     }
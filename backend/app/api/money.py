@@ -6,11 +6,31 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.api.auth import get_current_user
+from app.services.user_stats import record_money_entry
 
 router = APIRouter()
 
+MONEY_ENTRIES_QUERY = """
+SELECT id, amount, entry_type, note, created_at
+FROM money_entries
+WHERE user_id = ?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+
+# Настройки, серия и готовая сводка потерь (user_stats) — одной строкой
+MONEY_STATS_QUERY = """
+SELECT COALESCE(m.average_amount, 0), COALESCE(s.current_streak, 0),
+       COALESCE(us.loss_total, 0), COALESCE(us.loss_count, 0)
+FROM users u
+LEFT JOIN money_settings m ON m.user_id = u.id
+LEFT JOIN streaks s ON s.user_id = u.id
+LEFT JOIN user_stats us ON us.user_id = u.id
+WHERE u.id = ?
+"""
+
 
 class MoneySettingsUpdate(BaseModel):
     enabled: bool
@@ -28,7 +48,7 @@ class MoneyEntryCreate(BaseModel):
 @router.get("/settings")
 async def get_money_settings(
     user_id: int = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Получить настройки финансов."""
     async with db.execute(
@@ -38,12 +58,17 @@ async def get_money_settings(
     ) as cursor:
         row = await cursor.fetchone()
     
+    return format_money_settings(row)
+
+
+def format_money_settings(row) -> dict:
+    """Ответ /money/settings (None — настроек ещё нет)."""
     if row:
         return {
-            "enabled": bool(row[0]),
-            "averageAmount": row[1] or 0,
-            "showSaved": bool(row[2]),
-            "trackLosses": bool(row[3]),
+            "enabled": bool(row["enabled"]),
+            "averageAmount": row["average_amount"] or 0,
+            "showSaved": bool(row["show_saved"]),
+            "trackLosses": bool(row["track_losses"]),
         }
     
     # Возвращаем дефолтные настройки
@@ -89,17 +114,10 @@ async def update_money_settings(
 async def get_money_entries(
     limit: int = 50,
     user_id: int = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Получить историю финансов."""
-    async with db.execute(
-        """SELECT id, amount, entry_type, note, created_at
-           FROM money_entries
-           WHERE user_id = ?
-           ORDER BY created_at DESC
-           LIMIT ?""",
-        (user_id, limit)
-    ) as cursor:
+    async with db.execute(MONEY_ENTRIES_QUERY, (user_id, limit)) as cursor:
         rows = await cursor.fetchall()
     
     return [
@@ -126,6 +144,7 @@ async def add_money_entry(
            VALUES (?, ?, ?, ?)""",
         (user_id, entry.amount, entry.type, entry.note)
     )
+    await record_money_entry(db, user_id, entry.amount, entry.type)
     await db.commit()
     
     entry_id = cursor.lastrowid
@@ -148,45 +167,21 @@ async def add_money_entry(
 @router.get("/stats")
 async def get_money_stats(
     user_id: int = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Получить статистику финансов."""
-    # Настройки
-    async with db.execute(
-        "SELECT average_amount FROM money_settings WHERE user_id = ?",
-        (user_id,)
-    ) as cursor:
-        row = await cursor.fetchone()
-    
-    average_amount = row[0] if row else 0
-    
-    # Текущая серия
-    async with db.execute(
-        "SELECT current_streak FROM streaks WHERE user_id = ?",
-        (user_id,)
-    ) as cursor:
+    async with db.execute(MONEY_STATS_QUERY, (user_id,)) as cursor:
         row = await cursor.fetchone()
     
-    current_streak = row[0] if row else 0
-    
+    if not row:
+        return format_money_stats(0, 0, 0, 0)
+    return format_money_stats(*row)
+
+
+def format_money_stats(average_amount: int, current_streak: int, lost_total: int, loss_count: int) -> dict:
+    """Ответ /money/stats."""
     # Сэкономлено (приблизительно)
     saved_total = current_streak * average_amount if average_amount else 0
-    
-    # Потери
-    async with db.execute(
-        """SELECT COALESCE(SUM(amount), 0) FROM money_entries 
-           WHERE user_id = ? AND entry_type = 'loss'""",
-        (user_id,)
-    ) as cursor:
-        lost_total = (await cursor.fetchone())[0]
-    
-    # Количество срывов с потерями
-    async with db.execute(
-        "SELECT COUNT(*) FROM money_entries WHERE user_id = ? AND entry_type = 'loss'",
-        (user_id,)
-    ) as cursor:
-        loss_count = (await cursor.fetchone())[0]
-    
     return {
         "savedTotal": saved_total,
         "lostTotal": lost_total,
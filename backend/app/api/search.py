@@ -0,0 +1,48 @@
+"""
+Поиск по статьям и своему дневнику.
+"""
+
+import sqlite3
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+import aiosqlite
+
+from app.db.database import get_read_db
+from app.api.auth import get_current_user
+from app.services.search import build_match_query, search_articles, search_diary
+
+router = APIRouter()
+
+SEARCH_LIMIT = 20
+SEARCH_LIMIT_MAX = 50
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    scope: Literal["all", "articles", "diary"] = "all",
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=SEARCH_LIMIT_MAX),
+    user_id: int = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_read_db)
+):
+    """Статьи и записи дневника, подходящие под запрос (лучшие — первыми).
+
+    Совпадения в snippet выделены **...**.
+    """
+    result = {"query": q, "articles": [], "diary": []}
+    match = build_match_query(q)
+    if match is None:
+        return result
+
+    try:
+        if scope in ("all", "articles"):
+            result["articles"] = await search_articles(db, match, limit)
+        if scope in ("all", "diary"):
+            result["diary"] = await search_diary(db, user_id, match, limit)
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            raise HTTPException(status_code=503, detail="Search is not available")
+        raise
+
+    return result
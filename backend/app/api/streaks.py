@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 import aiosqlite
 
-from app.db.database import get_db
+from app.db.database import get_read_db
 from app.api.auth import get_current_user
 
 router = APIRouter()
@@ -17,7 +17,7 @@ class StreakResponse(BaseModel):
 @router.get("", response_model=StreakResponse)
 async def get_streak(
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
     """Получает текущий streak пользователя."""
     cursor = await db.execute(
@@ -8,11 +8,43 @@ from typing import Optional, Dict, List, Any
 import aiosqlite
 
 from app.api.auth import get_current_user
-from app.db.database import get_db
-from app.services.test_engine import TestEngine
+from app.db.database import get_db, get_read_db
+from app.services.test_engine import TestEngine, USER_PROFILE_QUERY
+from app.services.scoring import get_scorer, ScoringError
+from app.db.test_catalog import get_catalog, CLUSTER_METRICS
 
 router = APIRouter()
 
+TEST_HISTORY_LIST_QUERY = """
+SELECT * FROM test_results
+WHERE user_id = ?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+
+ANALYTICS_PROFILE_QUERY = """
+SELECT risk_behavior_score, gambling_score, trading_score,
+       digital_score, emotional_regulation_score, risk_level, track
+FROM user_profiles WHERE user_id = ?
+"""
+
+# Результаты B-тестов за 14 дней ({placeholders} — по числу id тестов)
+ANALYTICS_DAILY_QUERY = """
+SELECT test_id, total_score, created_at
+FROM test_results
+WHERE user_id = ? AND test_id IN ({placeholders})
+  AND created_at >= datetime('now', '-14 days')
+ORDER BY created_at DESC
+"""
+
+# Последний C-тест ({placeholders} — по числу id тестов)
+ANALYTICS_WEEKLY_QUERY = """
+SELECT test_id, total_score, interpretation, created_at
+FROM test_results
+WHERE user_id = ? AND test_id IN ({placeholders})
+ORDER BY created_at DESC LIMIT 1
+"""
+
 
 class TestAnswer(BaseModel):
     question_code: str
@@ -62,18 +94,17 @@ async def submit_test_result(
     user_id: int = Depends(get_current_user),
     db: aiosqlite.Connection = Depends(get_db)
 ):
-    engine = TestEngine(db)
+    scorer = get_scorer(submission.test_code)
+    if not scorer:
+        raise HTTPException(status_code=404, detail="Test not found")
+
     answers = {a.question_code: a.value for a in submission.answers}
-    
-    # Считаем score
-    score = 0
-    for answer in submission.answers:
-        if isinstance(answer.value, int):
-            score += answer.value
-        elif isinstance(answer.value, bool):
-            score += 3 if answer.value else 0
-        elif isinstance(answer.value, list):
-            score += len(answer.value)
+    try:
+        score = scorer.score(answers)
+    except ScoringError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    engine = TestEngine(db)
     
     # Для тестов онбординга (A) используем специальный метод
     if submission.test_code.startswith("A"):
@@ -124,93 +155,87 @@ async def select_track(
 @router.get("/profile")
 async def get_test_profile(
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
-    async with db.execute(
-        "SELECT * FROM user_profiles WHERE user_id = ?",
-        (user_id,)
-    ) as cursor:
+    async with db.execute(USER_PROFILE_QUERY, (user_id,)) as cursor:
         row = await cursor.fetchone()
         
         if not row:
-            return {
-                "onboarding_completed": False,
-                "onboarding_day": 0,
-                "track": None,
-                "risk_level": None,
-            }
+            return format_test_profile(None)
         
         columns = [d[0] for d in cursor.description]
-        profile = dict(zip(columns, row))
-        
+        return format_test_profile(dict(zip(columns, row)))
+
+
+def format_test_profile(profile: Optional[Dict]) -> Dict:
+    """Ответ /tests/profile (None — профиля ещё нет)."""
+    if not profile:
         return {
-            "onboarding_completed": profile.get("onboarding_completed", False),
-            "onboarding_day": profile.get("onboarding_day", 0),
-            "track": profile.get("track"),
-            "risk_level": profile.get("risk_level"),
+            "onboarding_completed": False,
+            "onboarding_day": 0,
+            "track": None,
+            "risk_level": None,
         }
+    
+    return {
+        "onboarding_completed": profile.get("onboarding_completed", False),
+        "onboarding_day": profile.get("onboarding_day", 0),
+        "track": profile.get("track"),
+        "risk_level": profile.get("risk_level"),
+    }
 
 
 @router.get("/history")
 async def get_test_history(
     limit: int = 30,
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
-    async with db.execute(
-        """SELECT tr.*, t.code, t.name_ru
-           FROM test_results tr
-           JOIN tests t ON tr.test_id = t.id
-           WHERE tr.user_id = ?
-           ORDER BY tr.created_at DESC
-           LIMIT ?""",
-        (user_id, limit)
-    ) as cursor:
+    async with db.execute(TEST_HISTORY_LIST_QUERY, (user_id, limit)) as cursor:
         rows = await cursor.fetchall()
         columns = [d[0] for d in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+
+    catalog = get_catalog()
+    history = []
+    for row in rows:
+        item = dict(zip(columns, row))
+        test = catalog.get_by_id(item["test_id"])
+        item["code"] = test.code if test else None
+        item["name_ru"] = test.name_ru if test else None
+        history.append(item)
+    return history
 
 
 @router.get("/analytics")
 async def get_test_analytics(
     user_id: int = Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db)
+    db: aiosqlite.Connection = Depends(get_read_db)
 ):
     """Агрегированная аналитика по результатам тестов."""
 
     # Получаем профиль с онбординг-скорами
     profile = {}
-    async with db.execute(
-        """SELECT risk_behavior_score, gambling_score, trading_score,
-                  digital_score, emotional_regulation_score, risk_level, track
-           FROM user_profiles WHERE user_id = ?""",
-        (user_id,)
-    ) as cursor:
+    async with db.execute(ANALYTICS_PROFILE_QUERY, (user_id,)) as cursor:
         profile_row = await cursor.fetchone()
         if profile_row:
             columns = [d[0] for d in cursor.description]
             profile = dict(zip(columns, profile_row))
 
+    catalog = get_catalog()
+    b_ids = catalog.ids("B")
+    c_ids = catalog.ids("C")
+
     # Получаем результаты B-тестов за последние 14 дней
     async with db.execute(
-        """SELECT t.code, tr.total_score, tr.created_at
-           FROM test_results tr
-           JOIN tests t ON tr.test_id = t.id
-           WHERE tr.user_id = ? AND t.level = 'B'
-             AND tr.created_at >= datetime('now', '-14 days')
-           ORDER BY tr.created_at DESC""",
-        (user_id,)
+        ANALYTICS_DAILY_QUERY.format(placeholders=",".join("?" for _ in b_ids)),
+        (user_id, *b_ids)
     ) as cursor:
         b_results = await cursor.fetchall()
 
     # Получаем последний C-тест (еженедельный риск)
     async with db.execute(
-        """SELECT t.code, tr.total_score, tr.interpretation, tr.created_at
-           FROM test_results tr
-           JOIN tests t ON tr.test_id = t.id
-           WHERE tr.user_id = ? AND t.level = 'C'
-           ORDER BY tr.created_at DESC LIMIT 1""",
-        (user_id,)
+        ANALYTICS_WEEKLY_QUERY.format(placeholders=",".join("?" for _ in c_ids)),
+        (user_id, *c_ids)
     ) as cursor:
         c_result = await cursor.fetchone()
 
@@ -225,23 +250,13 @@ async def get_test_analytics(
         "decisions": [],  # B7_*
     }
 
-    for code, score, _ in b_results:
+    for test_id, score, _ in b_results:
         if score is None:
             continue
-        if code.startswith("B1"):
-            clusters["urge"].append(score)
-        elif code.startswith("B2"):
-            clusters["impulse"].append(score)
-        elif code.startswith("B3"):
-            clusters["triggers"].append(score)
-        elif code.startswith("B4"):
-            clusters["emotions"].append(score)
-        elif code.startswith("B5"):
-            clusters["stress"].append(score)
-        elif code.startswith("B6"):
-            clusters["sleep"].append(score)
-        elif code.startswith("B7"):
-            clusters["decisions"].append(score)
+        test = catalog.get_by_id(test_id)
+        metric = CLUSTER_METRICS.get(test.cluster) if test else None
+        if metric:
+            clusters[metric].append(score)
 
     def avg(lst):
         return round(sum(lst) / len(lst), 1) if lst else None
@@ -302,8 +317,9 @@ async def get_test_analytics(
     # Последняя еженедельная оценка
     weekly_assessment = None
     if c_result:
+        c_test = catalog.get_by_id(c_result[0])
         weekly_assessment = {
-            "code": c_result[0],
+            "code": c_test.code if c_test else None,
             "score": c_result[1],
             "interpretation": c_result[2],
             "date": c_result[3],
@@ -0,0 +1,119 @@
+"""
+Размер ответа и задержка списка статей в зависимости от размера каталога.
+
+Для каталогов из ARTICLE_COUNTS статей (тексты из seed_articles по кругу)
+сравнивает прежний список — все статьи с полным content, выборка из БД
+на каждый запрос — с текущим GET /articles: первая страница карточек
+из памяти, следующая страница по курсору и повторный запрос с If-None-Match.
+
+Запуск (из папки backend):
+    python -m app.articles_benchmark
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+# До импорта настроек: временная БД
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["BOT_TOKEN"] = ""
+
+import aiosqlite
+import httpx
+
+from app.db.article_catalog import load_article_catalog
+from app.db.schema_v3 import SCHEMA_V3
+from app.db.seed_articles import ARTICLES, estimate_read_time
+from app.main import app
+
+ARTICLE_COUNTS = (10, 100, 500)
+ROUNDS = 500
+
+LEGACY_QUERY = "SELECT id, title, category, content FROM articles ORDER BY order_index"
+
+
+async def _seed(db: aiosqlite.Connection, count: int):
+    await db.execute("DELETE FROM articles")
+    rows = []
+    for i in range(count):
+        article = ARTICLES[i % len(ARTICLES)]
+        rows.append((f"{article['title']} #{i}", article["content"], article["category"],
+                     estimate_read_time(article["content"]), i))
+    await db.executemany(
+        "INSERT INTO articles (title, content, category, read_time, order_index) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+    await db.commit()
+
+
+async def _measure(rounds: int, request) -> float:
+    """Среднее время запроса, мс."""
+    await request()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await request()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+async def _bench_catalog(db: aiosqlite.Connection, client: httpx.AsyncClient, count: int, rounds: int) -> dict:
+    await _seed(db, count)
+    await load_article_catalog(db)
+
+    # Прежний эндпоинт: выборка всех статей и сериализация на каждый запрос
+    async def legacy():
+        async with db.execute(LEGACY_QUERY) as cursor:
+            rows = await cursor.fetchall()
+        return json.dumps(
+            [{"id": r[0], "title": r[1], "category": r[2], "content": r[3]} for r in rows],
+            ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    first = await client.get("/articles")
+    first.raise_for_status()
+    next_cursor = first.json()["nextCursor"]
+    etag = first.headers["etag"]
+
+    async def first_page():
+        (await client.get("/articles")).raise_for_status()
+
+    async def next_page():
+        params = {"cursor": next_cursor} if next_cursor else {}
+        (await client.get("/articles", params=params)).raise_for_status()
+
+    async def revalidate():
+        response = await client.get("/articles", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    return {
+        "legacy_bytes": len(await legacy()),
+        "page_bytes": len(first.content),
+        "legacy_ms": await _measure(rounds, legacy),
+        "first_page_ms": await _measure(rounds, first_page),
+        "next_page_ms": await _measure(rounds, next_page),
+        "not_modified_ms": await _measure(rounds, revalidate),
+    }
+
+
+async def run_benchmark(counts=ARTICLE_COUNTS, rounds: int = ROUNDS) -> dict:
+    # Эндпоинты статей не обращаются к пулу, поэтому lifespan не нужен
+    results = {}
+    async with aiosqlite.connect(":memory:") as db:
+        await db.executescript(SCHEMA_V3)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for count in counts:
+                results[count] = await _bench_catalog(db, client, count, rounds)
+    return results
+
+
+if __name__ == "__main__":
+    for count, r in asyncio.run(run_benchmark()).items():
+        print(f"[OK] {count} articles: full list {r['legacy_bytes'] / 1024:.1f} KB "
+              f"(DB + JSON {r['legacy_ms']:.3f} ms), "
+              f"first page {r['page_bytes'] / 1024:.1f} KB")
+        print(f"     GET /articles {r['first_page_ms']:.3f} ms, "
+              f"next page {r['next_page_ms']:.3f} ms, "
+              f"304 {r['not_modified_ms']:.3f} ms")
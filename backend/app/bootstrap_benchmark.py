@@ -0,0 +1,100 @@
+"""
+Сравнение задержки: GET /bootstrap против набора отдельных запросов.
+
+Поднимает приложение на временной БД (без сети, через ASGI), создаёт
+пользователя с чек-ином, записями денег и дневника и замеряет среднее
+время открытия главного экрана:
+- по одному запросу на каждый эндпоинт, последовательно и параллельно;
+- одним запросом /bootstrap.
+
+Запуск (из папки backend):
+    python -m app.bootstrap_benchmark
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+# До импорта настроек: временная БД и вход через init_data="debug"
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["DEBUG"] = "true"
+os.environ["BOT_TOKEN"] = ""
+
+import httpx
+
+from app.main import app
+
+ROUNDS = 300
+
+# Что главный экран запрашивал по отдельности
+FAN_OUT = (
+    "/auth/me",
+    "/checkins/today",
+    "/money/settings",
+    "/money/stats",
+    "/diary/stats",
+    "/tests/profile",
+    "/tests/next",
+)
+
+
+async def _seed(client: httpx.AsyncClient) -> dict:
+    auth = (await client.post("/auth/verify", json={"init_data": "debug"})).json()
+    headers = {"Authorization": f"Bearer {auth['token']}"}
+    await client.post("/checkins", json={"urge": 3, "stress": 4, "mood": 6}, headers=headers)
+    await client.put("/money/settings", json={
+        "enabled": True, "averageAmount": 1000, "showSaved": True, "trackLosses": True,
+    }, headers=headers)
+    for amount in (500, 1500):
+        await client.post("/money/entries", json={"amount": amount, "type": "loss"}, headers=headers)
+    for n in range(5):
+        await client.post("/diary", json={
+            "situation": f"Ситуация {n}", "thought": "Мысль", "emotions": ["тревога"],
+            "emotionIntensity": 5, "reaction": "Реакция",
+        }, headers=headers)
+    return headers
+
+
+async def _measure(rounds: int, request) -> float:
+    """Среднее время одного открытия экрана, мс."""
+    await request()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await request()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+async def run_benchmark(rounds: int = ROUNDS) -> dict:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = await _seed(client)
+
+            async def sequential():
+                for path in FAN_OUT:
+                    response = await client.get(path, headers=headers)
+                    response.raise_for_status()
+
+            async def parallel():
+                responses = await asyncio.gather(*(client.get(path, headers=headers) for path in FAN_OUT))
+                for response in responses:
+                    response.raise_for_status()
+
+            async def bootstrap():
+                response = await client.get("/bootstrap", headers=headers)
+                response.raise_for_status()
+
+            return {
+                "sequential": await _measure(rounds, sequential),
+                "parallel": await _measure(rounds, parallel),
+                "bootstrap": await _measure(rounds, bootstrap),
+            }
+
+
+if __name__ == "__main__":
+    results = asyncio.run(run_benchmark())
+    print(f"[OK] {len(FAN_OUT)} requests, sequential: {results['sequential']:.2f} ms")
+    print(f"[OK] {len(FAN_OUT)} requests, parallel:   {results['parallel']:.2f} ms")
+    print(f"[OK] /bootstrap:                {results['bootstrap']:.2f} ms")
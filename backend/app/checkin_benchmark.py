@@ -0,0 +1,124 @@
+"""
+Чек-ины в секунду: одна транзакция против прежнего пути с несколькими commit.
+
+На временной БД (WAL, PRAGMA пула) USERS пользователей делают по кругу
+CHECKINS чек-инов (каждый третий — срыв с суммой потерь):
+- прежний create_checkin: до семи запросов и три-четыре commit;
+- текущий create_checkin (app/api/checkins.py): одна транзакция,
+  INSERT ... RETURNING и upsert серии.
+
+Замер при synchronous=NORMAL (по умолчанию) и FULL — там каждый commit
+означает fsync.
+
+Запуск (из папки backend):
+    python -m app.checkin_benchmark
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+from app.api.checkins import CheckInCreate, create_checkin
+from app.db.pool import ConnectionPool
+from app.db.schema_v3 import SCHEMA_V3
+
+USERS = 100
+CHECKINS = 2000
+
+
+async def legacy_checkin(db, user_id: int, checkin: CheckInCreate) -> dict:
+    """Прежний create_checkin (до объединения в одну транзакцию)."""
+    cursor = await db.execute("SELECT current_streak FROM streaks WHERE user_id = ?", (user_id,))
+    row = await cursor.fetchone()
+    previous_streak = row[0] if row else 0
+
+    cursor = await db.execute(
+        """INSERT INTO checkins (user_id, urge, stress, mood, relapse, note, loss_amount)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (user_id, checkin.urge, checkin.stress, checkin.mood,
+         checkin.relapse, checkin.note, checkin.lossAmount)
+    )
+    await db.commit()
+    checkin_id = cursor.lastrowid
+
+    if checkin.relapse and checkin.lossAmount and checkin.lossAmount > 0:
+        await db.execute(
+            "INSERT INTO money_entries (user_id, amount, entry_type) VALUES (?, ?, 'loss')",
+            (user_id, checkin.lossAmount)
+        )
+        await db.commit()
+
+    today = date.today().isoformat()
+    cursor = await db.execute(
+        "SELECT current_streak, best_streak, last_checkin_date FROM streaks WHERE user_id = ?",
+        (user_id,)
+    )
+    current, best, last_date = await cursor.fetchone()
+    if checkin.relapse:
+        new_streak = 0
+    elif last_date == today:
+        new_streak = current
+    else:
+        new_streak = current + 1
+    await db.execute(
+        "UPDATE streaks SET current_streak = ?, best_streak = ?, last_checkin_date = ? WHERE user_id = ?",
+        (new_streak, max(best, new_streak), today, user_id)
+    )
+    await db.commit()
+
+    cursor = await db.execute("SELECT * FROM checkins WHERE id = ?", (checkin_id,))
+    await cursor.fetchone()
+    return {"newStreak": new_streak, "previousStreak": previous_streak}
+
+
+async def _run(path: str, synchronous: str, checkins: int, func) -> float:
+    """Чек-ины в секунду на новой БД."""
+    pool = ConnectionPool(path, readers=1)
+    await pool.open()
+    try:
+        async def setup(db):
+            await db.executescript(SCHEMA_V3)
+            await db.executemany(
+                "INSERT INTO users (id, anon_hash, recovery_code) VALUES (?, ?, ?)",
+                [(u, f"bench-{u}", f"BENCH{u:06d}") for u in range(1, USERS + 1)]
+            )
+            await db.executemany("INSERT INTO streaks (user_id) VALUES (?)",
+                                 [(u,) for u in range(1, USERS + 1)])
+
+        await pool.run_write(setup)
+        async with pool.writer() as db:
+            await db.execute(f"PRAGMA synchronous = {synchronous}")
+            started = time.perf_counter()
+            for n in range(checkins):
+                relapse = n % 3 == 0
+                checkin = CheckInCreate(urge=n % 11, stress=4, mood=6, relapse=relapse,
+                                        lossAmount=500 if relapse else None)
+                await func(db, n % USERS + 1, checkin)
+            return checkins / (time.perf_counter() - started)
+    finally:
+        await pool.close()
+
+
+async def run_benchmark(checkins: int = CHECKINS) -> dict:
+    tmp_dir = tempfile.mkdtemp()
+
+    async def current(db, user_id, checkin):
+        return await create_checkin(checkin, user_id=user_id, db=db)
+
+    results = {}
+    for synchronous in ("NORMAL", "FULL"):
+        for name, func in (("legacy", legacy_checkin), ("transaction", current)):
+            path = os.path.join(tmp_dir, f"{name}-{synchronous}.db")
+            results[(synchronous, name)] = await _run(path, synchronous, checkins, func)
+    return results
+
+
+if __name__ == "__main__":
+    results = asyncio.run(run_benchmark())
+    for synchronous in ("NORMAL", "FULL"):
+        legacy = results[(synchronous, "legacy")]
+        current = results[(synchronous, "transaction")]
+        print(f"[OK] synchronous={synchronous}: before {legacy:,.0f} check-ins/s, "
+              f"after {current:,.0f} check-ins/s ({current / legacy:.1f}x)")
@@ -18,9 +18,60 @@ class Settings:
     else:
         DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
+    # Количество соединений-читателей в пуле
+    DB_POOL_READERS: int = int(os.getenv("DB_POOL_READERS", "4"))
+
+    # Режим хранения SQLite (WAL — читатели не блокируются писателем)
+    DB_JOURNAL_MODE: str = os.getenv("DB_JOURNAL_MODE", "WAL")
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+    DB_CACHE_SIZE_KB: int = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+    DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+    # Часовой пояс по умолчанию (для пользователей без своего)
+    DEFAULT_TIMEZONE: str = os.getenv("DEFAULT_TIMEZONE", "UTC")
+
+    # Период фонового аудита серий
+    STREAK_AUDIT_INTERVAL_HOURS: float = float(os.getenv("STREAK_AUDIT_INTERVAL_HOURS", "24"))
+
+    # Как часто проверять, не пересеяны ли статьи (0 — только при старте)
+    ARTICLE_CATALOG_CHECK_SECONDS: float = float(os.getenv("ARTICLE_CATALOG_CHECK_SECONDS", "60"))
+
+    # Адрес Mini App (кнопки бота и напоминаний)
+    WEBAPP_URL: str = os.getenv("WEBAPP_URL", "https://gambling-help-andrey220197.amvera.io")
+
+    # Секрет webhook (secret_token в setWebhook); пустой — заголовок не проверяется
+    BOT_WEBHOOK_SECRET: str = os.getenv("BOT_WEBHOOK_SECRET", "")
+
+    # Публичный адрес webhook (https://.../bot/webhook); пустой — setWebhook не вызывается
+    BOT_WEBHOOK_URL: str = os.getenv("BOT_WEBHOOK_URL", "")
+
+    # Telegram Bot API (адрес можно заменить на локальный фейковый сервер)
+    TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    TELEGRAM_MAX_CONCURRENCY: int = int(os.getenv("TELEGRAM_MAX_CONCURRENCY", "20"))
+    TELEGRAM_GLOBAL_RATE: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+    TELEGRAM_CHAT_INTERVAL: float = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "1.0"))
+    TELEGRAM_MAX_RETRIES: int = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+    TELEGRAM_TIMEOUT_SECONDS: float = float(os.getenv("TELEGRAM_TIMEOUT_SECONDS", "10"))
+
+    # Очередь исходящих сообщений: попыток до пометки dead
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+
+    # initData Mini App: сколько секунд после auth_date они действительны
+    # и сколько проверенных initData держать в кэше
+    INIT_DATA_MAX_AGE_SECONDS: int = int(os.getenv("INIT_DATA_MAX_AGE_SECONDS", str(24 * 3600)))
+    INIT_DATA_CACHE_SIZE: int = int(os.getenv("INIT_DATA_CACHE_SIZE", "10000"))
+
     # JWT настройки
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24 * 7  # 7 дней
 
+    # Короткие access-токены с refresh (0 — один токен на JWT_EXPIRATION_HOURS)
+    JWT_ACCESS_TOKEN_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "0"))
+    JWT_REFRESH_TOKEN_DAYS: int = int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "30"))
+
+    # Сколько проверенных JWT держать в кэше
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
 
 settings = Settings()
@@ -0,0 +1,248 @@
+"""
+Каталог статей в памяти.
+
+Статьи — статичный контент из seed_articles, поэтому он читается из БД
+один раз при старте, а эндпоинты /articles отдают готовые JSON-тела
+со строгим ETag, не трогая БД.
+
+Список — краткие карточки (без content, с отрывком) постранично:
+курсор — (order_index, id) последней статьи страницы. JSON каждой
+карточки сериализуется заранее, страница только склеивает готовые куски.
+
+Версия каталога — (MAX(id), COUNT(*), MAX(updated_at)) таблицы articles:
+seed_articles обновляет статьи на месте (id сохраняются) и ставит
+updated_at изменённым, новые статьи получают новые id, удалённые
+уменьшают COUNT. Пересев в этом процессе сразу перестраивает каталог,
+пересев из командной строки замечает run_article_refresh (одна проверка
+версии раз в ARTICLE_CATALOG_CHECK_SECONDS).
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db.pool import ConnectionPool
+from app.utils.http import make_etag
+
+ARTICLES_QUERY = """
+SELECT id, title, content, category, read_time, order_index
+FROM articles
+ORDER BY order_index, id
+"""
+
+# Длина отрывка в карточке списка (символов)
+EXCERPT_LENGTH = 160
+
+# Размер страницы списка по умолчанию и максимальный
+ARTICLES_PAGE_SIZE = 20
+ARTICLES_PAGE_SIZE_MAX = 50
+
+DEFAULT_READ_TIME = "3 мин"
+
+VERSION_QUERY = "SELECT COALESCE(MAX(id), 0), COUNT(*), COALESCE(MAX(updated_at), '') FROM articles"
+
+
+def _dumps(value) -> bytes:
+    # Так же, как JSONResponse FastAPI
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH) -> str:
+    """Начало первого абзаца без разметки, обрезанное по границе слова."""
+    paragraph = content.strip().split("\n\n", 1)[0]
+    text = re.sub(r"\s+", " ", paragraph.replace("**", "").replace("*", "")).strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0].rstrip(" ,.;:—-")
+    return cut + "…"
+
+
+def parse_cursor(cursor: str) -> Tuple[int, int]:
+    """Курсор страницы «order_index:id» → ключ сортировки. ValueError — битый курсор."""
+    order_index, article_id = cursor.split(":", 1)
+    return int(order_index), int(article_id)
+
+
+class CachedBody:
+    """Готовое JSON-тело ответа и его ETag."""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = make_etag(body)
+
+    @classmethod
+    def of(cls, value) -> "CachedBody":
+        return cls(_dumps(value))
+
+
+class ArticleList:
+    """Карточки статей одной категории (или всех) в порядке order_index."""
+
+    __slots__ = ("keys", "items")
+
+    def __init__(self, keys: List[Tuple[int, int]], items: List[bytes]):
+        self.keys = tuple(keys)
+        self.items = tuple(items)
+
+
+EMPTY_LIST = ArticleList([], [])
+
+
+class ArticleCatalog:
+    """Неизменяемый индекс статей по id и категории с готовыми ответами."""
+
+    def __init__(self, articles: Tuple[Dict, ...], version: Tuple[int, int] = (0, 0)):
+        self.version = version
+        self.articles = articles
+
+        lists: Dict[Optional[str], Tuple[list, list]] = {None: ([], [])}
+        for article in articles:
+            key = (article["order_index"], article["id"])
+            summary = _dumps({
+                "id": article["id"],
+                "title": article["title"],
+                "category": article["category"],
+                "readTime": article["read_time"],
+                "excerpt": make_excerpt(article["content"]),
+            })
+            for name in (None, article["category"]):
+                keys, items = lists.setdefault(name, ([], []))
+                keys.append(key)
+                items.append(summary)
+        self.lists = MappingProxyType({name: ArticleList(*pair) for name, pair in lists.items()})
+        self.categories = tuple(name for name in self.lists if name is not None)
+
+        self.categories_body = CachedBody.of(list(self.categories))
+        self.article_bodies = MappingProxyType({
+            article["id"]: CachedBody.of({
+                "id": article["id"],
+                "title": article["title"],
+                "content": article["content"],
+                "category": article["category"],
+                "readTime": article["read_time"],
+            })
+            for article in articles
+        })
+        # Для случайной статьи и карточки дня — те же тела, что и по id
+        self.ids = tuple(article["id"] for article in articles)
+        self.ordered_bodies = tuple(self.article_bodies[article_id] for article_id in self.ids)
+        # Первая страница по умолчанию — самый частый запрос, её тела готовы заранее
+        self.first_pages = MappingProxyType({
+            name: self._build_page(articles, 0, ARTICLES_PAGE_SIZE)
+            for name, articles in self.lists.items()
+        })
+
+    def page(
+        self,
+        category: Optional[str] = None,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = ARTICLES_PAGE_SIZE,
+    ) -> CachedBody:
+        """Страница карточек после ключа after: {"items": [...], "nextCursor": ...}."""
+        articles = self.lists.get(category, EMPTY_LIST)
+        if after is None:
+            if limit == ARTICLES_PAGE_SIZE and category in self.first_pages:
+                return self.first_pages[category]
+            return self._build_page(articles, 0, limit)
+        return self._build_page(articles, bisect_right(articles.keys, after), limit)
+
+    @staticmethod
+    def _build_page(articles: ArticleList, start: int, limit: int) -> CachedBody:
+        end = start + limit
+        if end < len(articles.keys):
+            order_index, article_id = articles.keys[end - 1]
+            next_cursor = f'"{order_index}:{article_id}"'.encode()
+        else:
+            next_cursor = b"null"
+        return CachedBody(
+            b'{"items":[' + b",".join(articles.items[start:end]) + b'],"nextCursor":' + next_cursor + b"}"
+        )
+
+    def get(self, article_id: int) -> Optional[CachedBody]:
+        return self.article_bodies.get(article_id)
+
+    def daily(self, user_id: int, day: str, read_ids: AbstractSet[int] = frozenset()) -> Optional[CachedBody]:
+        """Карточка дня: детерминированный выбор по пользователю и дню.
+
+        Позиция — хэш (user_id, day) по массиву id; прочитанные статьи
+        пропускаются линейным пробированием. Если прочитано всё —
+        статья с исходной позиции.
+        """
+        if not self.ids:
+            return None
+        seed = hashlib.blake2b(f"{user_id}:{day}".encode(), digest_size=8).digest()
+        start = int.from_bytes(seed, "big") % len(self.ids)
+        if read_ids:
+            for offset in range(len(self.ids)):
+                position = (start + offset) % len(self.ids)
+                if self.ids[position] not in read_ids:
+                    return self.ordered_bodies[position]
+        return self.ordered_bodies[start]
+
+
+_catalog = ArticleCatalog(())
+
+
+def get_article_catalog() -> ArticleCatalog:
+    """Текущий каталог статей."""
+    return _catalog
+
+
+async def _read_version(db) -> Tuple[int, int, str]:
+    async with db.execute(VERSION_QUERY) as cursor:
+        max_id, count, updated_at = await cursor.fetchone()
+    return max_id, count, updated_at
+
+
+async def load_article_catalog(db) -> ArticleCatalog:
+    """Читает статьи из БД и заменяет каталог целиком."""
+    global _catalog
+
+    version = await _read_version(db)
+    async with db.execute(ARTICLES_QUERY) as cursor:
+        rows = await cursor.fetchall()
+
+    articles: List[Dict] = [
+        {
+            "id": article_id,
+            "title": title,
+            "content": content,
+            "category": category,
+            "read_time": read_time or DEFAULT_READ_TIME,
+            "order_index": order_index or 0,
+        }
+        for article_id, title, content, category, read_time, order_index in rows
+    ]
+    _catalog = ArticleCatalog(tuple(articles), version)
+    return _catalog
+
+
+async def refresh_article_catalog(db) -> bool:
+    """Перестраивает каталог, если статьи пересеяны. True — каталог обновлён."""
+    if await _read_version(db) == _catalog.version:
+        return False
+    catalog = await load_article_catalog(db)
+    print(f"[OK] Article catalog reloaded: {len(catalog.articles)} articles")
+    return True
+
+
+async def run_article_refresh(pool: ConnectionPool):
+    """Периодически сверяет версию каталога с таблицей articles."""
+    interval = settings.ARTICLE_CATALOG_CHECK_SECONDS
+    if interval <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with pool.reader() as db:
+                await refresh_article_catalog(db)
+        except Exception as e:
+            print(f"[Articles] Error: {e}")
@@ -2,18 +2,42 @@ import aiosqlite
 from app.config import settings
 from app.db.schema_v3 import SCHEMA_V3, migrate_add_reminders
 from app.db.seed_tests import seed_tests_to_db
+from app.db.test_catalog import sync_catalog_ids, validate_catalog, get_catalog
+from app.db.article_catalog import load_article_catalog
+from app.db.pool import ConnectionPool
+from app.services.reminder_scheduler import backfill_reminder_schedule
+from app.services.user_stats import backfill_user_stats
 
 DATABASE_PATH = settings.DATABASE_URL.replace("sqlite:///", "")
 
+# Пул соединений открывается в lifespan приложения (см. app/main.py)
+pool = ConnectionPool(
+    DATABASE_PATH,
+    readers=settings.DB_POOL_READERS,
+    journal_mode=settings.DB_JOURNAL_MODE,
+)
+
+
+async def open_pool():
+    """Открыть пул соединений."""
+    await pool.open()
+
+
+async def close_pool():
+    """Закрыть пул соединений."""
+    await pool.close()
+
 
 async def get_db():
-    """Получить соединение с БД."""
-    db = await aiosqlite.connect(DATABASE_PATH)
-    db.row_factory = aiosqlite.Row
-    try:
+    """Получить соединение для записи (через очередь единственного писателя)."""
+    async with pool.writer() as db:
+        yield db
+
+
+async def get_read_db():
+    """Получить соединение только для чтения."""
+    async with pool.reader() as db:
         yield db
-    finally:
-        await db.close()
 
 
 async def init_db():
@@ -26,12 +50,26 @@ async def init_db():
         # Миграция: добавляем поля для уведомлений
         await migrate_add_reminders(db)
 
+        # Данные для строк, созданных до новых колонок и таблиц
+        scheduled = await backfill_reminder_schedule(db)
+        if scheduled:
+            print(f"[OK] Scheduled reminders for {scheduled} users")
+        backfilled = await backfill_user_stats(db)
+        if backfilled:
+            print(f"[OK] Built user stats for {backfilled} users")
+        await db.commit()
+
         # Seed tests if empty
         try:
             await seed_tests_to_db(db)
         except Exception as e:
             print(f"[WARN] Could not seed tests: {e}")
 
+        # Каталог тестов в памяти должен совпадать с id в таблице tests
+        await sync_catalog_ids(db)
+        for problem in validate_catalog(get_catalog()):
+            print(f"[WARN] Test interpretation: {problem}")
+
         # Seed articles if empty
         cursor = await db.execute("SELECT COUNT(*) FROM articles")
         count = (await cursor.fetchone())[0]
@@ -42,3 +80,7 @@ async def init_db():
                 print("[OK] Articles seeded")
             except Exception as e:
                 print(f"[WARN] Could not seed articles: {e}")
+
+        # Статьи отдаются из памяти
+        catalog = await load_article_catalog(db)
+        print(f"[OK] Article catalog loaded: {len(catalog.articles)} articles")
@@ -0,0 +1,191 @@
+"""
+Пул долгоживущих соединений с SQLite.
+
+Открывается один раз в lifespan приложения:
+- одно соединение-писатель, которым владеет фоновая задача-писатель:
+  все записи встают в одну очередь и выполняются строго по одной;
+- несколько соединений-читателей (query_only). В режиме WAL читатели
+  не ждут писателя.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiosqlite
+
+from app.config import settings
+
+
+# PRAGMA, выполняемые на каждом новом соединении
+CONNECTION_PRAGMAS = (
+    f"PRAGMA busy_timeout = {settings.DB_BUSY_TIMEOUT_MS}",
+    f"PRAGMA synchronous = {settings.DB_SYNCHRONOUS}",
+    f"PRAGMA cache_size = -{settings.DB_CACHE_SIZE_KB}",
+    f"PRAGMA mmap_size = {settings.DB_MMAP_SIZE}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Как давно соединение должно простаивать, чтобы перед выдачей проверить его SELECT 1
+HEALTHCHECK_IDLE_SECONDS = 30.0
+
+
+class PooledConnection:
+    """Соединение из пула с отметкой последнего использования."""
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+        self.last_used = time.monotonic()
+
+
+class WriteLease:
+    """Заявка на соединение-писатель в очереди задачи-писателя."""
+
+    def __init__(self):
+        self.granted: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.released = asyncio.Event()
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений: один писатель и N читателей."""
+
+    def __init__(self, path: str, readers: int = 4, journal_mode: str = "WAL"):
+        self.path = path
+        self.readers_count = max(1, readers)
+        self.journal_mode = journal_mode
+        self._readers: Optional[asyncio.Queue] = None
+        self._writer: Optional[PooledConnection] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._all: list = []
+        self.closed = True
+
+    async def open(self):
+        """Открывает все соединения пула и запускает задачу-писатель."""
+        self._readers = asyncio.Queue(maxsize=self.readers_count)
+        self._write_queue = asyncio.Queue()
+        self._writer = await self._connect(readonly=False)
+
+        # journal_mode сохраняется в файле БД, достаточно выставить его один раз
+        cursor = await self._writer.conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        mode = (await cursor.fetchone())[0]
+
+        for _ in range(self.readers_count):
+            self._readers.put_nowait(await self._connect(readonly=True))
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self.closed = False
+        print(f"[OK] DB pool opened: journal_mode={mode}, 1 writer, {self.readers_count} readers")
+
+    async def close(self):
+        """Останавливает задачу-писатель и закрывает все соединения пула."""
+        self.closed = True
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        for pooled in self._all:
+            try:
+                await pooled.conn.close()
+            except Exception as e:
+                print(f"[WARN] Could not close pooled connection: {e}")
+        self._all = []
+        self._writer = None
+        self._readers = None
+        self._write_queue = None
+
+    async def _connect(self, readonly: bool) -> PooledConnection:
+        conn = await aiosqlite.connect(self.path)
+        conn.row_factory = aiosqlite.Row
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        if readonly:
+            await conn.execute("PRAGMA query_only = ON")
+        pooled = PooledConnection(conn)
+        self._all.append(pooled)
+        return pooled
+
+    async def _ensure_healthy(self, pooled: PooledConnection, readonly: bool) -> PooledConnection:
+        """Проверяет соединение после простоя и пересоздаёт его при ошибке."""
+        if time.monotonic() - pooled.last_used < HEALTHCHECK_IDLE_SECONDS:
+            return pooled
+        try:
+            await pooled.conn.execute("SELECT 1")
+            return pooled
+        except Exception as e:
+            print(f"[WARN] Pooled connection is broken, reconnecting: {e}")
+            if pooled in self._all:
+                self._all.remove(pooled)
+            try:
+                await pooled.conn.close()
+            except Exception:
+                pass
+            return await self._connect(readonly=readonly)
+
+    async def _release(self, pooled: PooledConnection):
+        """Откатывает незавершённую транзакцию перед возвратом в пул."""
+        if pooled.conn.in_transaction:
+            await pooled.conn.rollback()
+        pooled.last_used = time.monotonic()
+
+    async def _writer_loop(self):
+        """Задача-писатель: выдаёт соединение заявкам из очереди строго по одной."""
+        while True:
+            lease = await self._write_queue.get()
+            if lease.granted.cancelled():
+                # Запрос отменили, пока он стоял в очереди
+                continue
+            try:
+                self._writer = await self._ensure_healthy(self._writer, readonly=False)
+                lease.granted.set_result(self._writer.conn)
+                await lease.released.wait()
+                await self._release(self._writer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Pool] Writer error: {e}")
+                if not lease.granted.done():
+                    lease.granted.set_exception(e)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Выдаёт соединение-писатель, когда до заявки дойдёт очередь."""
+        if self.closed:
+            raise RuntimeError("Connection pool is not open")
+        lease = WriteLease()
+        self._write_queue.put_nowait(lease)
+        try:
+            conn = await lease.granted
+        except asyncio.CancelledError:
+            # Соединение могли выдать одновременно с отменой — возвращаем его
+            lease.released.set()
+            raise
+        try:
+            yield conn
+        finally:
+            lease.released.set()
+
+    async def run_write(self, func):
+        """Выполняет func(conn) через очередь писателя и фиксирует транзакцию."""
+        async with self.writer() as conn:
+            result = await func(conn)
+            await conn.commit()
+            return result
+
+    @asynccontextmanager
+    async def reader(self):
+        """Выдаёт соединение-читатель (ждёт, если все заняты)."""
+        if self.closed:
+            raise RuntimeError("Connection pool is not open")
+        pooled = await self._readers.get()
+        try:
+            pooled = await self._ensure_healthy(pooled, readonly=True)
+            yield pooled.conn
+        finally:
+            try:
+                await self._release(pooled)
+            finally:
+                self._readers.put_nowait(pooled)
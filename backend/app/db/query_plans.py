@@ -0,0 +1,130 @@
+"""
+Проверка планов запросов (EXPLAIN QUERY PLAN).
+
+Собирает схему во временной БД в памяти и проверяет, что рабочие запросы
+не читают таблицы целиком. SQL берётся из констант модулей, которые его
+выполняют, поэтому правка запроса сразу попадает в проверку. Новый запрос
+к пользовательским данным нужно вынести в такую константу и добавить
+в QUERIES; полный проход допустим только там, где он задуман
+(full_scan=True).
+
+Запуск (из папки backend), код возврата 1 при регрессии:
+    python -m app.db.query_plans
+"""
+
+import asyncio
+import re
+import sys
+
+import aiosqlite
+
+from app.db.schema_v3 import SCHEMA_V3, migrate_add_reminders
+from app.db.article_catalog import ARTICLES_QUERY, VERSION_QUERY
+from app.db.seed_articles import STALE_READS_QUERY
+from app.api import articles, auth, checkins, diary, money, tests
+from app.api.bootstrap import BOOTSTRAP_QUERY
+from app.services import outbox, reminder_scheduler, streaks, test_engine, user_stats
+from app.services.search import ARTICLES_SEARCH_QUERY, DIARY_SEARCH_QUERY
+
+# Подстановка для запросов со списком значений в IN (...)
+PLACEHOLDERS = "?, ?"
+USER_FILTER = f"AND user_id IN ({PLACEHOLDERS})"
+
+# (где используется, SQL, full_scan)
+QUERIES = (
+    # auth
+    ("auth.me", f"SELECT {auth.ME_COLUMNS} FROM users u {auth.ME_JOINS} WHERE u.id = ?", False),
+    ("auth.login", auth.LOGIN_QUERY, False),
+    ("auth.recover", auth.RECOVER_QUERY, False),
+    ("auth.refresh", auth.TOKEN_GENERATION_QUERY, False),
+    *((f"auth.reset {sql.split()[2]}", sql, False) for sql in auth.RESET_DELETE_QUERIES),
+    # bootstrap
+    ("bootstrap", BOOTSTRAP_QUERY, False),
+    # checkins
+    ("checkins.list", checkins.CHECKINS_LIST_QUERY, False),
+    ("checkins.today", checkins.CHECKINS_TODAY_QUERY, False),
+    ("checkins.batch dedup", checkins.CHECKINS_BY_CLIENT_ID_QUERY.format(placeholders=PLACEHOLDERS), False),
+    # streaks
+    ("streaks.state", streaks.STREAK_STATE_QUERY, False),
+    ("streaks.replay", streaks.STREAK_REPLAY_QUERY, False),
+    ("streaks.audit", streaks.AUDIT_CHECKINS_QUERY, True),
+    ("streaks.audit empty", streaks.AUDIT_EMPTY_QUERY, True),
+    ("streaks.audit repair", streaks.AUDIT_REPAIR_QUERY, False),
+    # tests
+    ("tests.history snapshot", test_engine.TEST_HISTORY_SNAPSHOT_QUERY, False),
+    ("tests.hint history", test_engine.TEST_HISTORY_QUERY, False),
+    ("tests.history", tests.TEST_HISTORY_LIST_QUERY, False),
+    ("tests.analytics profile", tests.ANALYTICS_PROFILE_QUERY, False),
+    ("tests.analytics daily", tests.ANALYTICS_DAILY_QUERY.format(placeholders=PLACEHOLDERS), False),
+    ("tests.analytics weekly", tests.ANALYTICS_WEEKLY_QUERY.format(placeholders=PLACEHOLDERS), False),
+    ("tests.profile", test_engine.USER_PROFILE_QUERY, False),
+    # diary
+    ("diary.list", diary.DIARY_LIST_QUERY, False),
+    ("diary.stats", diary.DIARY_STATS_QUERY, False),
+    ("diary.delete", diary.DIARY_DELETE_QUERY, False),
+    ("diary.delete emotions", diary.DIARY_DELETE_EMOTIONS_QUERY, False),
+    ("diary.analytics top", diary.ANALYTICS_TOP_QUERY, False),
+    ("diary.analytics weekly", diary.ANALYTICS_WEEKLY_QUERY, False),
+    ("diary.analytics intensity", diary.ANALYTICS_INTENSITY_QUERY, False),
+    # money
+    ("money.entries", money.MONEY_ENTRIES_QUERY, False),
+    ("money.stats", money.MONEY_STATS_QUERY, False),
+    # user_stats
+    ("user_stats.rebuild money", user_stats.REBUILD_MONEY_QUERY.format(user_filter=USER_FILTER), False),
+    ("user_stats.rebuild diary", user_stats.REBUILD_DIARY_QUERY.format(user_filter=USER_FILTER), False),
+    # Полная пересборка (python -m app.services.user_stats) читает таблицы целиком
+    ("user_stats.rebuild all money", user_stats.REBUILD_MONEY_QUERY.format(user_filter=""), True),
+    ("user_stats.rebuild all diary", user_stats.REBUILD_DIARY_QUERY.format(user_filter=""), True),
+    ("user_stats.backfill", user_stats.BACKFILL_QUERY, True),
+    # articles
+    # Каталог читается целиком при старте и после пересева
+    ("articles.catalog", ARTICLES_QUERY, True),
+    ("articles.catalog version", VERSION_QUERY, True),
+    ("articles.daily reads", articles.DAILY_READS_QUERY, False),
+    ("articles.mark read", articles.MARK_READ_QUERY, False),
+    # Пересев: прочтения удалённых статей (редко, таблица читается целиком)
+    ("articles.seed stale reads", STALE_READS_QUERY, True),
+    # reminders
+    ("reminders.claim", reminder_scheduler.REMINDERS_CLAIM_QUERY, False),
+    ("reminders.next", reminder_scheduler.REMINDERS_NEXT_QUERY, False),
+    # outbox
+    ("outbox.claim", outbox.OUTBOX_CLAIM_QUERY, False),
+    ("outbox.next", outbox.OUTBOX_NEXT_QUERY, False),
+    ("outbox.purge", outbox.OUTBOX_PURGE_QUERY, False),
+    # search (FTS5)
+    ("search.articles", ARTICLES_SEARCH_QUERY, False),
+    ("search.diary", DIARY_SEARCH_QUERY, False),
+)
+
+# Полное чтение таблицы: "SCAN t" без индекса (SCAN ... USING INDEX — это проход по индексу)
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+async def check_plans() -> list:
+    """Возвращает список (имя запроса, строка плана) с полным чтением таблиц."""
+    failures = []
+    async with aiosqlite.connect(":memory:") as db:
+        await db.executescript(SCHEMA_V3)
+        await migrate_add_reminders(db)
+
+        for name, sql, full_scan_ok in QUERIES:
+            params = (1,) * sql.count("?")
+            async with db.execute(f"EXPLAIN QUERY PLAN {sql}", params) as cursor:
+                plan = [row[3] for row in await cursor.fetchall()]
+            scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+            status = "SCAN" if scans else "OK"
+            if scans and full_scan_ok:
+                status = "SCAN (expected)"
+            print(f"[{status}] {name}: {' | '.join(plan)}")
+            if scans and not full_scan_ok:
+                failures.extend((name, detail) for detail in scans)
+    return failures
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(check_plans())
+    if failures:
+        for name, detail in failures:
+            print(f"[WARN] Full table scan in {name}: {detail}")
+        sys.exit(1)
+    print(f"[OK] {len(QUERIES)} query plans checked")
@@ -2,6 +2,8 @@
 Схема базы данных v3 — с поддержкой дневника мыслей и финансов.
 """
 
+import sqlite3
+
 SCHEMA_V3 = """
 -- =============================================
 -- ПОЛЬЗОВАТЕЛИ
@@ -13,8 +15,12 @@ CREATE TABLE IF NOT EXISTS users (
     recovery_code TEXT UNIQUE NOT NULL,
     telegram_id INTEGER,                    -- для отправки уведомлений
     reminder_enabled BOOLEAN DEFAULT TRUE,
-    reminder_hour INTEGER DEFAULT 20,       -- час напоминания (0-23)
+    reminder_hour INTEGER DEFAULT 20,       -- час напоминания (0-23) по времени пользователя
+    reminder_minute INTEGER DEFAULT 0,      -- минута напоминания (0-59)
+    reminder_next_at TIMESTAMP,             -- следующее напоминание в UTC (NULL — не назначено)
     last_reminder_date DATE,                -- дата последнего напоминания
+    timezone TEXT,                          -- часовой пояс IANA (NULL — по умолчанию)
+    token_generation INTEGER DEFAULT 0,     -- поколение refresh-токенов (+1 — старые недействительны)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -107,6 +113,7 @@ CREATE TABLE IF NOT EXISTS checkins (
     relapse BOOLEAN DEFAULT FALSE,
     note TEXT,
     loss_amount INTEGER,               -- сумма потерь при срыве
+    client_id TEXT,                    -- ключ идемпотентности офлайн-синхронизации
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
     FOREIGN KEY (user_id) REFERENCES users(id)
@@ -208,7 +215,20 @@ CREATE TABLE IF NOT EXISTS articles (
     category TEXT NOT NULL,
     read_time TEXT DEFAULT '3 мин',
     order_index INTEGER DEFAULT 0,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP                    -- последнее изменение при пересеве (версия каталога)
+);
+
+-- Прочитанные статьи (карточка дня их пропускает).
+-- seed_articles обновляет статьи на месте, id сохраняются; прочтения
+-- удалённых статей он удаляет сам
+CREATE TABLE IF NOT EXISTS article_reads (
+    user_id INTEGER NOT NULL,
+    article_id INTEGER NOT NULL,
+    read_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (user_id, article_id),
+    FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
 -- =============================================
@@ -224,14 +244,70 @@ CREATE TABLE IF NOT EXISTS sos_events (
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- Эмоции записей дневника по одной на строку (для агрегатов в SQL);
+-- emotions_json в thought_entries остаётся для выдачи записей
+CREATE TABLE IF NOT EXISTS thought_entry_emotions (
+    entry_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    emotion TEXT NOT NULL,
+
+    FOREIGN KEY (entry_id) REFERENCES thought_entries(id),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- =============================================
+-- СВОДКА ПО ПОЛЬЗОВАТЕЛЮ
+-- =============================================
+
+-- Обновляется в тех же транзакциях, что и money_entries / thought_entries
+-- (app/services/user_stats.py); пересборка: python -m app.services.user_stats
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY,
+    loss_total INTEGER NOT NULL DEFAULT 0,       -- сумма потерь (money_entries, loss)
+    loss_count INTEGER NOT NULL DEFAULT 0,
+    diary_count INTEGER NOT NULL DEFAULT 0,      -- записей в дневнике
+    emotion_counts_json TEXT NOT NULL DEFAULT '{}',  -- {"anxiety": 3, ...}
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- =============================================
+-- ИСХОДЯЩИЕ СООБЩЕНИЯ TELEGRAM (OUTBOX)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,                   -- метод Bot API (sendMessage, ...)
+    payload_json TEXT NOT NULL,
+    chat_id INTEGER,                        -- для лимита сообщений на чат
+    dedup_key TEXT UNIQUE,                  -- повторная постановка с тем же ключом игнорируется
+    status TEXT NOT NULL DEFAULT 'pending', -- pending, sent, dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
 -- =============================================
 -- ИНДЕКСЫ
 -- =============================================
 
 CREATE INDEX IF NOT EXISTS idx_checkins_user_date ON checkins(user_id, created_at);
-CREATE INDEX IF NOT EXISTS idx_test_results_user ON test_results(user_id);
+CREATE INDEX IF NOT EXISTS idx_test_results_user_date ON test_results(user_id, created_at);
+-- История тестов (MAX(created_at) по test_id) и аналитика — только по индексу
+CREATE INDEX IF NOT EXISTS idx_test_results_user_test ON test_results(user_id, test_id, created_at, total_score);
 CREATE INDEX IF NOT EXISTS idx_thought_entries_user ON thought_entries(user_id, created_at);
+-- Аналитика идёт от записей пользователя за период (idx_thought_entries_user) к их эмоциям
+CREATE INDEX IF NOT EXISTS idx_thought_entry_emotions_entry ON thought_entry_emotions(entry_id);
 CREATE INDEX IF NOT EXISTS idx_money_entries_user ON money_entries(user_id, created_at);
+-- Сумма и количество потерь — только по индексу
+CREATE INDEX IF NOT EXISTS idx_money_entries_user_type ON money_entries(user_id, entry_type, amount);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category, order_index);
+CREATE INDEX IF NOT EXISTS idx_articles_order ON articles(order_index);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, created_at);
 """
 
 
@@ -310,6 +386,78 @@ async def migrate_to_v3(db):
     print("✅ Migrated to v3")
 
 
+# Полнотекстовый поиск (FTS5) по статьям и дневнику. Индексы без копии
+# текста (content=...), синхронизируются триггерами. unicode61 приводит
+# кириллицу к нижнему регистру; окончания отбрасываются при разборе
+# запроса (app/services/search.py). user_id в индексе дневника — только
+# для отбора записей пользователя, в ранжировании его вес 0.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, content,
+    content='articles', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+INSERT INTO articles_fts(articles_fts, rank) VALUES('rank', 'bm25(10.0, 1.0)');
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, content ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS thought_entries_fts USING fts5(
+    situation, thought, reaction, user_id,
+    content='thought_entries', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+INSERT INTO thought_entries_fts(thought_entries_fts, rank) VALUES('rank', 'bm25(1.0, 1.0, 1.0, 0.0)');
+
+CREATE TRIGGER IF NOT EXISTS thought_entries_fts_insert AFTER INSERT ON thought_entries BEGIN
+    INSERT INTO thought_entries_fts(rowid, situation, thought, reaction, user_id)
+    VALUES (new.id, new.situation, new.thought, new.reaction, new.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS thought_entries_fts_delete AFTER DELETE ON thought_entries BEGIN
+    INSERT INTO thought_entries_fts(thought_entries_fts, rowid, situation, thought, reaction, user_id)
+    VALUES ('delete', old.id, old.situation, old.thought, old.reaction, old.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS thought_entries_fts_update
+AFTER UPDATE OF situation, thought, reaction, user_id ON thought_entries BEGIN
+    INSERT INTO thought_entries_fts(thought_entries_fts, rowid, situation, thought, reaction, user_id)
+    VALUES ('delete', old.id, old.situation, old.thought, old.reaction, old.user_id);
+    INSERT INTO thought_entries_fts(rowid, situation, thought, reaction, user_id)
+    VALUES (new.id, new.situation, new.thought, new.reaction, new.user_id);
+END;
+"""
+
+
+async def migrate_search_index(db):
+    """Создаёт индексы поиска и заполняет их по существующим строкам."""
+    cursor = await db.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name IN ('articles_fts', 'thought_entries_fts')"
+    )
+    if (await cursor.fetchone())[0] == 2:
+        return
+
+    try:
+        await db.executescript(SEARCH_SCHEMA)
+    except sqlite3.OperationalError as e:
+        # SQLite собран без FTS5 — приложение работает, /search отвечает 503
+        print(f"[WARN] Search index is not available: {e}")
+        return
+
+    await db.execute("INSERT INTO articles_fts(articles_fts) VALUES('rebuild')")
+    await db.execute("INSERT INTO thought_entries_fts(thought_entries_fts) VALUES('rebuild')")
+    await db.commit()
+    print("[OK] Search index built")
+
+
 async def migrate_add_reminders(db):
     """Миграция: добавляет поля для уведомлений и другие недостающие колонки."""
 
@@ -319,6 +467,10 @@ async def migrate_add_reminders(db):
         ("reminder_enabled", "BOOLEAN DEFAULT TRUE"),
         ("reminder_hour", "INTEGER DEFAULT 20"),
         ("last_reminder_date", "DATE"),
+        ("timezone", "TEXT"),
+        ("reminder_minute", "INTEGER DEFAULT 0"),
+        ("reminder_next_at", "TIMESTAMP"),
+        ("token_generation", "INTEGER DEFAULT 0"),
     ]
 
     for col_name, col_type in columns_to_add:
@@ -335,6 +487,13 @@ async def migrate_add_reminders(db):
     except:
         pass  # Колонка уже существует
 
+    # Добавляем updated_at в articles (версия каталога статей)
+    try:
+        await db.execute("ALTER TABLE articles ADD COLUMN updated_at TIMESTAMP")
+        print("[OK] Added column articles.updated_at")
+    except:
+        pass  # Колонка уже существует
+
     # Добавляем reaction в thought_entries (схема СМЭР)
     try:
         await db.execute("ALTER TABLE thought_entries ADD COLUMN reaction TEXT")
@@ -342,8 +501,52 @@ async def migrate_add_reminders(db):
     except:
         pass  # Колонка уже существует
 
+    # Добавляем client_id в checkins (идемпотентность пакетной синхронизации)
+    try:
+        await db.execute("ALTER TABLE checkins ADD COLUMN client_id TEXT")
+        print("[OK] Added column checkins.client_id")
+    except:
+        pass  # Колонка уже существует
+
+    # Индексы по новым колонкам создаём здесь, а не в SCHEMA_V3: в старых БД колонок ещё нет
+    await db.execute(
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_checkins_user_client
+           ON checkins(user_id, client_id) WHERE client_id IS NOT NULL"""
+    )
+    await db.execute(
+        """CREATE INDEX IF NOT EXISTS idx_users_reminder_due
+           ON users(reminder_next_at) WHERE reminder_next_at IS NOT NULL"""
+    )
+
+    # Планировщик больше не ищет пользователей по reminder_hour
+    await db.execute("DROP INDEX IF EXISTS idx_users_reminder")
+
+    # Заменён индексами idx_test_results_user_date и idx_test_results_user_test
+    await db.execute("DROP INDEX IF EXISTS idx_test_results_user")
+
+    # Ни один запрос не читал эмоции по (user_id, emotion)
+    await db.execute("DROP INDEX IF EXISTS idx_thought_entry_emotions_user")
+
+    # Раскладываем emotions_json старых записей в thought_entry_emotions
+    # (только строки из массивов; битый JSON пропускаем). Новые записи
+    # пишутся сразу в обе таблицы, поэтому смотрим только записи новее
+    # последней разложенной.
+    cursor = await db.execute(
+        """INSERT INTO thought_entry_emotions (entry_id, user_id, emotion)
+           SELECT e.id, e.user_id, j.value
+           FROM thought_entries e,
+                json_each(CASE WHEN json_valid(e.emotions_json) THEN e.emotions_json ELSE '[]' END) j
+           WHERE e.id > COALESCE((SELECT MAX(entry_id) FROM thought_entry_emotions), 0)
+             AND typeof(j.key) = 'integer' AND j.type = 'text'
+             AND NOT EXISTS (SELECT 1 FROM thought_entry_emotions t WHERE t.entry_id = e.id)"""
+    )
+    if cursor.rowcount > 0:
+        print(f"[OK] Backfilled {cursor.rowcount} diary emotions")
+
     await db.commit()
 
+    await migrate_search_index(db)
+
 
 if __name__ == "__main__":
     import asyncio
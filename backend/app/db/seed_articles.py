@@ -5,6 +5,18 @@
 import asyncio
 import aiosqlite
 
+from app.db.article_catalog import load_article_catalog
+
+# Скорость чтения для оценки read_time (слов в минуту)
+READING_WORDS_PER_MINUTE = 180
+
+
+def estimate_read_time(content: str) -> str:
+    """Время чтения статьи: «N мин», не меньше минуты."""
+    minutes = -(-len(content.split()) // READING_WORDS_PER_MINUTE)
+    return f"{max(minutes, 1)} мин"
+
+
 ARTICLES = [
     {
         "title": "Как работает мотивационная система",
@@ -120,8 +132,20 @@ ARTICLES = [
 ]
 
 
+# Время изменения с миллисекундами: два пересева подряд дают разные версии каталога
+UPDATED_AT = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+# Прочтения статьи, удалённой при пересеве
+STALE_READS_QUERY = "DELETE FROM article_reads WHERE article_id = ?"
+
+
 async def seed_articles(db=None):
-    """Заполняет базу статьями."""
+    """Заполняет базу статьями.
+
+    Статьи сопоставляются по заголовку и обновляются на месте, поэтому
+    их id (а с ними прочтения в article_reads) переживают пересев.
+    Статьи, которых больше нет в ARTICLES, удаляются вместе с прочтениями.
+    """
     should_close = False
     if db is None:
         from app.config import settings
@@ -129,21 +153,49 @@ async def seed_articles(db=None):
         db = await aiosqlite.connect(db_path)
         should_close = True
     try:
-        # Очищаем таблицу
-        await db.execute("DELETE FROM articles")
-        
-        # Вставляем статьи
+        cursor = await db.execute("SELECT id, title FROM articles ORDER BY id")
+        existing = {}
+        stale = []
+        for article_id, title in await cursor.fetchall():
+            if title in existing:
+                stale.append(article_id)
+            else:
+                existing[title] = article_id
+
         for i, article in enumerate(ARTICLES):
-            await db.execute(
-                """
-                INSERT INTO articles (title, content, category, order_index)
-                VALUES (?, ?, ?, ?)
-                """,
-                (article["title"], article["content"], article["category"], i)
-            )
-        
+            values = (article["content"], article["category"], estimate_read_time(article["content"]), i)
+            article_id = existing.pop(article["title"], None)
+            if article_id is None:
+                await db.execute(
+                    f"""
+                    INSERT INTO articles (content, category, read_time, order_index, title, updated_at)
+                    VALUES (?, ?, ?, ?, ?, {UPDATED_AT})
+                    """,
+                    values + (article["title"],)
+                )
+            else:
+                # updated_at меняется, только если статья действительно изменилась
+                await db.execute(
+                    f"""
+                    UPDATE articles
+                    SET content = ?, category = ?, read_time = ?, order_index = ?, updated_at = {UPDATED_AT}
+                    WHERE id = ? AND (content IS NOT ? OR category IS NOT ? OR read_time IS NOT ?
+                                      OR order_index IS NOT ?)
+                    """,
+                    values + (article_id,) + values
+                )
+
+        # Статьи, которых больше нет в ARTICLES (и дубли заголовков)
+        stale.extend(existing.values())
+        if stale:
+            await db.executemany("DELETE FROM articles WHERE id = ?", [(i,) for i in stale])
+            await db.executemany(STALE_READS_QUERY, [(i,) for i in stale])
+
         await db.commit()
         print(f"[OK] Seeded {len(ARTICLES)} articles")
+
+        # Каталог в памяти должен отдавать новые статьи
+        await load_article_catalog(db)
     finally:
         if should_close:
             await db.close()
@@ -7,9 +7,7 @@ import asyncio
 import aiosqlite
 import json
 
-from app.db.tests_level_a import LEVEL_A_TESTS
-from app.db.tests_level_b import LEVEL_B_TESTS
-from app.db.tests_level_cd import LEVEL_C_TESTS, LEVEL_D_TESTS
+from app.db.test_catalog import get_catalog
 
 
 async def seed_tests_to_db(db: aiosqlite.Connection):
@@ -22,27 +20,9 @@ async def seed_tests_to_db(db: aiosqlite.Connection):
             print(f"[OK] Tests already seeded ({count} tests)")
             return
 
-    test_id = 1
-
-    # Уровень A
-    for code, test in LEVEL_A_TESTS.items():
-        await _insert_test(db, test_id, test)
-        test_id += 1
-
-    # Уровень B
-    for code, test in LEVEL_B_TESTS.items():
-        await _insert_test(db, test_id, test)
-        test_id += 1
-
-    # Уровень C
-    for code, test in LEVEL_C_TESTS.items():
-        await _insert_test(db, test_id, test)
-        test_id += 1
-
-    # Уровень D
-    for code, test in LEVEL_D_TESTS.items():
-        await _insert_test(db, test_id, test)
-        test_id += 1
+    # Уровни A, B, C, D — id берём из каталога
+    for test in get_catalog().tests:
+        await _insert_test(db, test.id, test.data)
 
     await db.commit()
 
@@ -64,31 +44,18 @@ async def seed_tests():
         await db.execute("DELETE FROM test_questions")
         await db.execute("DELETE FROM tests")
         
-        test_id = 1
-        
-        # Уровень A
-        print("📝 Добавляем тесты уровня A (онбординг)...")
-        for code, test in LEVEL_A_TESTS.items():
-            await _insert_test(db, test_id, test)
-            test_id += 1
-        
-        # Уровень B
-        print("📝 Добавляем тесты уровня B (ежедневные)...")
-        for code, test in LEVEL_B_TESTS.items():
-            await _insert_test(db, test_id, test)
-            test_id += 1
-        
-        # Уровень C
-        print("📝 Добавляем тесты уровня C (еженедельные)...")
-        for code, test in LEVEL_C_TESTS.items():
-            await _insert_test(db, test_id, test)
-            test_id += 1
-        
-        # Уровень D
-        print("📝 Добавляем тесты уровня D (событийные)...")
-        for code, test in LEVEL_D_TESTS.items():
-            await _insert_test(db, test_id, test)
-            test_id += 1
+        catalog = get_catalog()
+        level_names = {
+            "A": "онбординг",
+            "B": "ежедневные",
+            "C": "еженедельные",
+            "D": "событийные",
+        }
+
+        for level, name in level_names.items():
+            print(f"📝 Добавляем тесты уровня {level} ({name})...")
+            for test in catalog.by_level.get(level, ()):
+                await _insert_test(db, test.id, test.data)
         
         await db.commit()
         
@@ -0,0 +1,237 @@
+"""
+Каталог тестов в памяти.
+
+Строится из LEVEL_*_TESTS один раз при импорте. Числовые id совпадают
+с id в таблице tests: seed_tests назначает их в том же порядке (A, B, C, D).
+При старте sync_catalog_ids() сверяет их с БД, поэтому горячие запросы
+работают только с test_results, без JOIN tests.
+"""
+
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from app.db.tests_level_a import LEVEL_A_TESTS
+from app.db.tests_level_b import LEVEL_B_TESTS
+from app.db.tests_level_cd import LEVEL_C_TESTS, LEVEL_D_TESTS
+
+# Порядок уровней определяет порядок id в таблице tests
+LEVELS = (
+    ("A", LEVEL_A_TESTS),
+    ("B", LEVEL_B_TESTS),
+    ("C", LEVEL_C_TESTS),
+    ("D", LEVEL_D_TESTS),
+)
+
+# Кластеры ежедневных тестов (B) → метрики аналитики
+CLUSTER_METRICS = MappingProxyType({
+    "B1": "urge",
+    "B2": "impulse",
+    "B3": "triggers",
+    "B4": "emotions",
+    "B5": "stress",
+    "B6": "sleep",
+    "B7": "decisions",
+})
+
+
+# Диапазоны до этого размера компилируются в плотный массив score → результат,
+# более широкие — в таблицу для bisect
+DENSE_TABLE_LIMIT = 256
+
+# Уровни интерпретации, при которых рекомендуются действия
+CRISIS_LEVELS = frozenset({"high", "red", "problem_gambling", "vulnerable", "critical"})
+SOFT_LEVELS = frozenset({"yellow", "medium", "elevated", "moderate_risk"})
+
+
+def actions_for_level(level: str) -> Tuple[str, ...]:
+    """Рекомендуемые действия для уровня интерпретации."""
+    if level in CRISIS_LEVELS:
+        return ("offer_sos", "show_helplines")
+    if level in SOFT_LEVELS:
+        return ("soft_intervention",)
+    return ()
+
+
+class ScoreRange:
+    """Диапазон интерпретации результата теста (общий неизменяемый объект)."""
+
+    __slots__ = ("min", "max", "level", "message", "bot_message", "actions")
+
+    def __init__(self, min: int, max: int, level: str, message: str, bot_message: str):
+        self.min = min
+        self.max = max
+        self.level = level
+        self.message = message
+        self.bot_message = bot_message
+        self.actions = actions_for_level(level)
+
+
+class CompiledInterpretation:
+    """Скомпилированная таблица интерпретации: поиск результата по баллу.
+
+    При пересечении диапазонов побеждает первый в описании теста,
+    как при линейном просмотре.
+    """
+
+    __slots__ = ("dense", "starts", "bands")
+
+    def __init__(self, ranges: Tuple[ScoreRange, ...]):
+        self.dense: Optional[Tuple[Optional[ScoreRange], ...]] = None
+        self.starts: Tuple[int, ...] = ()
+        self.bands: Tuple[ScoreRange, ...] = ()
+
+        if not ranges:
+            return
+
+        low = min(r.min for r in ranges)
+        high = max(r.max for r in ranges)
+        if low >= 0 and high < DENSE_TABLE_LIMIT:
+            table: List[Optional[ScoreRange]] = [None] * (high + 1)
+            for r in ranges:
+                for score in range(r.min, r.max + 1):
+                    if table[score] is None:
+                        table[score] = r
+            self.dense = tuple(table)
+        else:
+            # Для bisect пересечения не допускаются: validate_catalog их отмечает
+            self.bands = tuple(sorted(ranges, key=lambda r: r.min))
+            self.starts = tuple(r.min for r in self.bands)
+
+    def lookup(self, score: int) -> Optional[ScoreRange]:
+        if self.dense is not None:
+            if 0 <= score < len(self.dense):
+                return self.dense[score]
+            return None
+        i = bisect_right(self.starts, score) - 1
+        if i >= 0 and score <= self.bands[i].max:
+            return self.bands[i]
+        return None
+
+
+class CatalogTest:
+    """Тест из каталога: исходное описание и предвычисленные поля."""
+
+    __slots__ = (
+        "id", "code", "level", "cluster", "name_ru", "data",
+        "ranges", "max_score", "interpretation",
+    )
+
+    def __init__(self, test_id: int, data: Dict):
+        interpretation = data.get("interpretation", {})
+        bot_responses = data.get("bot_responses", {})
+        self.id = test_id
+        self.code = data["code"]
+        self.level = data["level"]
+        self.cluster = data.get("cluster")
+        self.name_ru = data["name_ru"]
+        self.data = data
+        self.max_score = interpretation.get("max_score", 0)
+        # Порядок как в описании теста — он важен при пересечениях
+        self.ranges: Tuple[ScoreRange, ...] = tuple(
+            ScoreRange(
+                r["min"], r["max"], r["level"], r["message"],
+                bot_responses.get(r["level"], r["message"]),
+            )
+            for r in interpretation.get("ranges", [])
+        )
+        self.interpretation = CompiledInterpretation(self.ranges)
+
+    def interpret(self, score: int) -> Optional[ScoreRange]:
+        """Диапазон интерпретации для балла (None — балл вне диапазонов)."""
+        return self.interpretation.lookup(score)
+
+
+class TestCatalog:
+    """Неизменяемый реестр тестов с индексами по коду, id, уровню и кластеру."""
+
+    def __init__(self, tests: Tuple[CatalogTest, ...]):
+        self.tests = tests
+        self.by_code = MappingProxyType({t.code: t for t in tests})
+        self.by_id = MappingProxyType({t.id: t for t in tests})
+
+        by_level: Dict[str, list] = {}
+        by_cluster: Dict[str, list] = {}
+        for t in tests:
+            by_level.setdefault(t.level, []).append(t)
+            if t.cluster:
+                by_cluster.setdefault(t.cluster, []).append(t)
+        self.by_level = MappingProxyType({k: tuple(v) for k, v in by_level.items()})
+        self.by_cluster = MappingProxyType({k: tuple(v) for k, v in by_cluster.items()})
+
+    def get(self, code: str) -> Optional[CatalogTest]:
+        return self.by_code.get(code)
+
+    def get_by_id(self, test_id: int) -> Optional[CatalogTest]:
+        return self.by_id.get(test_id)
+
+    def codes(self, level: str) -> Tuple[str, ...]:
+        return tuple(t.code for t in self.by_level.get(level, ()))
+
+    def ids(self, level: str) -> Tuple[int, ...]:
+        return tuple(t.id for t in self.by_level.get(level, ()))
+
+
+def build_catalog(id_map: Optional[Dict[str, int]] = None) -> TestCatalog:
+    """Собирает каталог; id_map (code → id из БД) переопределяет порядковые id."""
+    tests = []
+    next_id = 1
+    for _, level_tests in LEVELS:
+        for code, data in level_tests.items():
+            test_id = id_map.get(code, next_id) if id_map else next_id
+            tests.append(CatalogTest(test_id, data))
+            next_id += 1
+    return TestCatalog(tuple(tests))
+
+
+_catalog = build_catalog()
+
+
+def get_catalog() -> TestCatalog:
+    """Текущий каталог тестов."""
+    return _catalog
+
+
+def validate_catalog(catalog: TestCatalog) -> List[str]:
+    """Ищет пересечения и пропуски в диапазонах интерпретации.
+
+    Возвращает список описаний проблем (пустой — всё в порядке).
+    """
+    issues = []
+    for test in catalog.tests:
+        if not test.ranges:
+            continue
+        ordered = sorted(test.ranges, key=lambda r: (r.min, r.max))
+        if ordered[0].min > 0:
+            issues.append(f"{test.code}: scores 0..{ordered[0].min - 1} are not covered")
+        for prev, cur in zip(ordered, ordered[1:]):
+            if cur.min <= prev.max:
+                issues.append(
+                    f"{test.code}: ranges {prev.level} ({prev.min}..{prev.max}) "
+                    f"and {cur.level} ({cur.min}..{cur.max}) overlap"
+                )
+            elif cur.min > prev.max + 1:
+                issues.append(f"{test.code}: scores {prev.max + 1}..{cur.min - 1} are not covered")
+        last_max = max(r.max for r in ordered)
+        if test.max_score and last_max < test.max_score:
+            issues.append(f"{test.code}: scores {last_max + 1}..{test.max_score} are not covered")
+    return issues
+
+
+async def sync_catalog_ids(db):
+    """Сверяет id каталога с таблицей tests и пересобирает каталог при расхождении."""
+    global _catalog
+
+    async with db.execute("SELECT id, code FROM tests") as cursor:
+        id_map = {code: test_id for test_id, code in await cursor.fetchall()}
+
+    if any(id_map.get(t.code, t.id) != t.id for t in _catalog.tests):
+        _catalog = build_catalog(id_map)
+        print("[WARN] Test ids in DB differ from catalog order, catalog rebuilt from DB ids")
+
+
+if __name__ == "__main__":
+    problems = validate_catalog(get_catalog())
+    for problem in problems:
+        print(f"[WARN] {problem}")
+    print(f"[OK] {len(get_catalog().tests)} tests, {len(problems)} interpretation issues")
@@ -229,7 +229,7 @@ LEVEL_A_TESTS = {
             "max_score": 18,
             "ranges": [
                 {"min": 0, "max": 3, "level": "normal", "message": "Нормальный цифровой паттерн."},
-                {"min": 5, "max": 8, "level": "medium", "message": "Умеренная цифровая зависимость — стоит наблюдать."},
+                {"min": 4, "max": 8, "level": "medium", "message": "Умеренная цифровая зависимость — стоит наблюдать."},
                 {"min": 9, "max": 18, "level": "high", "message": "Выраженная потеря контроля над цифровыми привычками."},
             ],
         },
@@ -281,15 +281,15 @@ LEVEL_A_TESTS = {
                 "code": "A5_Q6",
                 "question_ru": "Удаётся ли вам распознавать свои эмоции в моменте?",
                 "answer_type": "scale_0_3",
-                "scale_labels": ["Почти всегда", "Часто", "Иногда", "Никогда"],  # Обратная шкала!
-                "reverse_scoring": True,
+                "scale_labels": ["Никогда", "Иногда", "Часто", "Почти всегда"],
+                "reverse_scoring": True,  # Обратная шкала: балл = 3 - ответ
             },
         ],
         "interpretation": {
             "max_score": 18,
             "ranges": [
                 {"min": 0, "max": 3, "level": "high_resilience", "message": "Высокая эмоциональная устойчивость — это ваша сильная сторона."},
-                {"min": 5, "max": 8, "level": "moderate", "message": "Умеренные трудности регуляции — приложение поможет развить навыки."},
+                {"min": 4, "max": 8, "level": "moderate", "message": "Умеренные трудности регуляции — приложение поможет развить навыки."},
                 {"min": 9, "max": 18, "level": "vulnerable", "message": "Выраженная эмоциональная уязвимость — мы будем особенно внимательны к вашему состоянию."},
             ],
         },
@@ -166,7 +166,7 @@ LEVEL_C_TESTS = {
                 "code": "C3_Q3",
                 "question_ru": "Были ли моменты радости и удовлетворения?",
                 "answer_type": "scale_0_3",
-                "scale_labels": ["Много", "Несколько", "Мало", "Не было"],
+                "scale_labels": ["Не было", "Мало", "Несколько", "Много"],
                 "reverse_scoring": True,
             },
             {
@@ -192,7 +192,7 @@ LEVEL_C_TESTS = {
                 "code": "C4_Q1",
                 "question_ru": "Придерживались ли вы финансовых лимитов на этой неделе?",
                 "answer_type": "scale_0_3",
-                "scale_labels": ["Полностью", "В основном", "Частично нарушал", "Не придерживался"],
+                "scale_labels": ["Не придерживался", "Частично нарушал", "В основном", "Полностью"],
                 "reverse_scoring": True,
             },
             {
@@ -5,36 +5,62 @@ FastAPI приложение — Точка опоры.
 
 import os
 import asyncio
-import httpx
-WEBAPP_URL = "https://gambling-help-andrey220197.amvera.io"
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 
-from app.config import settings
-from app.api import auth, checkins, streaks, articles, sos, tests, diary, money
-from app.db.database import init_db, DATABASE_PATH
+from app.api import auth, checkins, streaks, articles, sos, tests, diary, money, bot, bootstrap, search
+from app.db.database import init_db, open_pool, close_pool, pool
 from app.services.reminder_scheduler import run_scheduler
+from app.services.streaks import run_streak_audit
+from app.services.telegram import telegram
+from app.services.outbox import run_outbox
+from app.services.bot import run_bot_worker, stop_bot_worker
+from app.db.article_catalog import run_article_refresh
+from app.static_assets import StaticAssets, FRONTEND_DIR, HASHED_PREFIX
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Инициализация при запуске."""
     await init_db()
+    await open_pool()
+    await telegram.open()
+
+    # Статика фронтенда в память (сжатие без готовых .br/.gz — в отдельном потоке)
+    if os.path.exists(FRONTEND_DIR):
+        await asyncio.to_thread(static_assets.load)
 
     # Запускаем планировщик напоминаний в фоне
-    scheduler_task = asyncio.create_task(run_scheduler(DATABASE_PATH))
+    scheduler_task = asyncio.create_task(run_scheduler(pool))
+
+    # Периодический аудит серий
+    audit_task = asyncio.create_task(run_streak_audit(pool))
+
+    # Отправка сообщений из outbox
+    outbox_task = asyncio.create_task(run_outbox(pool))
+
+    # Обработка обновлений Telegram из webhook
+    bot_task = asyncio.create_task(run_bot_worker(pool))
+
+    # Перестройка каталога статей после пересева
+    articles_task = asyncio.create_task(run_article_refresh(pool))
 
     yield
 
-    # Останавливаем планировщик при завершении
-    scheduler_task.cancel()
-    try:
-        await scheduler_task
-    except asyncio.CancelledError:
-        pass
+    # Обновления из webhook Telegram уже считает доставленными — дообрабатываем их
+    await stop_bot_worker(bot_task)
+
+    # Останавливаем фоновые задачи при завершении
+    for task in (scheduler_task, audit_task, outbox_task, articles_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    await telegram.close()
+    await close_pool()
 
 
 app = FastAPI(
@@ -62,47 +88,8 @@ async def health():
     return {"status": "healthy", "version": "3.0.0"}
 
 
-# Telegram Bot Webhook (должен быть до SPA fallback)
-@app.post("/bot/webhook")
-async def telegram_webhook(request: Request):
-    """Обработка входящих сообщений от Telegram."""
-    data = await request.json()
-
-    message = data.get("message", {})
-    text = message.get("text", "")
-    chat_id = message.get("chat", {}).get("id")
-
-    if not chat_id:
-        return {"ok": True}
-
-    # Обработка команды /start
-    if text.startswith("/start"):
-        welcome_text = """👋 Привет! Я — Точка опоры
-
-Это безопасное пространство для тех, кто хочет контролировать финансовые импульсы.
-
-Нажми кнопку ниже, чтобы открыть приложение 👇"""
-
-        keyboard = {
-            "inline_keyboard": [[
-                {"text": "🚀 Открыть приложение", "web_app": {"url": WEBAPP_URL}}
-            ]]
-        }
-
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"https://api.telegram.org/bot{settings.BOT_TOKEN}/sendMessage",
-                json={
-                    "chat_id": chat_id,
-                    "text": welcome_text,
-                    "reply_markup": keyboard
-                }
-            )
-
-    return {"ok": True}
-
-
-# API роутеры
+# API роутеры (webhook бота тоже должен быть до SPA fallback)
+app.include_router(bot.router, prefix="/bot", tags=["bot"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(checkins.router, prefix="/checkins", tags=["checkins"])
 app.include_router(streaks.router, prefix="/streak", tags=["streak"])
@@ -111,27 +98,29 @@ app.include_router(sos.router, prefix="/sos", tags=["sos"])
 app.include_router(tests.router, prefix="/tests", tags=["tests"])
 app.include_router(diary.router, prefix="/diary", tags=["diary"])
 app.include_router(money.router, prefix="/money", tags=["money"])
+app.include_router(bootstrap.router, prefix="/bootstrap", tags=["bootstrap"])
+app.include_router(search.router, prefix="/search", tags=["search"])
 
 
-# Статика фронтенда (для production)
-FRONTEND_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "dist")
-)
+# Статика фронтенда (для production): манифест читается при старте,
+# файлы отдаются из памяти (см. app/static_assets.py)
+static_assets = StaticAssets(FRONTEND_DIR)
 
 if os.path.exists(FRONTEND_DIR):
-    # Статические файлы
-    assets_dir = os.path.join(FRONTEND_DIR, "assets")
-    if os.path.exists(assets_dir):
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
-
-    @app.get("/")
-    async def serve_index():
-        return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
-
-    # SPA fallback — все неизвестные пути отдают index.html
-    @app.get("/{path:path}")
-    async def serve_spa(path: str):
+    @app.api_route("/", methods=["GET", "HEAD"])
+    async def serve_index(request: Request):
+        return static_assets.response(request, static_assets.index)
+
+    # Файлы сборки и SPA fallback — все неизвестные пути отдают index.html
+    @app.api_route("/{path:path}", methods=["GET", "HEAD"])
+    async def serve_spa(path: str, request: Request):
+        asset = static_assets.get(path)
+        if asset is not None:
+            return static_assets.response(request, asset)
         # Если это API путь — пропускаем
-        if path.startswith(("auth", "checkins", "streak", "articles", "sos", "tests", "diary", "money", "health", "bot")):
+        if path.startswith(("auth", "checkins", "streak", "articles", "sos", "tests", "diary", "money", "health", "bot", "bootstrap", "search")):
             return {"detail": "Not Found"}
-        return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+        # Несуществующий файл сборки — 404, а не index.html
+        if path.startswith(HASHED_PREFIX):
+            raise HTTPException(status_code=404, detail="Not Found")
+        return static_assets.response(request, static_assets.index)
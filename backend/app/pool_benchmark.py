@@ -0,0 +1,115 @@
+"""
+Задержка запросов: пул соединений против соединения на каждый запрос.
+
+Поднимает приложение на временной БД (без сети, через ASGI), создаёт
+пользователя с чек-инами и записями дневника и гоняет смесь запросов
+из CONCURRENCY параллельных клиентов:
+- через пул (get_db / get_read_db как есть);
+- с прежними get_db / get_read_db: aiosqlite.connect на каждый запрос.
+
+Печатает p50 / p99 задержки и запросы в секунду.
+
+Запуск (из папки backend):
+    python -m app.pool_benchmark
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# До импорта настроек: временная БД и вход через init_data="debug"
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["DEBUG"] = "true"
+os.environ["BOT_TOKEN"] = ""
+
+import aiosqlite
+import httpx
+
+from app.db.database import DATABASE_PATH, get_db, get_read_db
+from app.main import app
+
+REQUESTS_PER_CLIENT = 200
+CONCURRENCY = 20
+
+# Смесь запросов главного экрана и дневника
+PATHS = (
+    "/auth/me",
+    "/checkins/today",
+    "/streak",
+    "/diary/stats",
+    "/money/stats",
+)
+
+
+async def per_request_db():
+    """Прежнее поведение get_db: новое соединение на каждый запрос."""
+    db = await aiosqlite.connect(DATABASE_PATH)
+    db.row_factory = aiosqlite.Row
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def _seed(client: httpx.AsyncClient) -> dict:
+    auth = (await client.post("/auth/verify", json={"init_data": "debug"})).json()
+    headers = {"Authorization": f"Bearer {auth['token']}"}
+    await client.post("/checkins", json={"urge": 3, "stress": 4, "mood": 6}, headers=headers)
+    for n in range(5):
+        await client.post("/diary", json={
+            "situation": f"Ситуация {n}", "thought": "Мысль", "emotions": ["тревога"],
+            "emotionIntensity": 5, "reaction": "Реакция",
+        }, headers=headers)
+    return headers
+
+
+async def _run_clients(client: httpx.AsyncClient, headers: dict, requests: int, clients: int) -> dict:
+    """Задержки всех запросов (мс) и запросы в секунду."""
+    latencies = []
+
+    async def worker(offset: int):
+        for n in range(requests):
+            path = PATHS[(offset + n) % len(PATHS)]
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {"p50": quantiles[49], "p99": quantiles[98], "rps": len(latencies) / elapsed}
+
+
+async def run_benchmark(requests: int = REQUESTS_PER_CLIENT, clients: int = CONCURRENCY) -> dict:
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = await _seed(client)
+
+            # Прогрев, затем замеры
+            await _run_clients(client, headers, 10, clients)
+            results["pool"] = await _run_clients(client, headers, requests, clients)
+
+            app.dependency_overrides[get_db] = per_request_db
+            app.dependency_overrides[get_read_db] = per_request_db
+            try:
+                await _run_clients(client, headers, 10, clients)
+                results["per_request"] = await _run_clients(client, headers, requests, clients)
+            finally:
+                app.dependency_overrides.clear()
+    return results
+
+
+if __name__ == "__main__":
+    results = asyncio.run(run_benchmark())
+    for name, label in (("per_request", "connect per request"), ("pool", "connection pool")):
+        r = results[name]
+        print(f"[OK] {label:<19}: p50 {r['p50']:.2f} ms, p99 {r['p99']:.2f} ms, {r['rps']:.0f} req/s "
+              f"({CONCURRENCY} clients)")
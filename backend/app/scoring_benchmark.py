@@ -0,0 +1,142 @@
+"""
+Проверка свойств подсчёта баллов и замер скорости.
+
+Случайные ответы (SAMPLES штук, фиксированный seed) для тестов каталога
+и для случайно сгенерированных тестов (все типы вопросов, веса,
+обратная шкала, choice_values, множественный выбор). Проверяются
+свойства:
+- TestScorer.score совпадает с reference_score: тот же балл или та же
+  ошибка ScoringError (в том числе на неверных значениях и чужих вопросах);
+- порядок ответов не влияет на результат;
+- пропущенные ответы (None) дают 0 баллов.
+
+Любое нарушение печатается, код выхода 1. Затем замеряется скорость
+подсчёта по тестам каталога.
+
+Запуск (из папки backend):
+    python -m app.scoring_benchmark
+"""
+
+import random
+import time
+from typing import Any, Dict
+
+from app.db.test_catalog import get_catalog
+from app.services.scoring import SCALE_MAX, ScoringError, TestScorer, get_scorer, reference_score
+
+SAMPLES = 20000
+GENERATED_TESTS = 200
+SEED = 42
+
+# Заведомо неверные значения ответа
+INVALID_VALUES = (True, -1, 99, "x", 1.5, ["x"], {}, [None], [[]])
+
+
+def random_test(rng: random.Random, n: int) -> Dict:
+    """Случайное описание теста в формате каталога."""
+    questions = []
+    for q in range(rng.randint(1, 8)):
+        answer_type = rng.choice(("scale_0_3", "scale_0_10", "yes_no", "choice"))
+        question = {"code": f"G{n}_Q{q}", "answer_type": answer_type}
+        if rng.random() < 0.3:
+            question["weight"] = rng.randint(0, 3)
+        if answer_type == "choice":
+            question["choices"] = [f"c{i}" for i in range(rng.randint(1, 5))]
+            question["allow_multiple"] = rng.random() < 0.5
+            if rng.random() < 0.6:
+                question["choice_values"] = {
+                    c: rng.randint(0, 5) for c in question["choices"] if rng.random() < 0.8
+                }
+        if rng.random() < 0.3:
+            question["reverse_scoring"] = True
+        questions.append(question)
+    return {"code": f"G{n}", "questions": questions}
+
+
+def random_value(rng: random.Random, question: Dict) -> Any:
+    roll = rng.random()
+    if roll < 0.05:
+        return None
+    if roll < 0.10:
+        return rng.choice(INVALID_VALUES)
+    answer_type = question["answer_type"]
+    if answer_type == "yes_no":
+        return rng.choice([True, False])
+    if answer_type == "choice":
+        choices = question["choices"]
+        if question.get("allow_multiple") and rng.random() < 0.7:
+            # С повторами: один вариант дважды считается один раз
+            return rng.choices(choices, k=rng.randint(0, len(choices) + 1))
+        return rng.choice(choices)
+    return rng.randint(0, SCALE_MAX[answer_type])
+
+
+def random_answers(rng: random.Random, test: Dict) -> Dict:
+    answers = {q["code"]: random_value(rng, q) for q in test["questions"] if rng.random() < 0.95}
+    if rng.random() < 0.02:
+        answers["UNKNOWN_Q"] = 1
+    return answers
+
+
+def outcome(func, *args):
+    try:
+        return func(*args)
+    except ScoringError:
+        return "error"
+
+
+def check_properties(samples: list) -> list:
+    """Нарушения свойств: список (свойство, код теста, ответы)."""
+    rng = random.Random(SEED)
+    failures = []
+    for scorer, test, answers in samples:
+        compiled = outcome(scorer.score, answers)
+        if compiled != outcome(reference_score, test, answers):
+            failures.append(("reference", test["code"], answers))
+
+        items = list(answers.items())
+        rng.shuffle(items)
+        if outcome(scorer.score, dict(items)) != compiled:
+            failures.append(("order", test["code"], answers))
+
+        skipped = {q["code"]: None for q in test["questions"]}
+        if scorer.score(skipped) != 0:
+            failures.append(("skipped", test["code"], skipped))
+    return failures
+
+
+def build_samples(count: int = SAMPLES) -> tuple:
+    """(ответы на тесты каталога, ответы на сгенерированные тесты)."""
+    rng = random.Random(SEED)
+    catalog = [(get_scorer(t.code), t.data) for t in get_catalog().tests]
+    generated = [random_test(rng, n) for n in range(GENERATED_TESTS)]
+    generated = [(TestScorer(test), test) for test in generated]
+
+    def draw(tests):
+        samples = []
+        for _ in range(count):
+            scorer, test = rng.choice(tests)
+            samples.append((scorer, test, random_answers(rng, test)))
+        return samples
+
+    return draw(catalog), draw(generated)
+
+
+def measure(samples: list) -> float:
+    """Подсчётов в секунду."""
+    started = time.perf_counter()
+    for scorer, _, answers in samples:
+        outcome(scorer.score, answers)
+    return len(samples) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    catalog_samples, generated_samples = build_samples()
+    failures = check_properties(catalog_samples) + check_properties(generated_samples)
+    for prop, code, answers in failures[:20]:
+        print(f"[WARN] Property '{prop}' failed in {code}: {answers}")
+    print(f"[OK] {len(catalog_samples)} catalog and {len(generated_samples)} generated submissions "
+          f"checked, {len(failures)} failures")
+    print(f"[OK] {measure(catalog_samples):,.0f} submissions/s")
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,137 @@
+"""
+Поиск по дневнику на синтетическом корпусе.
+
+Заполняет временную БД записями дневника (DIARY_ENTRIES; слова
+с частотами по закону Ципфа из словаря VOCABULARY_SIZE слов, у одного
+«активного» пользователя HEAVY_USER_ENTRIES записей),
+замеряет вставку с триггерами FTS и время поиска: FTS5 (search_diary)
+против прежнего способа — LIKE по всем записям пользователя.
+
+Запуск (из папки backend):
+    python -m app.search_benchmark
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+
+import aiosqlite
+
+from app.db.schema_v3 import SCHEMA_V3, migrate_search_index
+from app.services.search import build_match_query, search_diary
+
+DIARY_ENTRIES = 100_000
+USERS = 1000
+HEAVY_USER_ENTRIES = 5000
+ROUNDS = 50
+
+VOCABULARY_SIZE = 20_000
+
+# Слова из запросов и их место в частотном словаре (1 — самое частое)
+RANKED_WORDS = {
+    "тревога": 30, "стресс": 60, "зарплата": 150, "почти": 80, "победа": 400,
+    "отыграюсь": 900, "долги": 1500, "долг": 700, "уведомление": 6000,
+}
+
+# Слоги для остальных слов словаря
+SYLLABLES = "ба ве ги до жу за ки ло ми ну по ра си ту фе ха це ча ше щу".split()
+
+# (название, запрос): частое слово, редкое, несколько слов, словоформа
+QUERIES = (
+    ("frequent", "тревога"),
+    ("rare", "уведомления"),
+    ("phrase", "почти победа"),
+    ("inflected", "долгов"),
+)
+
+LIKE_QUERY = """
+SELECT id FROM thought_entries
+WHERE user_id = ? AND (situation LIKE ? OR thought LIKE ? OR reaction LIKE ?)
+ORDER BY created_at DESC
+LIMIT 20
+"""
+
+
+def _vocabulary():
+    """Словарь по убыванию частоты и накопленные веса Ципфа."""
+    filler = ("".join(s) for s in itertools.product(SYLLABLES, repeat=4))
+    words = []
+    by_rank = {rank: word for word, rank in RANKED_WORDS.items()}
+    for rank in range(1, VOCABULARY_SIZE + 1):
+        words.append(by_rank.get(rank) or next(filler))
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, VOCABULARY_SIZE + 1)))
+    return words, weights
+
+
+def _text(rng: random.Random, words: list, weights: list, count: int) -> str:
+    return " ".join(rng.choices(words, cum_weights=weights, k=count)).capitalize()
+
+
+async def _seed(db: aiosqlite.Connection, entries: int) -> float:
+    """Вставляет записи (триггеры пополняют индекс), возвращает время, с."""
+    rng = random.Random(42)
+    words, weights = _vocabulary()
+    rows = []
+    for n in range(entries):
+        user_id = 1 if n < HEAVY_USER_ENTRIES else 2 + n % (USERS - 1)
+        rows.append((user_id, _text(rng, words, weights, 12), _text(rng, words, weights, 10),
+                     "[]", 5, _text(rng, words, weights, 6)))
+
+    started = time.perf_counter()
+    await db.executemany(
+        """INSERT INTO thought_entries
+           (user_id, situation, thought, emotions_json, emotion_intensity, reaction)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        rows
+    )
+    await db.commit()
+    return time.perf_counter() - started
+
+
+async def _measure(rounds: int, func) -> float:
+    """Среднее время вызова, мс."""
+    await func()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await func()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+async def run_benchmark(entries: int = DIARY_ENTRIES, rounds: int = ROUNDS) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    async with aiosqlite.connect(path) as db:
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.executescript(SCHEMA_V3)
+        await migrate_search_index(db)
+        results = {"insert_s": await _seed(db, entries), "queries": {}}
+
+        # Активный пользователь и обычный (около entries / USERS записей)
+        for user_id in (1, 2):
+            for name, text in QUERIES:
+                match = build_match_query(text)
+                like = f"%{text.split()[0]}%"
+
+                async def fts():
+                    return await search_diary(db, user_id, match, 20)
+
+                async def scan():
+                    async with db.execute(LIKE_QUERY, (user_id, like, like, like)) as cursor:
+                        return await cursor.fetchall()
+
+                results["queries"][(user_id, name)] = {
+                    "hits": len(await fts()),
+                    "fts_ms": await _measure(rounds, fts),
+                    "like_ms": await _measure(rounds, scan),
+                }
+    return results
+
+
+if __name__ == "__main__":
+    results = asyncio.run(run_benchmark())
+    print(f"[OK] {DIARY_ENTRIES} diary entries inserted with FTS triggers in {results['insert_s']:.1f} s")
+    for (user_id, name), r in results["queries"].items():
+        who = f"heavy user ({HEAVY_USER_ENTRIES})" if user_id == 1 else "regular user"
+        print(f"[OK] {who}, {name}: FTS5 {r['fts_ms']:.2f} ms ({r['hits']} hits), LIKE {r['like_ms']:.2f} ms")
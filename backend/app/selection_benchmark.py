@@ -0,0 +1,92 @@
+"""
+Задержка выбора следующего теста в зависимости от объёма истории.
+
+На временной БД для каждого размера из HISTORY_SIZES создаётся
+пользователь после онбординга с таким числом результатов тестов
+(за последний год, по всем тестам каталога) и чек-инов. Замеряется
+TestEngine.get_next_test — снимок истории одним запросом и правила
+выбора в памяти.
+
+Запуск (из папки backend):
+    python -m app.selection_benchmark
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import aiosqlite
+
+from app.db.schema_v3 import SCHEMA_V3
+from app.db.seed_tests import seed_tests_to_db
+from app.db.test_catalog import get_catalog, sync_catalog_ids
+from app.services.test_engine import TestEngine, TIMESTAMP_FORMAT
+
+HISTORY_SIZES = (0, 100, 1000, 10_000, 50_000)
+ROUNDS = 500
+
+CONTEXT = {"urge": 6, "stress": 5, "mood": 4, "relapse": False, "time_of_day": "evening"}
+
+
+async def _create_user(db: aiosqlite.Connection, user_id: int, size: int, rng: random.Random):
+    """Пользователь после онбординга с size результатами тестов и size чек-инами."""
+    await db.execute(
+        "INSERT INTO users (id, anon_hash, recovery_code) VALUES (?, ?, ?)",
+        (user_id, f"bench-{user_id}", f"BENCH{user_id:06d}")
+    )
+    await db.execute(
+        "INSERT INTO user_profiles (user_id, onboarding_completed, onboarding_day) VALUES (?, 1, 4)",
+        (user_id,)
+    )
+
+    test_ids = [t.id for t in get_catalog().tests if not t.code.startswith("A")]
+    now = datetime.utcnow()
+
+    def moment() -> str:
+        return (now - timedelta(minutes=rng.randint(60, 365 * 24 * 60))).strftime(TIMESTAMP_FORMAT)
+
+    await db.executemany(
+        "INSERT INTO test_results (user_id, test_id, total_score, created_at) VALUES (?, ?, ?, ?)",
+        [(user_id, rng.choice(test_ids), rng.randint(0, 10), moment()) for _ in range(size)]
+    )
+    await db.executemany(
+        "INSERT INTO checkins (user_id, urge, stress, mood, created_at) VALUES (?, ?, ?, ?, ?)",
+        [(user_id, rng.randint(0, 10), 5, 5, moment()) for _ in range(size)]
+    )
+    await db.commit()
+
+
+async def run_benchmark(rounds: int = ROUNDS) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "selection.db")
+    rng = random.Random(42)
+    results = {}
+    async with aiosqlite.connect(path) as db:
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.executescript(SCHEMA_V3)
+        await seed_tests_to_db(db)
+        await sync_catalog_ids(db)
+
+        engine = TestEngine(db)
+        for user_id, size in enumerate(HISTORY_SIZES, start=1):
+            await _create_user(db, user_id, size, rng)
+            await engine.get_next_test(user_id, CONTEXT)
+
+            latencies = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                await engine.get_next_test(user_id, CONTEXT)
+                latencies.append((time.perf_counter() - started) * 1000)
+            quantiles = statistics.quantiles(latencies, n=100)
+            results[size] = {"p50": quantiles[49], "p99": quantiles[98]}
+    return results
+
+
+if __name__ == "__main__":
+    for size, r in asyncio.run(run_benchmark()).items():
+        print(f"[OK] history {size:>6} results + {size} check-ins: "
+              f"p50 {r['p50']:.3f} ms, p99 {r['p99']:.3f} ms")
@@ -0,0 +1,305 @@
+"""
+Обработка обновлений Telegram-бота.
+
+Webhook (app/api/bot.py) только проверяет секрет, отбрасывает повторы
+update_id и кладёт обновление в очередь. Команды разбирает фоновая
+задача run_bot_worker: ответы ставятся в outbox пачкой, одной записью в БД.
+Telegram считает такие обновления доставленными, поэтому при остановке
+приложения stop_bot_worker сначала дообрабатывает очередь.
+
+Команды: /start, /help, /app, /sos и кнопка «Помощь» (callback "help").
+При запуске setup_bot настраивает кнопку меню и, если задан
+BOT_WEBHOOK_URL, регистрирует webhook.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db.pool import ConnectionPool
+from app.services.outbox import enqueue
+from app.services.telegram import telegram, TelegramError
+
+# Сколько последних update_id помним для отсева повторов
+SEEN_UPDATES_MAX = 10000
+
+# Сколько обновлений ждут обработки; при переполнении webhook отвечает 503
+# и Telegram повторит доставку позже
+BOT_QUEUE_SIZE = 1000
+
+# Сколько обновлений обрабатывается одной записью в БД
+BOT_BATCH_SIZE = 100
+
+# Сколько ждать обработки очереди при остановке приложения
+BOT_DRAIN_TIMEOUT_SECONDS = 10.0
+
+# Какие обновления присылает Telegram
+ALLOWED_UPDATES = ["message", "callback_query"]
+
+# Ответ бота: (метод Bot API, параметры)
+Reply = Tuple[str, Dict]
+
+
+class SeenUpdates:
+    """Ограниченный LRU последних update_id."""
+
+    def __init__(self, maxsize: int = SEEN_UPDATES_MAX):
+        self.maxsize = maxsize
+        self._ids: OrderedDict = OrderedDict()
+
+    def add(self, update_id: int) -> bool:
+        """Запоминает update_id. False — такой уже был."""
+        if update_id in self._ids:
+            self._ids.move_to_end(update_id)
+            return False
+        self._ids[update_id] = None
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+        return True
+
+    def discard(self, update_id: int):
+        self._ids.pop(update_id, None)
+
+
+seen_updates = SeenUpdates()
+_queue: Optional[asyncio.Queue] = None
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=BOT_QUEUE_SIZE)
+    return _queue
+
+
+def submit_update(update: Dict) -> bool:
+    """Кладёт обновление в очередь обработки. False — очередь переполнена."""
+    try:
+        _get_queue().put_nowait(update)
+        return True
+    except asyncio.QueueFull:
+        return False
+
+
+# =========================================
+# КОМАНДЫ
+# =========================================
+
+def _webapp_button(text: str, path: str = "") -> Dict:
+    return {"text": text, "web_app": {"url": f"{settings.WEBAPP_URL}{path}"}}
+
+
+def _message(chat_id: int, text: str, **params) -> Reply:
+    return "sendMessage", {"chat_id": chat_id, "text": text, **params}
+
+
+def start_command(chat_id: int) -> List[Reply]:
+    """Приветствие и кнопка открытия приложения."""
+    text = """👋 Привет! Я — *Точка опоры*
+
+Это безопасное пространство для тех, кто хочет контролировать финансовые импульсы и тягу к азартным играм.
+
+*Что я умею:*
+• 📝 Ежедневные чек-ины состояния
+• 🔥 Отслеживание дней без игры
+• 🆘 SOS-техники при сильной тяге
+• 🧠 Научные объяснения механизмов
+
+⚠️ _Это не медицинская помощь. При кризисе звони 112 или 8-800-2000-122_
+
+Нажми кнопку ниже, чтобы начать 👇"""
+
+    keyboard = {
+        "inline_keyboard": [
+            [_webapp_button("🚀 Открыть приложение")],
+            [{"text": "ℹ️ Помощь", "callback_data": "help"}],
+        ]
+    }
+    return [_message(chat_id, text, parse_mode="Markdown", reply_markup=keyboard)]
+
+
+def help_command(chat_id: int) -> List[Reply]:
+    """Информация и контакты."""
+    text = """*Точка опоры — помощь и поддержка*
+
+*Команды:*
+/start — открыть приложение
+/app — быстрая ссылка на приложение
+/help — эта справка
+/sos — экстренная помощь
+
+*Горячие линии:*
+📞 112 — экстренная помощь
+📞 8-800-2000-122 — психологическая помощь (бесплатно)
+
+*О проекте:*
+Приложение создано на основе научных исследований нейробиологии зависимости. Все техники основаны на доказательной психологии.
+
+⚠️ _Это не замена профессиональной терапии_"""
+
+    return [_message(chat_id, text, parse_mode="Markdown")]
+
+
+def app_command(chat_id: int) -> List[Reply]:
+    """Быстрое открытие приложения."""
+    keyboard = {"inline_keyboard": [[_webapp_button("🚀 Открыть приложение")]]}
+    return [_message(chat_id, "Нажми кнопку, чтобы открыть приложение 👇", reply_markup=keyboard)]
+
+
+def sos_command(chat_id: int) -> List[Reply]:
+    """Экстренная помощь."""
+    text = """🆘 *Экстренная помощь*
+
+Ты справишься. Это временное состояние.
+
+*Попробуй прямо сейчас:*
+
+1️⃣ *Дыхание 4-4-4-4*
+Вдох 4 сек → Задержка 4 сек → Выдох 4 сек → Задержка 4 сек
+Повтори 4 раза
+
+2️⃣ *Заземление 5-4-3-2-1*
+Назови 5 вещей, которые видишь
+4 — которые слышишь
+3 — которые можешь потрогать
+2 запаха, 1 вкус
+
+3️⃣ *Пауза 10 минут*
+Поставь таймер. Не принимай решений до сигнала.
+Тяга — как волна: она нарастает и спадает.
+
+*Если совсем тяжело:*
+📞 8-800-2000-122 (бесплатно, круглосуточно)"""
+
+    keyboard = {"inline_keyboard": [[_webapp_button("🚀 Открыть SOS в приложении", "/sos")]]}
+    return [_message(chat_id, text, parse_mode="Markdown", reply_markup=keyboard)]
+
+
+COMMANDS: Dict[str, Callable[[int], List[Reply]]] = {
+    "start": start_command,
+    "help": help_command,
+    "app": app_command,
+    "sos": sos_command,
+}
+
+# Кнопки под сообщениями (callback_data → обработчик)
+CALLBACKS: Dict[str, Callable[[int], List[Reply]]] = {
+    "help": help_command,
+}
+
+
+def parse_command(text: str) -> Optional[str]:
+    """Имя команды из текста сообщения ("/start@bot arg" → "start")."""
+    if not text.startswith("/"):
+        return None
+    return text[1:].split(maxsplit=1)[0].split("@", 1)[0].lower() if len(text) > 1 else None
+
+
+def route_update(update: Dict) -> List[Reply]:
+    """Ответы бота на обновление (пустой список — отвечать не нужно)."""
+    message = update.get("message")
+    if message:
+        chat_id = (message.get("chat") or {}).get("id")
+        command = parse_command(message.get("text") or "")
+        handler = COMMANDS.get(command) if command else None
+        if chat_id is not None and handler:
+            return handler(chat_id)
+        return []
+
+    callback = update.get("callback_query")
+    if callback:
+        # Ответ на callback обязателен, иначе кнопка «крутится» у пользователя
+        replies = [("answerCallbackQuery", {"callback_query_id": callback.get("id")})]
+        chat_id = ((callback.get("message") or {}).get("chat") or {}).get("id")
+        handler = CALLBACKS.get(callback.get("data"))
+        if chat_id is not None and handler:
+            replies.extend(handler(chat_id))
+        return replies
+    return []
+
+
+async def process_updates(pool: ConnectionPool, updates: List[Dict]):
+    """Разбирает пачку обновлений и ставит все ответы в outbox одной записью."""
+    replies = []
+    for update in updates:
+        update_id = update.get("update_id")
+        for n, (method, payload) in enumerate(route_update(update)):
+            # Ключ защищает от повторной отправки, если обновление обработают дважды
+            dedup_key = f"update:{update_id}:{n}" if update_id is not None else None
+            replies.append((method, payload, dedup_key))
+    if not replies:
+        return
+
+    async def write(db):
+        for method, payload, dedup_key in replies:
+            await enqueue(db, method, payload, chat_id=payload.get("chat_id"), dedup_key=dedup_key)
+
+    await pool.run_write(write)
+
+
+async def setup_bot():
+    """Кнопка меню для открытия Mini App и регистрация webhook.
+
+    Вызовы идемпотентны, поэтому выполняются при каждом запуске
+    напрямую, без outbox.
+    """
+    if not telegram.enabled:
+        print("[WARN] BOT_TOKEN not set, bot is disabled")
+        return
+
+    try:
+        await telegram.call("setChatMenuButton", {
+            "menu_button": {
+                "type": "web_app",
+                "text": "Открыть",
+                "web_app": {"url": settings.WEBAPP_URL},
+            }
+        })
+        print("[OK] Bot menu button configured")
+
+        if settings.BOT_WEBHOOK_URL:
+            webhook = {"url": settings.BOT_WEBHOOK_URL, "allowed_updates": ALLOWED_UPDATES}
+            if settings.BOT_WEBHOOK_SECRET:
+                webhook["secret_token"] = settings.BOT_WEBHOOK_SECRET
+            await telegram.call("setWebhook", webhook)
+            print("[OK] Bot webhook registered")
+    except TelegramError as e:
+        print(f"[WARN] Bot setup failed: {e}")
+
+
+async def run_bot_worker(pool: ConnectionPool):
+    """Фоновая обработка обновлений из очереди webhook."""
+    queue = _get_queue()
+    print("[Bot] Starting update worker...")
+    await setup_bot()
+
+    while True:
+        updates = [await queue.get()]
+        while len(updates) < BOT_BATCH_SIZE and not queue.empty():
+            updates.append(queue.get_nowait())
+        try:
+            await process_updates(pool, updates)
+        except Exception as e:
+            print(f"[Bot] Error: {e}")
+        finally:
+            for _ in updates:
+                queue.task_done()
+
+
+async def stop_bot_worker(task: asyncio.Task, timeout: float = BOT_DRAIN_TIMEOUT_SECONDS):
+    """Останавливает run_bot_worker, дождавшись обработки очереди (не дольше timeout).
+
+    Вызывается до закрытия пула: ответы должны успеть попасть в outbox.
+    """
+    queue = _get_queue()
+    if not task.done():
+        try:
+            await asyncio.wait_for(queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARN] Bot queue not drained in {timeout}s, {queue.qsize()} updates dropped")
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
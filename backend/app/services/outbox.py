@@ -0,0 +1,220 @@
+"""
+Очередь исходящих сообщений Telegram (outbox).
+
+Все отправки в Bot API сначала записываются в таблицу outbox — в той же
+транзакции, что и изменение, которое их вызвало. Фоновый диспетчер
+забирает наступившие сообщения пачками и отправляет через общий клиент
+(app.services.telegram), поэтому у всех отправок один пул соединений
+и один лимит скорости.
+
+- повтор с экспоненциальной задержкой для временных ошибок (сеть, 429, 5xx);
+- после OUTBOX_MAX_ATTEMPTS попыток или при постоянной ошибке
+  (например, бот заблокирован) сообщение помечается dead;
+- dedup_key: повторная постановка того же сообщения игнорируется.
+"""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app.config import settings
+from app.db.pool import ConnectionPool
+from app.services.telegram import telegram, TelegramError
+
+# Сколько сообщений забирается за раз
+OUTBOX_BATCH_SIZE = 100
+
+# На сколько откладывается забранное сообщение: если процесс упадёт
+# во время отправки, сообщение будет отправлено повторно
+OUTBOX_LEASE = timedelta(minutes=2)
+
+# Экспоненциальная задержка между попытками
+OUTBOX_BACKOFF_BASE_SECONDS = 2
+OUTBOX_BACKOFF_MAX_SECONDS = 3600
+
+# Дольше диспетчер не спит, даже если очередь пуста
+OUTBOX_MAX_SLEEP_SECONDS = 30
+
+# Сколько хранить отправленные сообщения
+OUTBOX_RETENTION_DAYS = 7
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Пачка наступивших сообщений
+OUTBOX_CLAIM_QUERY = """
+SELECT id, method, payload_json, chat_id, attempts FROM outbox
+WHERE status = 'pending' AND next_attempt_at <= ?
+ORDER BY next_attempt_at
+LIMIT ?
+"""
+
+OUTBOX_NEXT_QUERY = "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+
+OUTBOX_PURGE_QUERY = "DELETE FROM outbox WHERE status = 'sent' AND created_at < ?"
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def notify():
+    """Будит диспетчер (после постановки сообщения в очередь)."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def enqueue(db, method: str, payload: Dict, chat_id: Optional[int] = None,
+                  dedup_key: Optional[str] = None) -> bool:
+    """Ставит вызов Bot API в очередь (без commit). False — такой dedup_key уже есть."""
+    cursor = await db.execute(
+        """INSERT INTO outbox (method, payload_json, chat_id, dedup_key)
+           VALUES (?, ?, ?, ?)
+           ON CONFLICT(dedup_key) DO NOTHING""",
+        (method, json.dumps(payload, ensure_ascii=False), chat_id, dedup_key)
+    )
+    notify()
+    return cursor.rowcount > 0
+
+
+async def enqueue_message(db, chat_id: int, text: str, dedup_key: Optional[str] = None,
+                          **params) -> bool:
+    """Ставит sendMessage в очередь (без commit)."""
+    payload = {"chat_id": chat_id, "text": text, **params}
+    return await enqueue(db, "sendMessage", payload, chat_id=chat_id, dedup_key=dedup_key)
+
+
+def backoff_delay(attempts: int, retry_after: Optional[float] = None) -> float:
+    """Задержка перед следующей попыткой (с разбросом, не меньше retry_after)."""
+    delay = min(OUTBOX_BACKOFF_MAX_SECONDS, OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    delay *= random.uniform(0.8, 1.2)
+    return max(delay, retry_after or 0)
+
+
+async def _claim(pool: ConnectionPool, now: datetime) -> list:
+    """Забирает пачку наступивших сообщений и откладывает их на время отправки."""
+    async def claim(db):
+        cursor = await db.execute(OUTBOX_CLAIM_QUERY, (_timestamp(now), OUTBOX_BATCH_SIZE))
+        rows = await cursor.fetchall()
+        await db.executemany(
+            "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+            [(_timestamp(now + OUTBOX_LEASE), row["id"]) for row in rows]
+        )
+        return rows
+
+    return await pool.run_write(claim)
+
+
+async def _deliver(row) -> tuple:
+    """Отправляет одно сообщение. Возвращает (ошибка или None, повторять ли)."""
+    try:
+        await telegram.call(row["method"], json.loads(row["payload_json"]), chat_id=row["chat_id"])
+        return None, False
+    except TelegramError as e:
+        return e, e.retryable
+
+
+async def dispatch_due(pool: ConnectionPool) -> dict:
+    """Отправляет все наступившие сообщения. Возвращает счётчики sent/retried/dead."""
+    stats = {"sent": 0, "retried": 0, "dead": 0}
+    while True:
+        now = datetime.now(timezone.utc)
+        rows = await _claim(pool, now)
+        if not rows:
+            return stats
+
+        results = await asyncio.gather(*(_deliver(row) for row in rows))
+
+        sent, retried, dead = [], [], []
+        finished_at = _timestamp(datetime.now(timezone.utc))
+        for row, (error, retryable) in zip(rows, results):
+            attempts = row["attempts"] + 1
+            if error is None:
+                sent.append((attempts, finished_at, row["id"]))
+            elif retryable and attempts < settings.OUTBOX_MAX_ATTEMPTS:
+                delay = backoff_delay(attempts, error.retry_after)
+                next_at = _timestamp(datetime.now(timezone.utc) + timedelta(seconds=delay))
+                retried.append((attempts, next_at, str(error), row["id"]))
+            else:
+                dead.append((attempts, str(error), row["id"]))
+                print(f"[WARN] Outbox message {row['id']} is dead after {attempts} attempts: {error}")
+
+        async def record(db):
+            await db.executemany(
+                "UPDATE outbox SET status = 'sent', attempts = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                sent
+            )
+            await db.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                retried
+            )
+            await db.executemany(
+                "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                dead
+            )
+
+        await pool.run_write(record)
+        stats["sent"] += len(sent)
+        stats["retried"] += len(retried)
+        stats["dead"] += len(dead)
+
+        if len(rows) < OUTBOX_BATCH_SIZE:
+            return stats
+
+
+async def purge_sent(pool: ConnectionPool):
+    """Удаляет отправленные сообщения старше OUTBOX_RETENTION_DAYS."""
+    cutoff = _timestamp(datetime.now(timezone.utc) - timedelta(days=OUTBOX_RETENTION_DAYS))
+
+    async def purge(db):
+        await db.execute(OUTBOX_PURGE_QUERY, (cutoff,))
+
+    await pool.run_write(purge)
+
+
+async def _seconds_until_next(pool: ConnectionPool) -> float:
+    async with pool.reader() as db:
+        cursor = await db.execute(OUTBOX_NEXT_QUERY)
+        next_at = (await cursor.fetchone())[0]
+    if not next_at:
+        return OUTBOX_MAX_SLEEP_SECONDS
+    due_at = datetime.fromisoformat(next_at).replace(tzinfo=timezone.utc)
+    delay = (due_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0), OUTBOX_MAX_SLEEP_SECONDS)
+
+
+async def run_outbox(pool: ConnectionPool):
+    """Фоновый диспетчер outbox."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    print("[Outbox] Starting outbox dispatcher...")
+
+    if not telegram.enabled:
+        # Без токена сообщения копятся в очереди и уйдут, когда он появится
+        print("[WARN] BOT_TOKEN not set, outbox dispatcher is idle")
+        return
+
+    last_purge = datetime.now(timezone.utc)
+    while True:
+        try:
+            _wakeup.clear()
+            stats = await dispatch_due(pool)
+            if any(stats.values()):
+                print(f"[Outbox] sent={stats['sent']} retried={stats['retried']} dead={stats['dead']}")
+
+            if datetime.now(timezone.utc) - last_purge > timedelta(hours=1):
+                await purge_sent(pool)
+                last_purge = datetime.now(timezone.utc)
+
+            delay = await _seconds_until_next(pool)
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+        except Exception as e:
+            print(f"[Outbox] Error: {e}")
+            await asyncio.sleep(OUTBOX_MAX_SLEEP_SECONDS)
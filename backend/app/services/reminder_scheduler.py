@@ -1,24 +1,105 @@
 """
 Планировщик напоминаний.
-Запускает проверку каждую минуту и отправляет уведомления пользователям.
+
+У каждого пользователя хранится время следующего напоминания в UTC
+(users.reminder_next_at), посчитанное по его часовому поясу. Планировщик
+спит до ближайшего времени, забирает наступившие напоминания пачками,
+сразу переносит их на следующий день и ставит сообщения в outbox
+(отправляет их app.services.outbox).
 """
 
 import asyncio
-from datetime import datetime, date
-import httpx
-import aiosqlite
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from app.config import settings
+from app.db.pool import ConnectionPool
+from app.services.outbox import enqueue_message
+from app.services.streaks import get_zone, local_day
+
+# Сколько наступивших напоминаний забирается и отправляется за раз
+REMINDER_BATCH_SIZE = 500
+
+# Дольше не спим, чтобы заметить напоминания, назначенные во время сна
+SCHEDULER_MAX_SLEEP_SECONDS = 60
+
+# Напоминания, опоздавшие сильнее (например, сервер был выключен), не отправляем
+REMINDER_MAX_LATENESS = timedelta(hours=1)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Пачка наступивших напоминаний с серией и последним чек-ином
+REMINDERS_CLAIM_QUERY = """
+SELECT u.id, u.telegram_id, u.timezone, u.reminder_hour, u.reminder_minute,
+       u.reminder_next_at, COALESCE(s.current_streak, 0) as streak,
+       (SELECT MAX(c.created_at) FROM checkins c WHERE c.user_id = u.id) as last_checkin
+FROM users u
+LEFT JOIN streaks s ON s.user_id = u.id
+WHERE u.reminder_next_at <= ?
+ORDER BY u.reminder_next_at
+LIMIT ?
+"""
 
-WEBAPP_URL = "https://gambling-help-andrey220197.amvera.io"
-
+REMINDERS_NEXT_QUERY = "SELECT MIN(reminder_next_at) FROM users WHERE reminder_next_at IS NOT NULL"
 
-async def send_reminder(telegram_id: int, streak: int):
-    """Отправляет напоминание пользователю через Telegram Bot API."""
-    if not settings.BOT_TOKEN:
-        print("[WARN] BOT_TOKEN not set, skipping reminder")
-        return False
 
+def next_reminder_at(hour: int, minute: int, tz_name: Optional[str],
+                     after: Optional[datetime] = None) -> str:
+    """Ближайший момент hour:minute по времени пользователя позже after, в UTC."""
+    zone = get_zone(tz_name)
+    after = after or datetime.now(timezone.utc)
+    local_now = after.astimezone(zone)
+    day = local_now.date()
+    while True:
+        candidate = datetime(day.year, day.month, day.day, hour, minute, tzinfo=zone)
+        if candidate > local_now:
+            return candidate.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        day += timedelta(days=1)
+
+
+async def backfill_reminder_schedule(db) -> int:
+    """Назначает время следующего напоминания тем, у кого его ещё нет (без commit).
+
+    Нужно для пользователей из БД, созданной до появления reminder_next_at.
+    """
+    cursor = await db.execute(
+        """SELECT id, reminder_hour, reminder_minute, timezone FROM users
+           WHERE reminder_next_at IS NULL AND reminder_enabled = 1 AND telegram_id IS NOT NULL"""
+    )
+    rows = await cursor.fetchall()
+    if rows:
+        await db.executemany(
+            "UPDATE users SET reminder_next_at = ? WHERE id = ?",
+            [(next_reminder_at(hour or 0, minute or 0, tz), user_id) for user_id, hour, minute, tz in rows]
+        )
+    return len(rows)
+
+
+async def schedule_reminder(db, user_id: int):
+    """Пересчитывает время следующего напоминания пользователя (без commit).
+
+    Вызывается при изменении настроек напоминаний, часового пояса или telegram_id.
+    """
+    cursor = await db.execute(
+        """SELECT reminder_enabled, reminder_hour, reminder_minute, timezone, telegram_id
+           FROM users WHERE id = ?""",
+        (user_id,)
+    )
+    row = await cursor.fetchone()
+    if not row:
+        return
+
+    next_at = None
+    if row["reminder_enabled"] and row["telegram_id"] is not None:
+        next_at = next_reminder_at(row["reminder_hour"] or 0, row["reminder_minute"] or 0, row["timezone"])
+    await db.execute(
+        "UPDATE users SET reminder_next_at = ? WHERE id = ?",
+        (next_at, user_id)
+    )
+
+
+def reminder_message(streak: int, day: str) -> tuple:
+    """Текст и клавиатура напоминания."""
     messages = [
         f"👋 Привет! Не забудь сделать чек-ин сегодня.\n\n🔥 Твоя серия: {streak} дней",
         f"⏰ Время для ежедневного чек-ина!\n\n💪 Поддерживай серию — уже {streak} дней!",
@@ -26,98 +107,92 @@ async def send_reminder(telegram_id: int, streak: int):
     ]
 
     # Выбираем сообщение на основе дня
-    message = messages[datetime.now().day % len(messages)]
+    message = messages[int(day[-2:]) % len(messages)]
 
     keyboard = {
         "inline_keyboard": [[
-            {"text": "✅ Сделать чек-ин", "web_app": {"url": WEBAPP_URL}}
+            {"text": "✅ Сделать чек-ин", "web_app": {"url": settings.WEBAPP_URL}}
         ]]
     }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://api.telegram.org/bot{settings.BOT_TOKEN}/sendMessage",
-                json={
-                    "chat_id": telegram_id,
-                    "text": message,
-                    "reply_markup": keyboard
-                },
-                timeout=10
+    return message, keyboard
+
+
+async def enqueue_due_reminders(pool: ConnectionPool, now: datetime) -> tuple:
+    """Забирает пачку наступивших напоминаний и ставит их в outbox.
+
+    В той же транзакции напоминания переносятся на следующий раз, поэтому
+    одно напоминание не попадёт в очередь дважды. Возвращает
+    (сколько забрано, сколько поставлено в очередь).
+    """
+    now_str = now.strftime(TIMESTAMP_FORMAT)
+
+    async def claim(db):
+        cursor = await db.execute(REMINDERS_CLAIM_QUERY, (now_str, REMINDER_BATCH_SIZE))
+        rows = await cursor.fetchall()
+
+        marks = []
+        for row in rows:
+            due_at = datetime.fromisoformat(row["reminder_next_at"]).replace(tzinfo=timezone.utc)
+            reminder_day = local_day(row["reminder_next_at"], row["timezone"])
+            if row["telegram_id"] is None or now - due_at > REMINDER_MAX_LATENESS:
+                continue
+            # Чек-ин за этот день уже сделан — напоминать не нужно
+            if row["last_checkin"] and local_day(row["last_checkin"], row["timezone"]) == reminder_day:
+                continue
+            text, keyboard = reminder_message(row["streak"], reminder_day)
+            await enqueue_message(
+                db, row["telegram_id"], text,
+                dedup_key=f"reminder:{row['id']}:{reminder_day}",
+                reply_markup=keyboard,
             )
-            if response.status_code == 200:
-                print(f"[OK] Reminder sent to {telegram_id}")
-                return True
-            else:
-                print(f"[WARN] Failed to send reminder to {telegram_id}: {response.text}")
-                return False
-    except Exception as e:
-        print(f"[ERROR] Failed to send reminder: {e}")
-        return False
-
-
-async def check_and_send_reminders(db_path: str):
-    """Проверяет кому нужно отправить напоминание и отправляет."""
-    now = datetime.now()
-    current_hour = now.hour
-    today = date.today().isoformat()
-
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-
-        # Находим пользователей у которых:
-        # 1. reminder_enabled = TRUE
-        # 2. reminder_hour = текущий час
-        # 3. last_reminder_date != сегодня (ещё не отправляли)
-        # 4. нет чек-ина сегодня
-        cursor = await db.execute("""
-            SELECT u.id, u.telegram_id, COALESCE(s.current_streak, 0) as streak
-            FROM users u
-            LEFT JOIN streaks s ON u.id = s.user_id
-            LEFT JOIN checkins c ON u.id = c.user_id AND DATE(c.created_at) = DATE('now')
-            WHERE u.reminder_enabled = 1
-              AND u.reminder_hour = ?
-              AND u.telegram_id IS NOT NULL
-              AND (u.last_reminder_date IS NULL OR u.last_reminder_date != ?)
-              AND c.id IS NULL
-        """, (current_hour, today))
-
-        users = await cursor.fetchall()
-
-        if not users:
-            return 0
-
-        sent_count = 0
-        for user in users:
-            success = await send_reminder(user["telegram_id"], user["streak"])
-            if success:
-                # Обновляем last_reminder_date
-                await db.execute(
-                    "UPDATE users SET last_reminder_date = ? WHERE id = ?",
-                    (today, user["id"])
-                )
-                sent_count += 1
-
-        await db.commit()
-        return sent_count
-
-
-async def run_scheduler(db_path: str):
+            marks.append((reminder_day, row["id"]))
+
+        await db.executemany(
+            "UPDATE users SET reminder_next_at = ? WHERE id = ?",
+            [
+                (next_reminder_at(r["reminder_hour"] or 0, r["reminder_minute"] or 0, r["timezone"], now), r["id"])
+                for r in rows
+            ]
+        )
+        await db.executemany("UPDATE users SET last_reminder_date = ? WHERE id = ?", marks)
+        return len(rows), len(marks)
+
+    return await pool.run_write(claim)
+
+
+async def send_due_reminders(pool: ConnectionPool) -> int:
+    """Ставит в outbox все наступившие напоминания, возвращает их число."""
+    queued = 0
+    while True:
+        claimed, batch_queued = await enqueue_due_reminders(pool, datetime.now(timezone.utc))
+        queued += batch_queued
+        if claimed < REMINDER_BATCH_SIZE:
+            return queued
+
+
+async def seconds_until_next_reminder(pool: ConnectionPool) -> float:
+    """Сколько спать до ближайшего напоминания (не дольше SCHEDULER_MAX_SLEEP_SECONDS)."""
+    async with pool.reader() as db:
+        cursor = await db.execute(REMINDERS_NEXT_QUERY)
+        next_at = (await cursor.fetchone())[0]
+    if not next_at:
+        return SCHEDULER_MAX_SLEEP_SECONDS
+    due_at = datetime.fromisoformat(next_at).replace(tzinfo=timezone.utc)
+    delay = (due_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0), SCHEDULER_MAX_SLEEP_SECONDS)
+
+
+async def run_scheduler(pool: ConnectionPool):
     """Запускает планировщик напоминаний."""
     print("[Scheduler] Starting reminder scheduler...")
 
     while True:
         try:
-            # Проверяем только в начале каждого часа (первые 5 минут)
-            now = datetime.now()
-            if now.minute < 5:
-                sent = await check_and_send_reminders(db_path)
-                if sent > 0:
-                    print(f"[Scheduler] Sent {sent} reminders")
-
-            # Ждём 1 минуту
-            await asyncio.sleep(60)
+            sent = await send_due_reminders(pool)
+            if sent > 0:
+                print(f"[Scheduler] Queued {sent} reminders")
+            await asyncio.sleep(await seconds_until_next_reminder(pool))
 
         except Exception as e:
             print(f"[Scheduler] Error: {e}")
-            await asyncio.sleep(60)
+            await asyncio.sleep(SCHEDULER_MAX_SLEEP_SECONDS)
@@ -0,0 +1,175 @@
+"""
+Подсчёт баллов теста на сервере.
+
+Для каждого теста из каталога один раз собирается TestScorer: вопросы
+по коду, допустимые значения, вес, обратная шкала и баллы вариантов.
+reference_score() — простая эталонная реализация тех же правил по
+исходному описанию теста; скомпилированный подсчёт обязан с ней совпадать.
+
+Правила:
+- scale_0_3 / scale_0_10 — целое от 0 до максимума шкалы;
+- yes_no — bool, «да» = 3 балла;
+- choice — вариант из choices (для allow_multiple — список вариантов);
+  балл варианта берётся из choice_values, без них множественный выбор
+  даёт по 1 баллу за вариант, одиночный — 0;
+- reverse_scoring — балл = максимум шкалы - ответ;
+- итог по вопросу умножается на weight (по умолчанию 1);
+- None — вопрос пропущен (0 баллов).
+
+Сверка с эталоном и замер скорости (из папки backend):
+    python -m app.scoring_benchmark
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.db.test_catalog import get_catalog
+
+# Максимальное значение ответа по типу вопроса
+SCALE_MAX = {
+    "scale_0_3": 3,
+    "scale_0_10": 10,
+    "yes_no": 3,
+}
+
+
+class ScoringError(ValueError):
+    """Ответы не соответствуют вопросам теста."""
+
+
+def _is_int(value: Any) -> bool:
+    # bool — подкласс int, но для шкалы это не ответ
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class CompiledQuestion:
+    """Вопрос теста с предвычисленными правилами подсчёта."""
+
+    __slots__ = ("code", "answer_type", "max_value", "weight", "reverse", "multiple", "choice_values")
+
+    def __init__(self, question: Dict):
+        self.code = question["code"]
+        self.answer_type = question["answer_type"]
+        self.weight = question.get("weight", 1)
+        self.reverse = bool(question.get("reverse_scoring"))
+        self.multiple = bool(question.get("allow_multiple"))
+
+        if self.answer_type == "choice":
+            values = question.get("choice_values") or {}
+            default = 1 if self.multiple else 0
+            self.choice_values = {c: values.get(c, default) for c in question.get("choices", [])}
+            self.max_value = None
+        elif self.answer_type in SCALE_MAX:
+            self.choice_values = None
+            self.max_value = SCALE_MAX[self.answer_type]
+        else:
+            raise ScoringError(f"Unknown answer type {self.answer_type} in {self.code}")
+
+    def score(self, value: Any) -> int:
+        if value is None:
+            return 0
+
+        if self.choice_values is not None:
+            if isinstance(value, list):
+                if not self.multiple:
+                    raise ScoringError(f"{self.code}: one choice expected")
+            else:
+                value = (value,)
+            try:
+                picked = set(value)
+            except TypeError:
+                raise ScoringError(f"{self.code}: unknown choice")
+            points = 0
+            for choice in picked:
+                try:
+                    points += self.choice_values[choice]
+                except (KeyError, TypeError):
+                    raise ScoringError(f"{self.code}: unknown choice")
+        elif self.answer_type == "yes_no":
+            if not isinstance(value, bool):
+                raise ScoringError(f"{self.code}: yes/no expected")
+            points = self.max_value if value else 0
+        else:
+            if not _is_int(value) or not 0 <= value <= self.max_value:
+                raise ScoringError(f"{self.code}: value 0..{self.max_value} expected")
+            points = value
+
+        if self.reverse and self.max_value is not None:
+            points = self.max_value - points
+        return points * self.weight
+
+
+class TestScorer:
+    """Скомпилированный подсчёт баллов одного теста."""
+
+    def __init__(self, test: Dict):
+        self.code = test["code"]
+        self.questions = {q["code"]: CompiledQuestion(q) for q in test.get("questions", [])}
+
+    def score(self, answers: Dict[str, Any]) -> int:
+        """Сумма баллов по ответам {код вопроса: значение}."""
+        questions = self.questions
+        total = 0
+        for code, value in answers.items():
+            question = questions.get(code)
+            if question is None:
+                raise ScoringError(f"Unknown question {code} for test {self.code}")
+            total += question.score(value)
+        return total
+
+
+@lru_cache(maxsize=None)
+def get_scorer(test_code: str) -> Optional[TestScorer]:
+    """Подсчёт баллов для теста из каталога (None — теста нет)."""
+    test = get_catalog().get(test_code)
+    return TestScorer(test.data) if test else None
+
+
+def reference_score(test: Dict, answers: Dict[str, Any]) -> int:
+    """Эталонный подсчёт по исходному описанию теста (медленный, для сверки)."""
+    total = 0
+    for code, value in answers.items():
+        question = next((q for q in test.get("questions", []) if q["code"] == code), None)
+        if question is None:
+            raise ScoringError(f"Unknown question {code} for test {test['code']}")
+        if value is None:
+            continue
+
+        answer_type = question["answer_type"]
+        if answer_type == "choice":
+            choices = question.get("choices", [])
+            values = question.get("choice_values") or {}
+            default = 1 if question.get("allow_multiple") else 0
+            if isinstance(value, list):
+                if not question.get("allow_multiple"):
+                    raise ScoringError(f"{code}: one choice expected")
+                try:
+                    picked = list(dict.fromkeys(value))
+                except TypeError:
+                    raise ScoringError(f"{code}: unknown choice")
+            else:
+                picked = [value]
+            points = 0
+            for choice in picked:
+                if not isinstance(choice, str) or choice not in choices:
+                    raise ScoringError(f"{code}: unknown choice")
+                points += values.get(choice, default)
+        elif answer_type == "yes_no":
+            if value is True:
+                points = 3
+            elif value is False:
+                points = 0
+            else:
+                raise ScoringError(f"{code}: yes/no expected")
+        elif answer_type in SCALE_MAX:
+            if type(value) is not int or value < 0 or value > SCALE_MAX[answer_type]:
+                raise ScoringError(f"{code}: value 0..{SCALE_MAX[answer_type]} expected")
+            points = value
+        else:
+            raise ScoringError(f"Unknown answer type {answer_type} in {code}")
+
+        if question.get("reverse_scoring") and answer_type != "choice":
+            points = SCALE_MAX[answer_type] - points
+        total += points * question.get("weight", 1)
+    return total
+
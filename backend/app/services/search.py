@@ -0,0 +1,207 @@
+"""
+Полнотекстовый поиск по статьям и дневнику (FTS5, см. SEARCH_SCHEMA).
+
+В SQLite нет русского стеммера, поэтому окончания отбрасываются
+при разборе запроса: «тревоги» ищется как префикс «тревог*» и находит
+«тревога», «тревогу», «тревогой». Варианты с «е»/«ё» ищутся оба.
+
+Подсветка совпадений — **...**, как выделение в текстах статей.
+
+Проверка основ и поиска по статьям (из папки backend), код возврата 1
+при ошибке:
+    python -m app.services.search
+"""
+
+import asyncio
+import re
+import sys
+from itertools import product
+from typing import Dict, List, Optional
+
+# Сколько слов запроса учитывается
+MAX_QUERY_TERMS = 8
+
+# Отрывок с совпадением: маркеры подсветки и длина в словах
+HIGHLIGHT_OPEN = "**"
+HIGHLIGHT_CLOSE = "**"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 12
+
+# Окончания, которые отбрасываются (сначала длинные)
+RUSSIAN_ENDINGS = tuple(sorted((
+    "ться", "тся", "ся", "сь",
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ешь", "ишь",
+    "ой", "ей", "ый", "ий", "ая", "яя", "ое", "ее", "ые", "ие", "ую", "юю",
+    "ом", "ем", "ам", "ям", "ах", "ях", "ов", "ев", "ию", "ия", "ть", "ет", "ит",
+    "ут", "ют", "ат", "ят",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+), key=len, reverse=True))
+
+# Короче этого основа не укорачивается («игра», «игры», «игру» → «игр»)
+MIN_STEM_LENGTH = 3
+
+# Для скольких букв «е» в слове перебираются варианты с «ё»
+MAX_YO_POSITIONS = 3
+
+ARTICLES_SEARCH_QUERY = """
+SELECT a.id, a.title, a.category, a.read_time,
+       highlight(articles_fts, 0, ?, ?),
+       snippet(articles_fts, 1, ?, ?, ?, ?)
+FROM articles_fts
+JOIN articles a ON a.id = articles_fts.rowid
+WHERE articles_fts MATCH ?
+ORDER BY rank
+LIMIT ?
+"""
+
+DIARY_SEARCH_QUERY = """
+SELECT e.id, e.created_at,
+       snippet(thought_entries_fts, 0, ?, ?, ?, ?),
+       snippet(thought_entries_fts, 1, ?, ?, ?, ?),
+       snippet(thought_entries_fts, 2, ?, ?, ?, ?)
+FROM thought_entries_fts
+JOIN thought_entries e ON e.id = thought_entries_fts.rowid
+WHERE thought_entries_fts MATCH ? AND e.user_id = ?
+ORDER BY rank
+LIMIT ?
+"""
+
+_word_re = re.compile(r"\w+")
+_cyrillic_re = re.compile(r"^[а-яё]+$")
+
+
+def stem_token(token: str) -> str:
+    """Основа слова для префиксного поиска (латиница и числа — без изменений)."""
+    if not _cyrillic_re.match(token):
+        return token
+    for ending in RUSSIAN_ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+def _yo_variants(stem: str) -> List[str]:
+    """Написания основы с «е» и «ё» (unicode61 их не отождествляет)."""
+    positions = [i for i, char in enumerate(stem) if char == "е"]
+    if not positions or len(positions) > MAX_YO_POSITIONS:
+        return [stem]
+    variants = []
+    for letters in product("её", repeat=len(positions)):
+        chars = list(stem)
+        for position, letter in zip(positions, letters):
+            chars[position] = letter
+        variants.append("".join(chars))
+    return variants
+
+
+def _term(token: str) -> str:
+    phrases = [f'"{variant}"*' for variant in _yo_variants(stem_token(token.replace("ё", "е")))]
+    return phrases[0] if len(phrases) == 1 else "(" + " OR ".join(phrases) + ")"
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Выражение FTS5 MATCH из текста запроса (все слова обязательны).
+
+    Слова берутся только из букв и цифр и всегда в кавычках, поэтому
+    синтаксис FTS5 из запроса не выполняется. None — искать нечего.
+    """
+    tokens = _word_re.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not tokens:
+        return None
+    return " AND ".join(_term(token) for token in tokens)
+
+
+async def search_articles(db, match: str, limit: int) -> List[Dict]:
+    """Статьи по релевантности (совпадение в заголовке весит больше)."""
+    async with db.execute(
+        ARTICLES_SEARCH_QUERY,
+        (HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE,
+         HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE, SNIPPET_ELLIPSIS, SNIPPET_TOKENS,
+         match, limit)
+    ) as cursor:
+        rows = await cursor.fetchall()
+
+    return [
+        {
+            "id": article_id,
+            "title": title,
+            "category": category,
+            "readTime": read_time,
+            "titleHighlight": title_highlight,
+            "snippet": snippet,
+        }
+        for article_id, title, category, read_time, title_highlight, snippet in rows
+    ]
+
+
+async def search_diary(db, user_id: int, match: str, limit: int) -> List[Dict]:
+    """Записи дневника пользователя по релевантности.
+
+    Отбор по user_id — и в самом индексе (быстро), и по thought_entries
+    (строго: чужая запись не попадёт в выдачу, даже если индекс отстал).
+    """
+    async with db.execute(
+        DIARY_SEARCH_QUERY,
+        (*(HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE, SNIPPET_ELLIPSIS, SNIPPET_TOKENS) * 3,
+         f'user_id : "{int(user_id)}" AND {{situation thought reaction}} : ({match})',
+         user_id, limit)
+    ) as cursor:
+        rows = await cursor.fetchall()
+
+    results = []
+    for entry_id, created_at, *snippets in rows:
+        # Отрывок из первого поля, где есть совпадение
+        field = next((i for i, s in enumerate(snippets) if s and HIGHLIGHT_OPEN in s), 0)
+        results.append({
+            "id": str(entry_id),
+            "createdAt": created_at,
+            "field": ("situation", "thought", "reaction")[field],
+            "snippet": snippets[field],
+        })
+    return results
+
+
+# Формы одного слова: одна основа и одни и те же статьи
+STEM_CHECKS = (
+    (("игра", "игры", "игру", "игрой"), "игр"),
+    (("тревога", "тревоги", "тревогу", "тревогой"), "тревог"),
+    (("триггер", "триггеры", "триггеров"), "триггер"),
+)
+
+
+async def _check_search() -> list:
+    """Ошибки самопроверки: основы форм и выдача по статьям."""
+    import aiosqlite
+
+    from app.db.schema_v3 import SCHEMA_V3, migrate_search_index
+    from app.db.seed_articles import seed_articles
+
+    failures = []
+    async with aiosqlite.connect(":memory:") as db:
+        await db.executescript(SCHEMA_V3)
+        await migrate_search_index(db)
+        await seed_articles(db)
+
+        for forms, stem in STEM_CHECKS:
+            found = {}
+            for form in forms:
+                if stem_token(form) != stem:
+                    failures.append(f"stem {form}: {stem_token(form)}, expected {stem}")
+                rows = await search_articles(db, build_match_query(form), 100)
+                found[form] = {row["id"] for row in rows}
+            if not found[forms[0]]:
+                failures.append(f"no articles for {forms[0]}")
+            failures.extend(
+                f"{form}: {sorted(ids)}, {forms[0]}: {sorted(found[forms[0]])}"
+                for form, ids in found.items() if ids != found[forms[0]]
+            )
+    return failures
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(_check_search())
+    if failures:
+        for failure in failures:
+            print(f"[WARN] Search check failed: {failure}")
+        sys.exit(1)
+    print(f"[OK] {sum(len(forms) for forms, _ in STEM_CHECKS)} word forms checked")
@@ -0,0 +1,310 @@
+"""
+Серии (streaks).
+
+- серия — результат advance() по чек-инам в порядке created_at;
+- apply_checkin() — обновление при новом чек-ине: за O(1), а для
+  запоздавшего чек-ина (день раньше последнего учтённого) — пересчётом
+  истории по тому же правилу;
+- границы дня считаются в часовом поясе пользователя;
+- audit_streaks() — фоновая сверка серий с историей чек-инов.
+
+Запуск аудита вручную (из папки backend):
+    python -m app.services.streaks
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.config import settings
+from app.db.pool import ConnectionPool
+
+# Размер пачки исправлений, записываемых одной транзакцией
+AUDIT_BATCH_SIZE = 500
+
+STREAK_STATE_QUERY = """
+SELECT u.timezone, s.current_streak, s.best_streak, s.last_checkin_date
+FROM users u
+LEFT JOIN streaks s ON s.user_id = u.id
+WHERE u.id = ?
+"""
+
+STREAK_REPLAY_QUERY = "SELECT relapse, created_at FROM checkins WHERE user_id = ? ORDER BY created_at, id"
+
+# Аудит: все чек-ины одним проходом, по пользователям
+AUDIT_CHECKINS_QUERY = """
+SELECT c.id, c.user_id, c.relapse, c.created_at, u.timezone,
+       s.current_streak, s.best_streak, s.last_checkin_date
+FROM checkins c
+JOIN users u ON u.id = c.user_id
+LEFT JOIN streaks s ON s.user_id = c.user_id
+ORDER BY c.user_id, c.created_at, c.id
+"""
+
+# Аудит: ненулевые серии у пользователей без чек-инов
+AUDIT_EMPTY_QUERY = """
+SELECT s.user_id FROM streaks s
+WHERE (s.current_streak != 0 OR s.best_streak != 0 OR s.last_checkin_date IS NOT NULL)
+  AND NOT EXISTS (SELECT 1 FROM checkins c WHERE c.user_id = s.user_id)
+"""
+
+# Исправление серии, если после прохода аудита не появилось новых чек-инов
+AUDIT_REPAIR_QUERY = """
+INSERT INTO streaks (user_id, current_streak, best_streak, last_checkin_date)
+SELECT ?, ?, ?, ?
+WHERE NOT EXISTS (SELECT 1 FROM checkins WHERE user_id = ? AND id > ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    current_streak = excluded.current_streak,
+    best_streak = excluded.best_streak,
+    last_checkin_date = excluded.last_checkin_date
+"""
+
+
+@lru_cache(maxsize=256)
+def get_zone(name: Optional[str]):
+    """Возвращает часовой пояс по имени IANA (неизвестные — UTC)."""
+    try:
+        return ZoneInfo(name or settings.DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def is_valid_timezone(name: str) -> bool:
+    """Проверяет имя часового пояса IANA."""
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+def local_day(created_at: Optional[str] = None, tz_name: Optional[str] = None) -> str:
+    """Локальная дата пользователя для момента created_at (UTC, как CURRENT_TIMESTAMP).
+
+    Без created_at — текущая дата пользователя.
+    """
+    if created_at is None:
+        moment = datetime.now(timezone.utc)
+    else:
+        moment = datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc)
+    return moment.astimezone(get_zone(tz_name)).date().isoformat()
+
+
+def local_day_bounds(tz_name: Optional[str] = None) -> tuple[str, str]:
+    """Границы текущего локального дня пользователя в UTC (формат CURRENT_TIMESTAMP)."""
+    zone = get_zone(tz_name)
+    today = datetime.now(timezone.utc).astimezone(zone).date()
+    start = datetime.combine(today, datetime.min.time(), tzinfo=zone)
+    end = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    return (
+        start.astimezone(timezone.utc).strftime(fmt),
+        end.astimezone(timezone.utc).strftime(fmt),
+    )
+
+
+def advance(streak: Optional[dict], relapse: bool, day: str) -> dict:
+    """Новое состояние серии после чек-ина за локальный день day.
+
+    Чек-ины должны идти в порядке created_at (см. apply_checkin).
+
+    - срыв обнуляет серию;
+    - повторный чек-ин за уже учтённый день серию не меняет;
+    - чек-ин на следующий день продлевает серию;
+    - пропуск дней начинает серию заново.
+    """
+    if not streak or not streak.get("last_checkin_date"):
+        current = 0 if relapse else 1
+        best = max(streak.get("best_streak") or 0, current) if streak else current
+        return {"current_streak": current, "best_streak": best, "last_checkin_date": day}
+
+    current = streak.get("current_streak") or 0
+    best = streak.get("best_streak") or 0
+    last_day = streak["last_checkin_date"]
+
+    if relapse:
+        current = 0
+    elif day <= last_day:
+        pass
+    elif date.fromisoformat(day) - date.fromisoformat(last_day) == timedelta(days=1):
+        current += 1
+    else:
+        current = 1
+
+    return {
+        "current_streak": current,
+        "best_streak": max(best, current),
+        "last_checkin_date": max(day, last_day),
+    }
+
+
+async def load_streak_state(db, user_id: int) -> tuple[Optional[dict], Optional[str]]:
+    """Возвращает (серия или None, часовой пояс пользователя)."""
+    cursor = await db.execute(STREAK_STATE_QUERY, (user_id,))
+    row = await cursor.fetchone()
+    if not row:
+        return None, None
+    streak = None
+    if row["current_streak"] is not None:
+        streak = {
+            "current_streak": row["current_streak"],
+            "best_streak": row["best_streak"],
+            "last_checkin_date": row["last_checkin_date"],
+        }
+    return streak, row["timezone"]
+
+
+async def replay_streak(db, user_id: int, tz_name: Optional[str]) -> Optional[dict]:
+    """Серия по всем чек-инам пользователя в порядке created_at (как в аудите)."""
+    cursor = await db.execute(STREAK_REPLAY_QUERY, (user_id,))
+    streak = None
+    for row in await cursor.fetchall():
+        streak = advance(streak, bool(row["relapse"]), local_day(row["created_at"], tz_name))
+    return streak
+
+
+async def apply_checkin(
+    db, user_id: int, streak: Optional[dict], relapse: bool, created_at: str, tz_name: Optional[str]
+) -> dict:
+    """Серия после нового чек-ина (он уже вставлен в checkins, без commit).
+
+    Чек-ин за день раньше last_checkin_date (офлайн-очередь, пачка) меняет
+    историю задним числом — серия пересчитывается по всем чек-инам, чтобы
+    совпадать с аудитом.
+    """
+    day = local_day(created_at, tz_name)
+    if streak and streak.get("last_checkin_date") and day < streak["last_checkin_date"]:
+        return await replay_streak(db, user_id, tz_name)
+    return advance(streak, relapse, day)
+
+
+async def save_streak(db, user_id: int, streak: dict):
+    """Сохраняет серию (upsert, без commit)."""
+    await db.execute(
+        """INSERT INTO streaks (user_id, current_streak, best_streak, last_checkin_date)
+           VALUES (?, ?, ?, ?)
+           ON CONFLICT(user_id) DO UPDATE SET
+               current_streak = excluded.current_streak,
+               best_streak = excluded.best_streak,
+               last_checkin_date = excluded.last_checkin_date""",
+        (user_id, streak["current_streak"], streak["best_streak"], streak["last_checkin_date"])
+    )
+
+
+# =========================================
+# АУДИТ
+# =========================================
+
+def _differs(stored: dict, computed: dict) -> bool:
+    return (
+        (stored["current_streak"] or 0) != computed["current_streak"]
+        or (stored["best_streak"] or 0) != computed["best_streak"]
+        or stored["last_checkin_date"] != computed["last_checkin_date"]
+    )
+
+
+async def _apply_repairs(pool: ConnectionPool, repairs: list):
+    """Записывает исправления, если у пользователя не появилось новых чек-инов."""
+    async def write(db):
+        await db.executemany(AUDIT_REPAIR_QUERY, repairs)
+
+    await pool.run_write(write)
+
+
+async def audit_streaks(pool: ConnectionPool) -> dict:
+    """Пересчитывает серии всех пользователей из checkins за один проход и чинит расхождения."""
+    started = time.perf_counter()
+    users = 0
+    repairs = []
+    repaired = 0
+
+    def finish_user(user_id, stored, computed, max_checkin_id):
+        if stored["current_streak"] is None or _differs(stored, computed):
+            repairs.append((
+                user_id, computed["current_streak"], computed["best_streak"],
+                computed["last_checkin_date"], user_id, max_checkin_id,
+            ))
+
+    async with pool.reader() as db:
+        cursor = await db.execute(AUDIT_CHECKINS_QUERY)
+
+        user_id = None
+        stored = computed = None
+        max_checkin_id = 0
+        async for row in cursor:
+            if row["user_id"] != user_id:
+                if user_id is not None:
+                    finish_user(user_id, stored, computed, max_checkin_id)
+                users += 1
+                user_id = row["user_id"]
+                stored = {
+                    "current_streak": row["current_streak"],
+                    "best_streak": row["best_streak"],
+                    "last_checkin_date": row["last_checkin_date"],
+                }
+                computed = None
+                max_checkin_id = 0
+
+            day = local_day(row["created_at"], row["timezone"])
+            computed = advance(computed, bool(row["relapse"]), day)
+            max_checkin_id = max(max_checkin_id, row["id"])
+
+            if len(repairs) >= AUDIT_BATCH_SIZE:
+                repaired += len(repairs)
+                await _apply_repairs(pool, repairs)
+                repairs = []
+
+        if user_id is not None:
+            finish_user(user_id, stored, computed, max_checkin_id)
+
+        # Серии пользователей без чек-инов должны быть нулевыми
+        cursor = await db.execute(AUDIT_EMPTY_QUERY)
+        for row in await cursor.fetchall():
+            users += 1
+            repairs.append((row["user_id"], 0, 0, None, row["user_id"], 0))
+
+    if repairs:
+        repaired += len(repairs)
+        await _apply_repairs(pool, repairs)
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "users": users,
+        "repaired": repaired,
+        "seconds": round(elapsed, 3),
+        "users_per_second": round(users / elapsed, 1) if elapsed > 0 else None,
+    }
+    print(
+        f"[StreakAudit] {users} users checked, {repaired} repaired "
+        f"in {report['seconds']}s ({report['users_per_second']} users/s)"
+    )
+    return report
+
+
+async def run_streak_audit(pool: ConnectionPool):
+    """Периодически запускает аудит серий."""
+    interval = settings.STREAK_AUDIT_INTERVAL_HOURS * 3600
+    print("[StreakAudit] Starting streak audit loop...")
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await audit_streaks(pool)
+        except Exception as e:
+            print(f"[StreakAudit] Error: {e}")
+
+
+if __name__ == "__main__":
+    from app.db.database import pool as app_pool
+
+    async def main():
+        await app_pool.open()
+        try:
+            await audit_streaks(app_pool)
+        finally:
+            await app_pool.close()
+
+    asyncio.run(main())
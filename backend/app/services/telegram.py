@@ -0,0 +1,186 @@
+"""
+Клиент Telegram Bot API.
+
+Один общий httpx.AsyncClient на всё приложение (соединения переиспользуются),
+ограничение числа одновременных запросов и скорости отправки:
+- общий лимит бота (TELEGRAM_GLOBAL_RATE, у Telegram ~30 сообщений в секунду);
+- не чаще одного сообщения в секунду в один чат;
+- на 429 ждём retry_after и повторяем запрос.
+
+Адрес API настраивается (TELEGRAM_API_URL), поэтому клиент можно
+направить на локальный фейковый Bot API. Проверка лимитов и доставки
+на фейковом API (из папки backend):
+    python -m app.telegram_benchmark
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+# Сколько чатов держим в таблице последних отправок, прежде чем чистить старые
+CHAT_LIMITS_MAX = 10000
+
+
+class TelegramError(Exception):
+    """Ошибка Bot API (ok=false или сетевой сбой)."""
+
+    def __init__(self, description: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(description)
+        self.description = description
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Имеет ли смысл повторить запрос позже."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, запас не больше capacity."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Останавливает выдачу токенов (после 429 от Telegram)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def refund(self):
+        """Возвращает неиспользованный токен."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class TelegramClient:
+    """Общий клиент Bot API с ограничением скорости."""
+
+    def __init__(self, token: str, api_url: str = "https://api.telegram.org",
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._chat_next: Dict[int, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    async def open(self):
+        """Создаёт общий HTTP-клиент (вызывается в lifespan или при первом запросе)."""
+        if self._client is None:
+            self._semaphore = asyncio.Semaphore(settings.TELEGRAM_MAX_CONCURRENCY)
+            self._bucket = TokenBucket(settings.TELEGRAM_GLOBAL_RATE)
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.api_url}/bot{self.token}",
+                timeout=settings.TELEGRAM_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.TELEGRAM_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.TELEGRAM_MAX_CONCURRENCY,
+                ),
+                transport=self.transport,
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _chat_delay(self, chat_id: int) -> float:
+        """Сколько ждать до отправки в чат; 0 — чат свободен, отправка засчитана сейчас."""
+        now = time.monotonic()
+        if len(self._chat_next) > CHAT_LIMITS_MAX:
+            self._chat_next = {k: v for k, v in self._chat_next.items() if v > now}
+        slot = self._chat_next.get(chat_id, 0.0)
+        if slot > now:
+            return slot - now
+        self._chat_next[chat_id] = now + settings.TELEGRAM_CHAT_INTERVAL
+        return 0.0
+
+    async def _acquire(self, chat_id: Optional[int]):
+        """Токен общего лимита и, для чата, не чаще одного сообщения в TELEGRAM_CHAT_INTERVAL.
+
+        Интервал отсчитывается от момента, когда токен получен: ожидание
+        в очереди общего лимита не сжимает промежуток между сообщениями чата.
+        """
+        while True:
+            await self._bucket.acquire()
+            if chat_id is None:
+                return
+            delay = self._chat_delay(chat_id)
+            if delay <= 0:
+                return
+            self._bucket.refund()
+            await asyncio.sleep(delay)
+
+    async def call(self, method: str, payload: Dict, chat_id: Optional[int] = None) -> Dict:
+        """Вызывает метод Bot API и возвращает result.
+
+        На 429 ждёт retry_after и повторяет (до TELEGRAM_MAX_RETRIES раз),
+        остальные ошибки поднимает как TelegramError.
+        """
+        if not self.enabled:
+            raise TelegramError("BOT_TOKEN not set")
+        await self.open()
+
+        attempt = 0
+        while True:
+            await self._acquire(chat_id)
+
+            async with self._semaphore:
+                try:
+                    response = await self._client.post(f"/{method}", json=payload)
+                    data = response.json()
+                except (httpx.HTTPError, ValueError) as e:
+                    raise TelegramError(f"{type(e).__name__}: {e}")
+
+            if data.get("ok"):
+                return data.get("result")
+
+            retry_after = (data.get("parameters") or {}).get("retry_after")
+            error = TelegramError(
+                data.get("description", response.text),
+                status_code=response.status_code,
+                retry_after=retry_after,
+            )
+            if response.status_code != 429 or attempt >= settings.TELEGRAM_MAX_RETRIES:
+                raise error
+
+            # Лимит превышен для всего бота: приостанавливаем все отправки
+            attempt += 1
+            self._bucket.pause(retry_after or 1)
+
+    async def send_message(self, chat_id: int, text: str, **params) -> Dict:
+        """sendMessage с учётом лимита на чат."""
+        payload = {"chat_id": chat_id, "text": text, **params}
+        return await self.call("sendMessage", payload, chat_id=chat_id)
+
+
+telegram = TelegramClient(settings.BOT_TOKEN, settings.TELEGRAM_API_URL)
@@ -7,9 +7,101 @@ from typing import Optional, Dict, Any, List
 import random
 import json
 
-from app.db.tests_level_a import LEVEL_A_TESTS
-from app.db.tests_level_b import LEVEL_B_TESTS, DAILY_TEST_ROTATION
-from app.db.tests_level_cd import LEVEL_C_TESTS, LEVEL_D_TESTS, CRISIS_KEYWORDS
+from app.db.test_catalog import CatalogTest, ScoreRange, get_catalog
+from app.db.tests_level_cd import CRISIS_KEYWORDS
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Время последнего прохождения каждого теста
+TEST_HISTORY_QUERY = """
+SELECT test_id, MAX(created_at)
+FROM test_results
+WHERE user_id = ?
+GROUP BY test_id
+"""
+
+# То же и время последнего чек-ина (строка с test_id = NULL)
+TEST_HISTORY_SNAPSHOT_QUERY = f"""{TEST_HISTORY_QUERY}
+UNION ALL
+SELECT NULL, MAX(created_at) FROM checkins WHERE user_id = ?
+"""
+
+USER_PROFILE_QUERY = "SELECT * FROM user_profiles WHERE user_id = ?"
+
+
+class TestHistory:
+    """Снимок истории пользователя для выбора теста.
+
+    Загружается одним запросом: время последнего прохождения каждого теста
+    и время последнего чек-ина. Все правила выбора работают по нему в памяти.
+    """
+
+    def __init__(self, last_taken: Dict[str, str], last_checkin: Optional[str]):
+        self.last_taken = last_taken
+        self.last_checkin = last_checkin
+        self.now = datetime.utcnow()
+
+    @classmethod
+    async def load(cls, db, user_id: int) -> "TestHistory":
+        async with db.execute(TEST_HISTORY_SNAPSHOT_QUERY, (user_id, user_id)) as cursor:
+            rows = await cursor.fetchall()
+
+        last_checkin = None
+        results = []
+        for test_id, taken_at in rows:
+            if test_id is None:
+                last_checkin = taken_at
+            else:
+                results.append((test_id, taken_at))
+        return cls.from_results(results, last_checkin)
+
+    @classmethod
+    async def load_results(cls, db, user_id: int, last_checkin: Optional[str]) -> "TestHistory":
+        """Как load, когда время последнего чек-ина уже известно."""
+        async with db.execute(TEST_HISTORY_QUERY, (user_id,)) as cursor:
+            rows = await cursor.fetchall()
+        return cls.from_results(rows, last_checkin)
+
+    @classmethod
+    def from_results(cls, rows, last_checkin: Optional[str]) -> "TestHistory":
+        """Снимок из пар (test_id, время последнего прохождения)."""
+        catalog = get_catalog()
+        last_taken = {}
+        for test_id, taken_at in rows:
+            test = catalog.get_by_id(test_id)
+            if test:
+                last_taken[test.code] = taken_at
+        return cls(last_taken, last_checkin)
+
+    def taken_since(self, test_code: str, since: str) -> bool:
+        """Проходился ли тест начиная с момента since (UTC, формат created_at)."""
+        taken_at = self.last_taken.get(test_code)
+        return taken_at is not None and taken_at >= since
+
+    def shown_recently(self, test_code: str, hours: int = 24) -> bool:
+        """Проходился ли тест за последние hours часов."""
+        since = (self.now - timedelta(hours=hours)).strftime(TIMESTAMP_FORMAT)
+        return self.taken_since(test_code, since)
+
+    def completed_today(self, test_code: str) -> bool:
+        """Проходился ли тест сегодня (по UTC, как date('now'))."""
+        return self.taken_since(test_code, self.now.strftime("%Y-%m-%d"))
+
+    def last_checkin_date(self) -> Optional[datetime]:
+        """Дата последнего чек-ина."""
+        if not self.last_checkin:
+            return None
+        return datetime.fromisoformat(self.last_checkin.replace('Z', '+00:00').split('+')[0])
+
+    def least_recent(self, test_codes: List[str]) -> Optional[str]:
+        """Код теста, который дольше всех не проходился (непройденные — первыми)."""
+        if not test_codes:
+            return None
+        for code in test_codes:
+            if code not in self.last_taken:
+                return code
+        return min(test_codes, key=lambda code: self.last_taken[code])
 
 
 class TestEngine:
@@ -32,18 +124,49 @@ class TestEngine:
         if not profile.get("onboarding_completed"):
             return await self._get_onboarding_test(user_id, profile)
         
+        # Вся история — одним запросом, дальше правила работают в памяти
+        history = await TestHistory.load(self.db, user_id)
+        return self._choose_test(history, context, profile)
+
+    async def get_test_hint(
+        self,
+        user_id: int,
+        profile: Dict,
+        last_checkin: Optional[str]
+    ) -> Optional[Dict]:
+        """Какой тест ждёт пользователя (без вопросов и контекста чек-ина).
+
+        Для главного экрана: профиль и время последнего чек-ина уже
+        загружены, профиль не создаётся.
+        """
+        if not profile.get("onboarding_completed"):
+            test = await self._get_onboarding_test(user_id, profile)
+        else:
+            history = await TestHistory.load_results(self.db, user_id, last_checkin)
+            test = self._choose_test(history, {}, profile)
+        if not test:
+            return None
+        return {"code": test["code"], "level": test["level"], "name": test["name"]}
+
+    def _choose_test(
+        self,
+        history: TestHistory,
+        context: Dict,
+        profile: Dict
+    ) -> Optional[Dict]:
+        """Тест после онбординга: событийный, еженедельный или ежедневный."""
         # 2. Проверяем событийные тесты (D) — высший приоритет
-        event_test = await self._check_event_tests(user_id, context, profile)
+        event_test = self._check_event_tests(history, context, profile)
         if event_test:
             return event_test
         
         # 3. Проверяем еженедельный тест (C) — по воскресеньям
-        weekly_test = await self._check_weekly_test(user_id, context, profile)
+        weekly_test = self._check_weekly_test(history, context, profile)
         if weekly_test:
             return weekly_test
         
         # 4. Выбираем ежедневный тест (B)
-        return await self._get_daily_test(user_id, context, profile)
+        return self._get_daily_test(history, context, profile)
     
     # =========================================
     # ОНБОРДИНГ (A)
@@ -65,24 +188,22 @@ class TestEngine:
         day = profile.get("onboarding_day", 0)
         track = profile.get("track", "gambling")
 
-        print(f"=== ONBOARDING: day={day}, track={track} ===")
-
         if day == 0 or day == 1:
-            return self._format_test(LEVEL_A_TESTS["A1"])
+            return self._format_test(self._test_data("A1"))
 
         elif day == 2:
             # Показываем тест по выбранному треку
             if track == "gambling":
-                return self._format_test(LEVEL_A_TESTS["A2"])
+                return self._format_test(self._test_data("A2"))
             elif track == "trading":
-                return self._format_test(LEVEL_A_TESTS["A3"])
+                return self._format_test(self._test_data("A3"))
             elif track == "digital":
-                return self._format_test(LEVEL_A_TESTS["A4"])
+                return self._format_test(self._test_data("A4"))
             return None
 
         elif day == 3:
             # Финальный тест эмоциональной регуляции для всех
-            return self._format_test(LEVEL_A_TESTS["A5"])
+            return self._format_test(self._test_data("A5"))
 
         return None
     async def complete_onboarding_test(
@@ -100,11 +221,11 @@ class TestEngine:
         - A5 -> onboarding_completed
         """
 
-        test = LEVEL_A_TESTS.get(test_code)
-        if not test:
+        test = get_catalog().get(test_code)
+        if not test or test.level != "A":
             return {"error": "Test not found"}
 
-        interpretation = self._interpret_score(test, score)
+        interpretation = self._interpret_score(test, test.interpret(score), score)
         profile_updates = {}
 
         if test_code == "A1":
@@ -115,7 +236,7 @@ class TestEngine:
             return {
                 "interpretation": interpretation,
                 "show_track_selection": True,
-                "track_options": test.get("track_options", []),
+                "track_options": test.data.get("track_options", []),
             }
 
         elif test_code == "A2":
@@ -154,9 +275,9 @@ class TestEngine:
     # СОБЫТИЙНЫЕ ТЕСТЫ (D)
     # =========================================
     
-    async def _check_event_tests(
+    def _check_event_tests(
         self,
-        user_id: int,
+        history: TestHistory,
         context: Dict,
         profile: Dict
     ) -> Optional[Dict]:
@@ -164,28 +285,28 @@ class TestEngine:
         
         # D1: Срыв
         if context.get("relapse"):
-            if not await self._was_shown_recently(user_id, "D1", hours=24):
-                return self._format_test(LEVEL_D_TESTS.get("D1"))
+            if not history.shown_recently("D1", hours=24):
+                return self._format_test(self._test_data("D1"))
         
         # D2: Высокая тяга (≥7)
         urge = context.get("urge", 0)
         if urge and urge >= 7:
-            if not await self._was_shown_recently(user_id, "D2", hours=12):
-                return self._format_test(LEVEL_D_TESTS.get("D2"))
+            if not history.shown_recently("D2", hours=12):
+                return self._format_test(self._test_data("D2"))
         
         # D3: Кризисные слова в заметке
         note = context.get("note", "") or ""
         if note and any(keyword in note.lower() for keyword in CRISIS_KEYWORDS):
-            if not await self._was_shown_recently(user_id, "D3", hours=24):
-                return self._format_test(LEVEL_D_TESTS.get("D3"))
+            if not history.shown_recently("D3", hours=24):
+                return self._format_test(self._test_data("D3"))
         
         # D4: Возврат после долгого отсутствия (3+ дней)
-        last_checkin = await self._get_last_checkin_date(user_id)
+        last_checkin = history.last_checkin_date()
         if last_checkin:
             days_since = (datetime.now() - last_checkin).days
             if days_since >= 3:
-                if not await self._was_shown_recently(user_id, "D4", hours=168):  # 7 дней
-                    return self._format_test(LEVEL_D_TESTS.get("D4"))
+                if not history.shown_recently("D4", hours=168):  # 7 дней
+                    return self._format_test(self._test_data("D4"))
         
         return None
     
@@ -193,9 +314,9 @@ class TestEngine:
     # ЕЖЕНЕДЕЛЬНЫЕ ТЕСТЫ (C)
     # =========================================
     
-    async def _check_weekly_test(
+    def _check_weekly_test(
         self,
-        user_id: int,
+        history: TestHistory,
         context: Dict,
         profile: Dict
     ) -> Optional[Dict]:
@@ -210,16 +331,9 @@ class TestEngine:
         # Проверяем не проходил ли уже на этой неделе
         week_start = today - timedelta(days=today.weekday())
         
-        async with self.db.execute(
-            """SELECT COUNT(*) FROM test_results tr
-               JOIN tests t ON tr.test_id = t.id
-               WHERE tr.user_id = ? AND t.level = 'C'
-               AND tr.created_at >= ?""",
-            (user_id, week_start.strftime("%Y-%m-%d"))
-        ) as cursor:
-            count = (await cursor.fetchone())[0]
-            if count > 0:
-                return None
+        week_start_str = week_start.strftime("%Y-%m-%d")
+        if any(history.taken_since(code, week_start_str) for code in get_catalog().codes("C")):
+            return None
         
         # Выбираем тест в зависимости от трека
         track = profile.get("track", "gambling")
@@ -228,17 +342,17 @@ class TestEngine:
         weekly_tests = ["C1", "C2", "C3", "C4"]
         
         # Находим какой тест давно не проходил
-        test_code = await self._get_least_recent_test(user_id, weekly_tests)
+        test_code = history.least_recent(weekly_tests)
         
-        return self._format_test(LEVEL_C_TESTS.get(test_code))
+        return self._format_test(self._test_data(test_code))
     
     # =========================================
     # ЕЖЕДНЕВНЫЕ ТЕСТЫ (B)
     # =========================================
     
-    async def _get_daily_test(
+    def _get_daily_test(
         self,
-        user_id: int,
+        history: TestHistory,
         context: Dict,
         profile: Dict
     ) -> Optional[Dict]:
@@ -283,21 +397,21 @@ class TestEngine:
 
         # 1. Сначала приоритетные (если не прошёл сегодня)
         for code in priority:
-            if not await self._was_completed_today(user_id, code):
-                test = LEVEL_B_TESTS.get(code)
+            if not history.completed_today(code):
+                test = self._test_data(code)
                 if test:
                     return self._format_test(test)
 
         # 2. Ротация — выбираем тест, который давно не проходил
-        test_code = await self._get_least_recent_test(user_id, rotation_pool)
-        if test_code and not await self._was_completed_today(user_id, test_code):
-            test = LEVEL_B_TESTS.get(test_code)
+        test_code = history.least_recent(rotation_pool)
+        if test_code and not history.completed_today(test_code):
+            test = self._test_data(test_code)
             if test:
                 return self._format_test(test)
 
         # 3. Fallback — базовый тест тяги
-        if not await self._was_completed_today(user_id, "B1_1"):
-            return self._format_test(LEVEL_B_TESTS.get("B1_1"))
+        if not history.completed_today("B1_1"):
+            return self._format_test(self._test_data("B1_1"))
 
         # Всё пройдено за сегодня
         return None
@@ -315,32 +429,31 @@ class TestEngine:
     ) -> Dict:
         """Обрабатывает результат любого теста."""
         
-        test = (
-            LEVEL_A_TESTS.get(test_code) or
-            LEVEL_B_TESTS.get(test_code) or
-            LEVEL_C_TESTS.get(test_code) or
-            LEVEL_D_TESTS.get(test_code)
-        )
+        test = get_catalog().get(test_code)
         
         if not test:
             return {"error": "Test not found", "bot_message": "Тест не найден"}
         
-        interpretation = self._interpret_score(test, score)
+        band = test.interpret(score)
+        interpretation = self._interpret_score(test, band, score)
         await self._save_test_result(user_id, test_code, answers, score, interpretation)
         
-        bot_message = self._get_bot_response(test, score, interpretation)
-        actions = self._get_recommended_actions(test, interpretation)
-        
+        # Ответ бота и действия предвычислены для каждого диапазона в каталоге
         return {
             "interpretation": interpretation,
-            "bot_message": bot_message,
-            "actions": actions,
+            "bot_message": band.bot_message if band else interpretation["message"],
+            "actions": list(band.actions) if band else [],
         }
     
     # =========================================
     # ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ
     # =========================================
     
+    def _test_data(self, test_code: str) -> Optional[Dict]:
+        """Описание теста из каталога по коду."""
+        test = get_catalog().get(test_code)
+        return test.data if test else None
+    
     def _format_test(self, test: Dict) -> Optional[Dict]:
         """Форматирует тест для отправки на фронтенд."""
         if not test:
@@ -355,56 +468,24 @@ class TestEngine:
             "outro_message": test.get("outro_message"),
         }
     
-    def _interpret_score(self, test: Dict, score: int) -> Dict:
-        """Интерпретирует результат теста."""
-        interpretation = test.get("interpretation", {})
-        ranges = interpretation.get("ranges", [])
-        
-        for r in ranges:
-            if r["min"] <= score <= r["max"]:
-                return {
-                    "level": r["level"],
-                    "message": r["message"],
-                    "score": score,
-                    "max_score": interpretation.get("max_score", 0),
-                }
-        
+    def _interpret_score(self, test: CatalogTest, band: Optional[ScoreRange], score: int) -> Dict:
+        """Интерпретирует результат теста по найденному диапазону."""
+        if band is None:
+            return {
+                "level": "unknown",
+                "message": "Результат обработан",
+                "score": score,
+            }
         return {
-            "level": "unknown",
-            "message": "Результат обработан",
+            "level": band.level,
+            "message": band.message,
             "score": score,
+            "max_score": test.max_score,
         }
     
-    def _get_bot_response(self, test: Dict, score: int, interpretation: Dict) -> str:
-        """Получает ответ бота на результат теста."""
-        bot_responses = test.get("bot_responses", {})
-        level = interpretation.get("level", "")
-        
-        if level in bot_responses:
-            return bot_responses[level]
-        
-        return interpretation.get("message", "Спасибо за ответ.")
-    
-    def _get_recommended_actions(self, test: Dict, interpretation: Dict) -> list:
-        """Определяет рекомендуемые действия."""
-        actions = []
-        level = interpretation.get("level", "")
-        
-        if level in ["high", "red", "problem_gambling", "vulnerable", "critical"]:
-            actions.append("offer_sos")
-            actions.append("show_helplines")
-        
-        if level in ["yellow", "medium", "elevated", "moderate_risk"]:
-            actions.append("soft_intervention")
-        
-        return list(set(actions))
-    
     async def _get_user_profile(self, user_id: int) -> Dict:
         """Получает профиль пользователя."""
-        async with self.db.execute(
-            "SELECT * FROM user_profiles WHERE user_id = ?",
-            (user_id,)
-        ) as cursor:
+        async with self.db.execute(USER_PROFILE_QUERY, (user_id,)) as cursor:
             row = await cursor.fetchone()
             if row:
                 columns = [d[0] for d in cursor.description]
@@ -440,10 +521,13 @@ class TestEngine:
         interpretation: Dict
     ):
         """Сохраняет результат теста."""
+        test = get_catalog().get(test_code)
+        if not test:
+            return
         await self.db.execute(
             """INSERT INTO test_results (user_id, test_id, total_score, answers_json, interpretation, bot_message)
-               SELECT ?, id, ?, ?, ?, ? FROM tests WHERE code = ?""",
-            (user_id, score, json.dumps(answers), interpretation.get("level"), interpretation.get("message"), test_code)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (user_id, test.id, score, json.dumps(answers), interpretation.get("level"), interpretation.get("message"))
         )
         await self.db.commit()
     
@@ -462,69 +546,3 @@ class TestEngine:
             return "medium"
         else:
             return "high"
-    
-    async def _was_shown_recently(self, user_id: int, test_code: str, hours: int = 24) -> bool:
-        """Проверяет показывался ли тест недавно."""
-        async with self.db.execute(
-            """SELECT COUNT(*) FROM test_results tr
-               JOIN tests t ON tr.test_id = t.id
-               WHERE tr.user_id = ? AND t.code = ?
-               AND tr.created_at >= datetime('now', ?)""",
-            (user_id, test_code, f'-{hours} hours')
-        ) as cursor:
-            count = (await cursor.fetchone())[0]
-            return count > 0
-    
-    async def _was_completed_today(self, user_id: int, test_code: str) -> bool:
-        """Проверяет пройден ли тест сегодня."""
-        async with self.db.execute(
-            """SELECT COUNT(*) FROM test_results tr
-               JOIN tests t ON tr.test_id = t.id
-               WHERE tr.user_id = ? AND t.code = ?
-               AND date(tr.created_at) = date('now')""",
-            (user_id, test_code)
-        ) as cursor:
-            count = (await cursor.fetchone())[0]
-            return count > 0
-    
-    async def _get_last_checkin_date(self, user_id: int) -> Optional[datetime]:
-        """Получает дату последнего чек-ина."""
-        async with self.db.execute(
-            "SELECT created_at FROM checkins WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
-            (user_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return datetime.fromisoformat(row[0].replace('Z', '+00:00').split('+')[0])
-        return None
-    
-    async def _get_least_recent_test(self, user_id: int, test_codes: List[str]) -> Optional[str]:
-        """Возвращает код теста, который давно не проходился."""
-        if not test_codes:
-            return None
-        
-        # Получаем даты последнего прохождения для каждого теста
-        placeholders = ','.join(['?' for _ in test_codes])
-        async with self.db.execute(
-            f"""SELECT t.code, MAX(tr.created_at) as last_taken
-                FROM tests t
-                LEFT JOIN test_results tr ON t.id = tr.test_id AND tr.user_id = ?
-                WHERE t.code IN ({placeholders})
-                GROUP BY t.code""",
-            [user_id] + test_codes
-        ) as cursor:
-            rows = await cursor.fetchall()
-        
-        # Находим тест с самой старой датой (или без даты)
-        test_dates = {code: None for code in test_codes}
-        for row in rows:
-            test_dates[row[0]] = row[1]
-        
-        # Сначала тесты без даты (никогда не проходились)
-        for code in test_codes:
-            if test_dates.get(code) is None:
-                return code
-        
-        # Иначе самый старый
-        sorted_tests = sorted(test_dates.items(), key=lambda x: x[1] or "")
-        return sorted_tests[0][0] if sorted_tests else test_codes[0]
@@ -0,0 +1,184 @@
+"""
+Сводная статистика пользователя (таблица user_stats).
+
+Суммы потерь, число записей дневника и частоты эмоций хранятся готовыми
+и обновляются в той же транзакции, что и запись в money_entries
+или thought_entries. Поэтому /money/stats и /diary/stats читают одну
+строку вместо агрегатов по всем записям.
+
+Если сводка разошлась с исходными таблицами (ручная правка БД, сбой),
+её можно пересобрать (из папки backend):
+    python -m app.services.user_stats
+"""
+
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional
+
+import aiosqlite
+
+# Сколько user_id подставляется в один запрос при пересборке
+REBUILD_CHUNK_SIZE = 500
+
+# Сколько эмоций отдаёт /diary/stats
+TOP_EMOTIONS = 5
+
+# Пересборка: {user_filter} — пусто (все пользователи) или "AND user_id IN (...)"
+REBUILD_MONEY_QUERY = """
+SELECT user_id, SUM(amount), COUNT(*) FROM money_entries
+WHERE entry_type = 'loss' {user_filter}
+GROUP BY user_id
+"""
+
+REBUILD_DIARY_QUERY = """
+SELECT user_id, emotions_json FROM thought_entries
+WHERE 1 = 1 {user_filter}
+ORDER BY user_id, id
+"""
+
+# Пользователи с записями, но без строки в user_stats
+BACKFILL_QUERY = """
+SELECT user_id FROM money_entries WHERE entry_type = 'loss'
+UNION
+SELECT user_id FROM thought_entries
+EXCEPT
+SELECT user_id FROM user_stats
+"""
+
+
+def parse_emotions(emotions_json: Optional[str]) -> List[str]:
+    """Эмоции записи дневника (битый JSON — пустой список)."""
+    if not emotions_json:
+        return []
+    try:
+        emotions = json.loads(emotions_json)
+    except ValueError:
+        return []
+    return [e for e in emotions if isinstance(e, str)] if isinstance(emotions, list) else []
+
+
+def top_emotions(counts_json: Optional[str], limit: int = TOP_EMOTIONS) -> List[Dict]:
+    """Самые частые эмоции из гистограммы user_stats."""
+    counts = json.loads(counts_json) if counts_json else {}
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"id": emotion, "count": count} for emotion, count in ranked]
+
+
+async def record_money_entry(db, user_id: int, amount: int, entry_type: str):
+    """Учитывает новую запись money_entries (без commit)."""
+    if entry_type != "loss":
+        return
+    await db.execute(
+        """INSERT INTO user_stats (user_id, loss_total, loss_count) VALUES (?, ?, 1)
+           ON CONFLICT(user_id) DO UPDATE SET
+               loss_total = loss_total + excluded.loss_total,
+               loss_count = loss_count + 1,
+               updated_at = CURRENT_TIMESTAMP""",
+        (user_id, amount)
+    )
+
+
+async def record_diary_entry(db, user_id: int, emotions: Iterable[str], delta: int = 1):
+    """Учитывает добавление (delta=1) или удаление (delta=-1) записи дневника (без commit)."""
+    cursor = await db.execute(
+        "SELECT emotion_counts_json FROM user_stats WHERE user_id = ?",
+        (user_id,)
+    )
+    row = await cursor.fetchone()
+    counts = json.loads(row[0]) if row and row[0] else {}
+
+    for emotion in emotions:
+        count = counts.get(emotion, 0) + delta
+        if count > 0:
+            counts[emotion] = count
+        else:
+            counts.pop(emotion, None)
+
+    await db.execute(
+        """INSERT INTO user_stats (user_id, diary_count, emotion_counts_json) VALUES (?, MAX(?, 0), ?)
+           ON CONFLICT(user_id) DO UPDATE SET
+               diary_count = MAX(diary_count + ?, 0),
+               emotion_counts_json = excluded.emotion_counts_json,
+               updated_at = CURRENT_TIMESTAMP""",
+        (user_id, delta, json.dumps(counts, ensure_ascii=False), delta)
+    )
+
+
+async def reset_user_stats(db, user_id: int):
+    """Обнуляет сводку (при сбросе прогресса, без commit)."""
+    await db.execute("DELETE FROM user_stats WHERE user_id = ?", (user_id,))
+
+
+async def _rebuild_chunk(db, user_ids: Optional[List[int]]) -> int:
+    if user_ids is None:
+        user_filter, params = "", []
+    else:
+        user_filter = f"AND user_id IN ({','.join('?' for _ in user_ids)})"
+        params = list(user_ids)
+
+    stats: Dict[int, Dict] = {}
+
+    def entry(user_id: int) -> Dict:
+        return stats.setdefault(user_id, {"loss_total": 0, "loss_count": 0, "diary_count": 0, "emotions": {}})
+
+    cursor = await db.execute(REBUILD_MONEY_QUERY.format(user_filter=user_filter), params)
+    for user_id, loss_total, loss_count in await cursor.fetchall():
+        entry(user_id).update(loss_total=loss_total, loss_count=loss_count)
+
+    cursor = await db.execute(REBUILD_DIARY_QUERY.format(user_filter=user_filter), params)
+    for user_id, emotions_json in await cursor.fetchall():
+        user = entry(user_id)
+        user["diary_count"] += 1
+        for emotion in parse_emotions(emotions_json):
+            user["emotions"][emotion] = user["emotions"].get(emotion, 0) + 1
+
+    if user_ids is None:
+        await db.execute("DELETE FROM user_stats")
+    else:
+        await db.execute(f"DELETE FROM user_stats WHERE 1 = 1 {user_filter}", params)
+
+    await db.executemany(
+        """INSERT INTO user_stats (user_id, loss_total, loss_count, diary_count, emotion_counts_json)
+           VALUES (?, ?, ?, ?, ?)""",
+        [
+            (user_id, s["loss_total"], s["loss_count"], s["diary_count"],
+             json.dumps(s["emotions"], ensure_ascii=False))
+            for user_id, s in stats.items()
+        ]
+    )
+    return len(stats)
+
+
+async def rebuild_user_stats(db, user_ids: Optional[List[int]] = None) -> int:
+    """Пересобирает сводку из money_entries и thought_entries (без commit).
+
+    user_ids=None — для всех пользователей. Возвращает число строк сводки.
+    """
+    if user_ids is None:
+        return await _rebuild_chunk(db, None)
+
+    rebuilt = 0
+    for start in range(0, len(user_ids), REBUILD_CHUNK_SIZE):
+        rebuilt += await _rebuild_chunk(db, user_ids[start:start + REBUILD_CHUNK_SIZE])
+    return rebuilt
+
+
+async def backfill_user_stats(db) -> int:
+    """Строит сводку для пользователей с записями, но без строки в user_stats."""
+    cursor = await db.execute(BACKFILL_QUERY)
+    user_ids = [row[0] for row in await cursor.fetchall()]
+    if not user_ids:
+        return 0
+    return await rebuild_user_stats(db, user_ids)
+
+
+if __name__ == "__main__":
+    from app.db.database import DATABASE_PATH
+
+    async def main():
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            rebuilt = await rebuild_user_stats(db)
+            await db.commit()
+        print(f"[OK] Rebuilt stats for {rebuilt} users")
+
+    asyncio.run(main())
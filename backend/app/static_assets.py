@@ -0,0 +1,199 @@
+"""
+Статика фронтенда (frontend/dist) из памяти.
+
+При старте все файлы dist читаются в манифест: путь → содержимое,
+сжатые варианты (brotli, gzip), ETag и Cache-Control. Запросы статики
+и SPA fallback не обращаются к диску.
+
+- assets/* (имена с хэшем от vite) — Cache-Control: immutable на год;
+- index.html и остальные файлы — no-cache с ETag (повторный запрос — 304).
+
+Сжатые варианты лучше собрать заранее, после npm run build
+(из папки backend):
+    python -m app.static_assets
+Готовые .br/.gz используются, только если совпадают с исходным файлом;
+иначе файл сжимается при старте.
+"""
+
+import gzip
+import mimetypes
+import os
+from typing import Dict, Optional
+
+import brotli
+from fastapi import Request, Response
+
+from app.utils.http import make_etag, etag_matches
+
+FRONTEND_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "dist")
+)
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Каталог с хэшированными файлами сборки vite
+HASHED_PREFIX = "assets/"
+
+# Что имеет смысл сжимать
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 1024
+
+BROTLI_QUALITY = 11
+GZIP_LEVEL = 9
+
+# Кодировка → (расширение готового файла, распаковка)
+ENCODINGS = {
+    "br": (".br", brotli.decompress),
+    "gzip": (".gz", gzip.decompress),
+}
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(media_type: str, body: bytes) -> bool:
+    return len(body) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _prebuilt(path: str, encoding: str, body: bytes) -> Optional[bytes]:
+    """Готовый сжатый файл, если он соответствует исходному."""
+    suffix, decompress = ENCODINGS[encoding]
+    if not os.path.exists(path + suffix):
+        return None
+    compressed = _read(path + suffix)
+    try:
+        return compressed if decompress(compressed) == body else None
+    except Exception:
+        return None
+
+
+class StaticAsset:
+    """Файл статики и его сжатые варианты."""
+
+    __slots__ = ("body", "media_type", "cache_control", "etag", "variants")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = make_etag(body)
+        # Кодировка → (тело, ETag); у каждого варианта свой строгий ETag
+        self.variants: Dict[str, tuple] = {}
+
+    def add_variant(self, encoding: str, body: bytes):
+        if len(body) < len(self.body):
+            self.variants[encoding] = (body, self.etag[:-1] + f'-{encoding}"')
+
+
+def _accepted_encodings(header: str) -> set:
+    """Кодировки из Accept-Encoding (кроме запрещённых через q=0)."""
+    accepted = set()
+    for part in header.lower().split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name)
+    return accepted
+
+
+class StaticAssets:
+    """Манифест статики: относительный путь → StaticAsset."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.files: Dict[str, StaticAsset] = {}
+        self.index: Optional[StaticAsset] = None
+
+    def load(self):
+        """Читает dist в память (вызывается при старте приложения)."""
+        files = {}
+        built, prebuilt = 0, 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith((".br", ".gz")):
+                    continue
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                body = _read(path)
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                cache_control = IMMUTABLE_CACHE if rel_path.startswith(HASHED_PREFIX) else REVALIDATE_CACHE
+
+                asset = StaticAsset(body, media_type, cache_control)
+                if _is_compressible(media_type, body):
+                    for encoding in ENCODINGS:
+                        compressed = _prebuilt(path, encoding, body)
+                        if compressed is None:
+                            compressed = _compress(encoding, body)
+                            built += 1
+                        else:
+                            prebuilt += 1
+                        asset.add_variant(encoding, compressed)
+                files[rel_path] = asset
+
+        self.files = files
+        self.index = files.get("index.html")
+        size = sum(len(asset.body) for asset in files.values()) // 1024
+        print(f"[OK] Static manifest: {len(files)} files, {size} KB "
+              f"({prebuilt} prebuilt and {built} startup-compressed variants)")
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self.files.get(path)
+
+    def response(self, request: Request, asset: StaticAsset) -> Response:
+        """Ответ с подходящим сжатием; 304, если у клиента та же версия."""
+        body, etag = asset.body, asset.etag
+        headers = {"Cache-Control": asset.cache_control}
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+            for encoding in ENCODINGS:
+                if encoding in accepted and encoding in asset.variants:
+                    body, etag = asset.variants[encoding]
+                    headers["Content-Encoding"] = encoding
+                    break
+        headers["ETag"] = etag
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=asset.media_type, headers=headers)
+
+
+def precompress(directory: str) -> int:
+    """Пишет .br и .gz рядом с файлами сборки. Возвращает число файлов."""
+    written = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith((".br", ".gz")):
+                continue
+            path = os.path.join(root, name)
+            body = _read(path)
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if not _is_compressible(media_type, body):
+                continue
+            for encoding, (suffix, _) in ENCODINGS.items():
+                with open(path + suffix, "wb") as f:
+                    f.write(_compress(encoding, body))
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    written = precompress(FRONTEND_DIR)
+    print(f"[OK] Precompressed {written} files in {FRONTEND_DIR}")
@@ -0,0 +1,193 @@
+"""
+Доставка напоминаний через фейковый Bot API.
+
+Клиент Telegram направляется на httpx.MockTransport (без сети). На
+временной БД у USERS пользователей наступило напоминание, нескольким
+чатам дополнительно поставлены сообщения в outbox. Напоминания проходят
+весь путь: планировщик → outbox → TelegramClient. Фейковый API отвечает
+429 с retry_after на каждый RATE_LIMIT_EVERY-й запрос, а BLOCKED_CHAT
+заблокировал бота (403).
+
+Проверяется:
+- после 429 общее ведро токенов стоит retry_after секунд, запрос
+  повторяется и доходит;
+- запросы в один чат идут не чаще TELEGRAM_CHAT_INTERVAL;
+- заблокированный чат — TelegramError, сообщение в dead, остальные
+  отправлены;
+- повторный прогон ничего не отправляет.
+
+Любое нарушение печатается, код выхода 1.
+
+Запуск (из папки backend):
+    python -m app.telegram_benchmark
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# До импорта настроек: временная БД и бот, включённый для фейкового API
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["BOT_TOKEN"] = "123456:fake"
+os.environ["TELEGRAM_API_URL"] = "http://fake-bot-api"
+
+import httpx
+
+from app.config import settings
+from app.db.database import DATABASE_PATH, init_db
+from app.db.pool import ConnectionPool
+from app.services.outbox import dispatch_due, enqueue_message
+from app.services.reminder_scheduler import TIMESTAMP_FORMAT, send_due_reminders
+from app.services.telegram import TelegramError, telegram
+
+USERS = 300
+FIRST_CHAT_ID = 100000
+BLOCKED_CHAT = FIRST_CHAT_ID + 7
+
+# Чаты с несколькими сообщениями подряд (проверка интервала на чат)
+SPACED_CHATS = 5
+MESSAGES_PER_SPACED_CHAT = 3
+
+RATE_LIMIT_EVERY = 100
+RETRY_AFTER = 1
+
+# Запрос мог получить токен до паузы и дойти сразу после 429
+PAUSE_GRACE_SECONDS = 0.05
+CLOCK_TOLERANCE_SECONDS = 0.005
+
+
+class FakeBotApi:
+    """Bot API в памяти: записывает запросы (время, чат, код ответа)."""
+
+    def __init__(self):
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        chat_id = httpx.Response(200, content=request.content).json().get("chat_id")
+        number = len(self.requests) + 1
+        if chat_id == BLOCKED_CHAT:
+            status, body = 403, {"ok": False, "error_code": 403,
+                                 "description": "Forbidden: bot was blocked by the user"}
+        elif number % RATE_LIMIT_EVERY == 0:
+            status, body = 429, {"ok": False, "error_code": 429,
+                                 "description": f"Too Many Requests: retry after {RETRY_AFTER}",
+                                 "parameters": {"retry_after": RETRY_AFTER}}
+        else:
+            status, body = 200, {"ok": True, "result": {"message_id": number, "chat": {"id": chat_id}}}
+        self.requests.append((time.monotonic(), chat_id, status))
+        return httpx.Response(status, json=body)
+
+
+async def _create_users(pool: ConnectionPool):
+    """USERS пользователей с наступившим напоминанием и лишние сообщения в SPACED_CHATS."""
+    due_at = (datetime.now(timezone.utc) - timedelta(minutes=1)).strftime(TIMESTAMP_FORMAT)
+
+    async def write(db):
+        await db.executemany(
+            """INSERT INTO users (anon_hash, recovery_code, telegram_id, reminder_hour, reminder_next_at)
+               VALUES (?, ?, ?, 20, ?)""",
+            [(f"bench-{n}", f"BENCH{n:06d}", FIRST_CHAT_ID + n, due_at) for n in range(USERS)]
+        )
+        for n in range(SPACED_CHATS):
+            for i in range(MESSAGES_PER_SPACED_CHAT - 1):
+                await enqueue_message(db, FIRST_CHAT_ID + n, f"extra {i}", dedup_key=f"bench:{n}:{i}")
+
+    await pool.run_write(write)
+
+
+async def deliver(pool: ConnectionPool) -> tuple:
+    """Один проход планировщика и outbox: (поставлено напоминаний, счётчики outbox)."""
+    queued = await send_due_reminders(pool)
+    return queued, await dispatch_due(pool)
+
+
+def check_rate_limits(requests: list) -> list:
+    failures = []
+    limited = [(at, chat_id) for at, chat_id, status in requests if status == 429]
+    if not limited:
+        failures.append("no 429 was injected")
+    for at, chat_id in limited:
+        during_pause = [t for t, _, _ in requests if at + PAUSE_GRACE_SECONDS < t < at + RETRY_AFTER]
+        if during_pause:
+            failures.append(f"{len(during_pause)} requests sent during the {RETRY_AFTER}s pause after 429")
+        if not any(t > at and c == chat_id and s == 200 for t, c, s in requests):
+            failures.append(f"chat {chat_id} was not retried after 429")
+    return failures
+
+
+def check_chat_spacing(requests: list) -> list:
+    failures = []
+    last_at = {}
+    for at, chat_id, _ in requests:
+        if chat_id in last_at and at - last_at[chat_id] < settings.TELEGRAM_CHAT_INTERVAL - CLOCK_TOLERANCE_SECONDS:
+            failures.append(f"chat {chat_id}: requests {at - last_at[chat_id]:.3f}s apart")
+        last_at[chat_id] = at
+    spaced = sum(1 for _, chat_id, _ in requests if FIRST_CHAT_ID <= chat_id < FIRST_CHAT_ID + SPACED_CHATS)
+    if spaced < SPACED_CHATS * MESSAGES_PER_SPACED_CHAT:
+        failures.append(f"only {spaced} requests to spaced chats")
+    return failures
+
+
+async def check_blocked_chat(pool: ConnectionPool, stats: dict) -> list:
+    failures = []
+    expected_sent = USERS + SPACED_CHATS * (MESSAGES_PER_SPACED_CHAT - 1) - 1
+    if stats["dead"] != 1 or stats["sent"] != expected_sent:
+        failures.append(f"expected {expected_sent} sent and 1 dead, got {stats}")
+
+    async with pool.reader() as db:
+        cursor = await db.execute("SELECT chat_id, last_error FROM outbox WHERE status = 'dead'")
+        dead = await cursor.fetchall()
+    if [row["chat_id"] for row in dead] != [BLOCKED_CHAT]:
+        failures.append(f"dead outbox rows: {[tuple(row) for row in dead]}")
+
+    try:
+        await telegram.send_message(BLOCKED_CHAT, "ping")
+        failures.append("blocked chat did not raise TelegramError")
+    except TelegramError as e:
+        if e.status_code != 403 or e.retryable:
+            failures.append(f"blocked chat: status {e.status_code}, retryable {e.retryable}")
+    return failures
+
+
+async def run_benchmark() -> list:
+    fake = FakeBotApi()
+    telegram.transport = httpx.MockTransport(fake.handle)
+
+    await init_db()
+    pool = ConnectionPool(DATABASE_PATH)
+    await pool.open()
+    await telegram.open()
+    try:
+        await _create_users(pool)
+
+        started = time.perf_counter()
+        queued, stats = await deliver(pool)
+        elapsed = time.perf_counter() - started
+        print(f"[OK] first run: {queued} reminders queued, {stats}, "
+              f"{len(fake.requests)} requests in {elapsed:.1f} s ({len(fake.requests) / elapsed:.1f}/s)")
+
+        failures = check_rate_limits(fake.requests)
+        failures += check_chat_spacing(fake.requests)
+        failures += await check_blocked_chat(pool, stats)
+
+        before = len(fake.requests)
+        queued, stats = await deliver(pool)
+        print(f"[OK] second run: {queued} reminders queued, {stats}")
+        if queued or any(stats.values()) or len(fake.requests) != before:
+            failures.append(f"second run sent {len(fake.requests) - before} requests")
+        return failures
+    finally:
+        await telegram.close()
+        await pool.close()
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(run_benchmark())
+    for failure in failures:
+        print(f"[WARN] {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("[OK] 429 pause and retry, per-chat spacing, blocked chat and repeat run checked")
@@ -1,9 +1,14 @@
 from app.utils.anon import create_anon_hash, generate_recovery_code, verify_anon_hash
 from app.utils.security import (
     validate_telegram_init_data,
+    InitDataError,
     create_jwt_token,
+    create_tokens,
     verify_jwt_token,
+    verify_refresh_token,
+    get_current_user,
     TelegramUser,
+    TOKEN_REFRESH,
 )
 
 __all__ = [
@@ -11,7 +16,12 @@ __all__ = [
     "generate_recovery_code", 
     "verify_anon_hash",
     "validate_telegram_init_data",
+    "InitDataError",
     "create_jwt_token",
+    "create_tokens",
     "verify_jwt_token",
+    "verify_refresh_token",
+    "get_current_user",
+    "TOKEN_REFRESH",
     "TelegramUser",
 ]
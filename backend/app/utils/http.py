@@ -0,0 +1,42 @@
+"""
+HTTP-кэширование готовых ответов: строгий ETag и условные запросы (304).
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(body: bytes) -> str:
+    """Строгий ETag по содержимому ответа."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадает ли If-None-Match с ETag (для GET допускается слабое сравнение)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str = "application/json",
+    cache_control: str = "no-cache",
+) -> Response:
+    """Готовое тело с ETag или 304, если у клиента та же версия."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,69 @@
+"""
+Замер скорости проверки initData Mini App.
+
+Подписывает тестовые initData так же, как Telegram, и считает проверки
+в секунду без кэша и с кэшем проверенных initData.
+
+Запуск (из папки backend):
+    BOT_TOKEN=123:abc python -m app.utils.init_data_benchmark
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+from app.config import settings
+from app.utils.security import (
+    _check_init_data,
+    _init_data_secret,
+    validate_telegram_init_data,
+    verified_init_data,
+)
+
+SAMPLES = 20000
+
+
+def sign_init_data(fields: dict) -> str:
+    """Подписывает initData ключом бота."""
+    data_check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    signature = hmac.new(_init_data_secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode({**fields, "hash": signature})
+
+
+def run_benchmark(count: int = SAMPLES) -> tuple:
+    """Возвращает (проверок в секунду без кэша, с кэшем)."""
+    auth_date = str(int(time.time()))
+    samples = [
+        sign_init_data({
+            "query_id": f"AAH{n}",
+            "user": json.dumps({"id": 100000 + n, "first_name": "Test", "language_code": "ru"}),
+            "auth_date": auth_date,
+        })
+        for n in range(count)
+    ]
+
+    started = time.perf_counter()
+    for sample in samples:
+        _check_init_data(sample, time.time())
+    uncached = count / (time.perf_counter() - started)
+
+    cached_samples = samples[:settings.INIT_DATA_CACHE_SIZE]
+    verified_init_data.clear()
+    for sample in cached_samples:
+        validate_telegram_init_data(sample)
+    started = time.perf_counter()
+    for sample in cached_samples:
+        validate_telegram_init_data(sample)
+    cached = len(cached_samples) / (time.perf_counter() - started)
+    verified_init_data.clear()
+
+    return uncached, cached
+
+
+if __name__ == "__main__":
+    if not settings.BOT_TOKEN:
+        raise SystemExit("BOT_TOKEN is required")
+    uncached, cached = run_benchmark()
+    print(f"[OK] init_data verification: {uncached:,.0f}/s, cached: {cached:,.0f}/s")
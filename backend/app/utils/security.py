@@ -1,15 +1,34 @@
 import hmac
 import hashlib
 import json
-from datetime import datetime, timedelta
-from urllib.parse import parse_qs
-from typing import Optional
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl
+from typing import Annotated, Optional, Tuple
 
 import jwt
-from pydantic import BaseModel
+from fastapi import Header, HTTPException, Response
+from pydantic import BaseModel, ValidationError
 
 from app.config import settings
 
+# Допустимое опережение auth_date (расхождение часов с Telegram)
+INIT_DATA_CLOCK_SKEW_SECONDS = 60
+
+# Ключ проверки подписи initData: HMAC("WebAppData", BOT_TOKEN).
+# Токен не меняется во время работы, поэтому считаем один раз.
+_init_data_secret = hmac.new(b"WebAppData", settings.BOT_TOKEN.encode(), hashlib.sha256).digest()
+
+# Ключ и параметры проверки JWT собираются один раз
+_jwt_key = settings.SECRET_KEY.encode()
+_jwt_algorithms = [settings.JWT_ALGORITHM]
+_jwt_options = {"require": ["exp", "user_id"]}
+
+# Типы JWT
+TOKEN_ACCESS = "access"
+TOKEN_REFRESH = "refresh"
+
 
 class TelegramUser(BaseModel):
     """Данные пользователя из Telegram WebApp."""
@@ -20,112 +39,233 @@ class TelegramUser(BaseModel):
     language_code: Optional[str] = None
 
 
-def validate_telegram_init_data(init_data: str) -> Optional[TelegramUser]:
-    """
-    Валидирует initData от Telegram WebApp.
-    
-    Проверяет подпись данных с использованием BOT_TOKEN.
-    Возвращает данные пользователя или None при невалидных данных.
+class InitDataError(ValueError):
+    """initData не прошли проверку (подпись, срок, формат)."""
+
+
+class ExpiringCache:
+    """Ограниченный LRU-кэш результатов проверки подписи с истечением по времени.
+
+    Mini App присылает одни и те же initData и JWT много раз подряд —
+    повторная проверка подписи не нужна. Запись живёт не дольше, чем
+    сами данные остаются действительными (срок проверяется при чтении).
     """
-    try:
-        # Парсим данные
-        parsed = parse_qs(init_data)
-        
-        # Извлекаем hash
-        received_hash = parsed.get("hash", [None])[0]
-        if not received_hash:
-            return None
-        
-        # Собираем строку для проверки (без hash, отсортировано)
-        data_check_pairs = []
-        for key, values in parsed.items():
-            if key != "hash":
-                data_check_pairs.append(f"{key}={values[0]}")
-        data_check_pairs.sort()
-        data_check_string = "\n".join(data_check_pairs)
-        
-        # Создаём secret_key из BOT_TOKEN
-        secret_key = hmac.new(
-            b"WebAppData",
-            settings.BOT_TOKEN.encode(),
-            hashlib.sha256
-        ).digest()
-        
-        # Вычисляем hash
-        computed_hash = hmac.new(
-            secret_key,
-            data_check_string.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
-        # Сравниваем
-        if not hmac.compare_digest(computed_hash, received_hash):
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
             return None
-        
-        # Извлекаем данные пользователя
-        user_data = parsed.get("user", [None])[0]
-        if not user_data:
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
             return None
-        
-        user_dict = json.loads(user_data)
-        return TelegramUser(**user_dict)
-        
-    except Exception as e:
-        print(f"Error validating init_data: {e}")
-        return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+verified_init_data = ExpiringCache(settings.INIT_DATA_CACHE_SIZE)
+
+# JWT access-токен → user_id до истечения exp
+verified_tokens = ExpiringCache(settings.JWT_CACHE_SIZE)
+
+
+def _check_init_data(init_data: str, now: float) -> Tuple[TelegramUser, float]:
+    """Проверяет подпись и срок initData. Возвращает пользователя и auth_date."""
+    try:
+        pairs = parse_qsl(init_data, keep_blank_values=True, strict_parsing=True)
+    except ValueError:
+        raise InitDataError("Malformed init_data")
+
+    fields = dict(pairs)
+    if len(fields) != len(pairs):
+        raise InitDataError("Duplicate init_data fields")
+
+    received_hash = fields.pop("hash", None)
+    if not received_hash:
+        raise InitDataError("Missing hash")
+
+    # Строка для проверки: пары key=value без hash, отсортированные по ключу
+    data_check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    computed_hash = hmac.new(_init_data_secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(computed_hash, received_hash):
+        raise InitDataError("Invalid signature")
+
+    try:
+        auth_date = int(fields["auth_date"])
+    except (KeyError, ValueError):
+        raise InitDataError("Missing auth_date")
+    if auth_date > now + INIT_DATA_CLOCK_SKEW_SECONDS:
+        raise InitDataError("auth_date is in the future")
+    if now - auth_date > settings.INIT_DATA_MAX_AGE_SECONDS:
+        raise InitDataError("init_data expired")
+
+    user_data = fields.get("user")
+    if not user_data:
+        raise InitDataError("Missing user")
+    try:
+        user = TelegramUser(**json.loads(user_data))
+    except (ValueError, TypeError, ValidationError):
+        raise InitDataError("Malformed user")
+    return user, auth_date
 
 
-def create_jwt_token(user_id: int) -> str:
-    """Создаёт JWT токен для пользователя."""
+def validate_telegram_init_data(init_data: str) -> TelegramUser:
+    """
+    Валидирует initData от Telegram WebApp.
+
+    Проверяет подпись (ключ из BOT_TOKEN) и свежесть auth_date
+    (не старше INIT_DATA_MAX_AGE_SECONDS), чтобы старые initData нельзя
+    было предъявить повторно. Проверенные initData кэшируются до истечения.
+    Возвращает данные пользователя, при невалидных данных — InitDataError.
+    """
+    if not settings.BOT_TOKEN:
+        raise InitDataError("BOT_TOKEN not set")
+
+    now = time.time()
+    user = verified_init_data.get(init_data, now)
+    if user is not None:
+        return user
+
+    user, auth_date = _check_init_data(init_data, now)
+    verified_init_data.put(init_data, user, auth_date + settings.INIT_DATA_MAX_AGE_SECONDS)
+    return user
+
+
+def create_jwt_token(user_id: int, token_type: str = TOKEN_ACCESS,
+                     lifetime: Optional[timedelta] = None,
+                     generation: Optional[int] = None) -> str:
+    """Создаёт JWT токен для пользователя (access или refresh)."""
+    now = datetime.now(timezone.utc)
     payload = {
         "user_id": user_id,
-        "exp": datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS),
-        "iat": datetime.utcnow(),
+        "type": token_type,
+        "exp": now + (lifetime or timedelta(hours=settings.JWT_EXPIRATION_HOURS)),
+        "iat": now,
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    if generation is not None:
+        payload["gen"] = generation
+    return jwt.encode(payload, _jwt_key, algorithm=settings.JWT_ALGORITHM)
+
+
+def create_tokens(user_id: int, generation: int = 0) -> Tuple[str, Optional[str]]:
+    """
+    Токены для входа: (access, refresh).
+
+    Если задан JWT_ACCESS_TOKEN_MINUTES, access живёт недолго и обновляется
+    через refresh-токен (POST /auth/refresh). Иначе выдаётся один долгий
+    токен, как раньше, и refresh равен None.
+
+    generation — users.token_generation: refresh-токен действует, пока
+    поколение пользователя не изменилось (см. verify_refresh_token).
+    """
+    if settings.JWT_ACCESS_TOKEN_MINUTES <= 0:
+        return create_jwt_token(user_id), None
+    access = create_jwt_token(user_id, lifetime=timedelta(minutes=settings.JWT_ACCESS_TOKEN_MINUTES))
+    refresh = create_jwt_token(user_id, TOKEN_REFRESH, timedelta(days=settings.JWT_REFRESH_TOKEN_DAYS),
+                               generation=generation)
+    return access, refresh
 
 
-def verify_jwt_token(token: str) -> Optional[int]:
+def _decode_jwt_payload(token: str, token_type: str) -> dict:
+    """Проверяет подпись, срок и тип токена. Ошибки — jwt.InvalidTokenError."""
+    payload = jwt.decode(token, _jwt_key, algorithms=_jwt_algorithms, options=_jwt_options)
+    # Токены, выданные до появления refresh, не содержат type — это access
+    if payload.get("type", TOKEN_ACCESS) != token_type:
+        raise jwt.InvalidTokenError("Wrong token type")
+    user_id = payload.get("user_id")
+    if not isinstance(user_id, int) or user_id <= 0:
+        raise jwt.InvalidTokenError("Invalid token payload")
+    return payload
+
+
+def _decode_jwt_token(token: str, token_type: str) -> int:
+    """Как _decode_jwt_payload, но возвращает user_id (access — с кэшированием)."""
+    payload = _decode_jwt_payload(token, token_type)
+    user_id = payload["user_id"]
+    if token_type == TOKEN_ACCESS:
+        verified_tokens.put(token, user_id, payload["exp"])
+    return user_id
+
+
+def verify_jwt_token(token: str, token_type: str = TOKEN_ACCESS) -> Optional[int]:
     """
     Проверяет JWT токен.
     Возвращает user_id или None при невалидном токене.
     """
+    if token_type == TOKEN_ACCESS:
+        user_id = verified_tokens.get(token, time.time())
+        if user_id is not None:
+            return user_id
     try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload.get("user_id")
-    except jwt.ExpiredSignatureError:
-        return None
+        return _decode_jwt_token(token, token_type)
     except jwt.InvalidTokenError:
         return None
 
 
-# FastAPI Dependency для получения текущего пользователя
-from fastapi import HTTPException, Header
-from typing import Annotated
+def verify_refresh_token(token: str) -> Optional[Tuple[int, int]]:
+    """
+    Проверяет refresh-токен.
+    Возвращает (user_id, поколение токенов) или None при невалидном токене.
+
+    Поколение нужно сверить с users.token_generation: сброс прогресса
+    и восстановление аккаунта увеличивают его, и выданные раньше
+    refresh-токены перестают действовать.
+    """
+    try:
+        payload = _decode_jwt_payload(token, TOKEN_REFRESH)
+    except jwt.InvalidTokenError:
+        return None
+    # Токены, выданные до появления поколений, относятся к нулевому
+    generation = payload.get("gen", 0)
+    if not isinstance(generation, int):
+        return None
+    return payload["user_id"], generation
 
 
 async def get_current_user(
+        response: Response,
         authorization: Annotated[str | None, Header()] = None
 ) -> int:
     """
     FastAPI Dependency для извлечения user_id из JWT токена.
     Ожидает заголовок: Authorization: Bearer <token>
+
+    Повторные запросы с тем же токеном обходятся без проверки подписи
+    (кэш verified_tokens, срок проверяется при каждом обращении).
+    Время проверки отдаётся в заголовке Server-Timing.
     """
+    started = time.perf_counter()
     if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header required")
-
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
+        raise HTTPException(status_code=401, detail="Authorization header missing")
 
-    token = parts[1]
-    user_id = verify_jwt_token(token)
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Invalid auth scheme")
 
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    source = "cache"
+    user_id = verified_tokens.get(token, time.time())
+    if user_id is None:
+        source = "jwt"
+        try:
+            user_id = _decode_jwt_token(token, TOKEN_ACCESS)
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expired")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
 
-    return user_id
\ No newline at end of file
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    response.headers["Server-Timing"] = f'auth;desc="{source}";dur={elapsed_ms:.3f}'
+    return user_id
@@ -0,0 +1,148 @@
+"""
+Нагрузочная проверка записи: много пользователей одновременно.
+
+Поднимает приложение на временной БД (WAL, единственный писатель),
+создаёт USERS пользователей и запускает их параллельно: каждый
+ROUNDS раз делает чек-ин, запись в дневник, запись о деньгах,
+проходит тест C1 и открывает главный экран (/bootstrap, /checkins/today).
+Параллельно работает аудит серий — он тоже пишет через очередь писателя.
+
+В конце сверяет число строк с числом успешных запросов. Любой ответ
+не 2xx (в том числе «database is locked») — ошибка, код выхода 1.
+
+Запуск (из папки backend):
+    python -m app.write_stress
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# До импорта настроек: временная БД, без Telegram
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'stress.db')}"
+os.environ["BOT_TOKEN"] = ""
+
+import httpx
+
+from app.db.database import pool
+from app.db.test_catalog import get_catalog
+from app.main import app
+from app.services.streaks import audit_streaks
+from app.utils.security import create_tokens
+
+USERS = 200
+ROUNDS = 5
+
+# Тест, который проходят все пользователи (без онбординга)
+SUBMIT_TEST = "C1"
+
+
+async def _create_users(count: int) -> list:
+    """Пользователи напрямую в БД (как после /auth/verify). Возвращает заголовки."""
+
+    async def insert(db):
+        user_ids = []
+        for n in range(count):
+            cursor = await db.execute(
+                "INSERT INTO users (anon_hash, recovery_code) VALUES (?, ?)",
+                (f"stress-{n}", f"STRESS{n:06d}")
+            )
+            user_ids.append(cursor.lastrowid)
+        for table in ("streaks", "user_profiles", "money_settings"):
+            await db.executemany(f"INSERT INTO {table} (user_id) VALUES (?)", [(u,) for u in user_ids])
+        return user_ids
+
+    user_ids = await pool.run_write(insert)
+    return [{"Authorization": f"Bearer {create_tokens(user_id)[0]}"} for user_id in user_ids]
+
+
+def _submission() -> dict:
+    test = get_catalog().get(SUBMIT_TEST).data
+    return {
+        "test_code": SUBMIT_TEST,
+        "answers": [{"question_code": q["code"], "value": 1} for q in test["questions"]],
+    }
+
+
+async def run_stress(users: int = USERS, rounds: int = ROUNDS) -> dict:
+    stats = {"ok": 0, "errors": [], "read_ms": [], "write_ms": []}
+    submission = _submission()
+
+    async def call(client: httpx.AsyncClient, method: str, path: str, headers: dict, body=None):
+        started = time.perf_counter()
+        response = await client.request(method, path, headers=headers, json=body)
+        elapsed = (time.perf_counter() - started) * 1000
+        stats["read_ms" if method == "GET" else "write_ms"].append(elapsed)
+        if response.is_success:
+            stats["ok"] += 1
+        else:
+            stats["errors"].append(f"{method} {path}: {response.status_code} {response.text[:100]}")
+
+    async def simulate_user(client: httpx.AsyncClient, headers: dict, n: int):
+        for round_no in range(rounds):
+            await call(client, "POST", "/checkins", headers, {
+                "urge": n % 11, "stress": 4, "mood": 6, "relapse": round_no == 2 and n % 3 == 0,
+                "lossAmount": 500 if n % 3 == 0 else None,
+            })
+            await call(client, "GET", "/bootstrap", headers)
+            await call(client, "POST", "/diary", headers, {
+                "situation": f"Ситуация {round_no}", "thought": "Мысль", "emotions": ["тревога", "стыд"],
+                "emotionIntensity": 5, "reaction": "Реакция",
+            })
+            await call(client, "POST", "/money/entries", headers, {"amount": 100, "type": "saved"})
+            await call(client, "POST", "/tests/submit", headers, submission)
+            await call(client, "GET", "/checkins/today", headers)
+
+    async def audit_loop(stop: asyncio.Event):
+        while not stop.is_set():
+            await audit_streaks(pool)
+            await asyncio.sleep(0.2)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stress", timeout=60) as client:
+            all_headers = await _create_users(users)
+
+            stop = asyncio.Event()
+            audit_task = asyncio.create_task(audit_loop(stop))
+            started = time.perf_counter()
+            await asyncio.gather(*(simulate_user(client, h, n) for n, h in enumerate(all_headers)))
+            stats["elapsed_s"] = time.perf_counter() - started
+            stop.set()
+            await audit_task
+
+        async with pool.reader() as db:
+            for table in ("checkins", "thought_entries", "money_entries", "test_results"):
+                cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+                stats[table] = (await cursor.fetchone())[0]
+    return stats
+
+
+def _percentiles(values: list) -> str:
+    quantiles = statistics.quantiles(values, n=100)
+    return f"p50 {quantiles[49]:.1f} ms, p99 {quantiles[98]:.1f} ms"
+
+
+if __name__ == "__main__":
+    stats = asyncio.run(run_stress())
+    expected = USERS * ROUNDS
+    print(f"[OK] {USERS} users x {ROUNDS} rounds: {stats['ok']} requests in {stats['elapsed_s']:.1f} s "
+          f"({stats['ok'] / stats['elapsed_s']:.0f} req/s)")
+    print(f"[OK] writes: {_percentiles(stats['write_ms'])}; reads: {_percentiles(stats['read_ms'])}")
+
+    failed = bool(stats["errors"])
+    for error in stats["errors"][:10]:
+        print(f"[WARN] {error}")
+    # Деньги: запись "saved" на каждый раунд и потеря при каждом срыве с суммой
+    relapses = len([n for n in range(USERS) if n % 3 == 0])
+    for table, count in (("checkins", expected), ("thought_entries", expected),
+                         ("money_entries", expected + relapses), ("test_results", expected)):
+        if stats[table] != count:
+            failed = True
+            print(f"[WARN] {table}: {stats[table]} rows, expected {count}")
+    if failed:
+        raise SystemExit(1)
+    print("[OK] No errors, row counts match")
@@ -5,24 +5,60 @@
 
 const API_URL = ''  // Пустая строка — используем proxy в dev, относительные пути в prod
 
-// Получаем токен из store
-const getToken = () => {
+// Получаем состояние авторизации из store
+const getAuthState = () => {
   try {
     const stored = localStorage.getItem('tochka-opory-storage')
     if (stored) {
-      const data = JSON.parse(stored)
-      return data.state?.token
+      return JSON.parse(stored).state || {}
     }
   } catch (e) {
     console.error('Failed to get token:', e)
   }
-  return null
+  return {}
+}
+
+const getToken = () => getAuthState().token || null
+
+// Один refresh на все запросы, получившие 401 одновременно
+let refreshPromise = null
+
+/**
+ * Обновляет короткий access-токен по refresh-токену.
+ * Возвращает true, если токен обновлён.
+ */
+async function refreshAccessToken() {
+  const refreshToken = getAuthState().refreshToken
+  if (!refreshToken) return false
+
+  if (!refreshPromise) {
+    refreshPromise = (async () => {
+      try {
+        const response = await fetch(`${API_URL}/auth/refresh`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: refreshToken }),
+        })
+        if (!response.ok) return false
+        const result = await response.json()
+        const { useStore } = await import('../store/useStore')
+        useStore.setState({ token: result.token, refreshToken: result.refresh_token || null })
+        return true
+      } catch (e) {
+        console.error('Token refresh failed:', e)
+        return false
+      } finally {
+        refreshPromise = null
+      }
+    })()
+  }
+  return refreshPromise
 }
 
 /**
  * Базовый запрос к API.
  */
-async function request(endpoint, options = {}) {
+async function request(endpoint, options = {}, retried = false) {
   const token = getToken()
   
   const config = {
@@ -40,6 +76,11 @@ async function request(endpoint, options = {}) {
   }
   
   const response = await fetch(`${API_URL}${endpoint}`, config)
+
+  // Access-токен истёк — обновляем и повторяем запрос один раз
+  if (response.status === 401 && !retried && token && await refreshAccessToken()) {
+    return request(endpoint, options, true)
+  }
   
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: 'Unknown error' }))
@@ -81,6 +122,21 @@ export async function getMe() {
   return request('/auth/me')
 }
 
+/**
+ * Данные главного экрана одним запросом:
+ * me, today, moneySettings, money, diary, testProfile, nextTest.
+ */
+export async function getBootstrap() {
+  return request('/bootstrap')
+}
+
+export async function updateTimezone(timezone) {
+  return request('/auth/timezone', {
+    method: 'PUT',
+    body: { timezone },
+  })
+}
+
 // =============================================
 // CHECKINS API
 // =============================================
@@ -92,6 +148,17 @@ export async function createCheckin(data) {
   })
 }
 
+/**
+ * Пакетная синхронизация офлайн-чек-инов.
+ * items: [{ clientId, createdAt, urge, stress, mood, relapse, note, lossAmount }]
+ */
+export async function syncCheckins(items) {
+  return request('/checkins/batch', {
+    method: 'POST',
+    body: { items },
+  })
+}
+
 export async function getCheckins(limit = 30) {
   return request(`/checkins?limit=${limit}`)
 }
@@ -164,8 +231,12 @@ export async function getTestHistory(limit = 30) {
 // ARTICLES API
 // =============================================
 
-export async function getArticles() {
-  return request('/articles')
+/**
+ * Страница списка статей: { items, nextCursor }.
+ * Карточки без полного текста — он приходит из getArticle(id).
+ */
+export async function getArticles(cursor = null) {
+  return request(cursor ? `/articles?cursor=${encodeURIComponent(cursor)}` : '/articles')
 }
 
 export async function getArticle(id) {
@@ -176,6 +247,29 @@ export async function getRandomArticle() {
   return request('/articles/random')
 }
 
+/**
+ * Карточка дня: одна статья на весь день, прочитанные раньше пропускаются.
+ */
+export async function getDailyArticle() {
+  return request('/articles/daily')
+}
+
+export async function markArticleRead(id) {
+  return request(`/articles/${id}/read`, { method: 'POST' })
+}
+
+// =============================================
+// SEARCH API
+// =============================================
+
+/**
+ * Поиск по статьям и своему дневнику: { articles, diary }.
+ * Совпадения в snippet выделены **...**.
+ */
+export async function search(query, scope = 'all') {
+  return request(`/search?q=${encodeURIComponent(query)}&scope=${scope}`)
+}
+
 // =============================================
 // SOS API
 // =============================================
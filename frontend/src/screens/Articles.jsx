@@ -10,14 +10,17 @@ import * as api from '../api/client'
 
 export function Articles() {
   const [articles, setArticles] = useState(ARTICLES)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [selectedArticle, setSelectedArticle] = useState(null)
 
   // Пробуем загрузить статьи с сервера
   useEffect(() => {
     api.getArticles()
       .then(data => {
-        if (data && data.length > 0) {
-          setArticles(data)
+        if (data && data.items.length > 0) {
+          setArticles(data.items)
+          setNextCursor(data.nextCursor)
         }
       })
       .catch(() => {
@@ -25,6 +28,30 @@ export function Articles() {
       })
   }, [])
 
+  const loadMore = () => {
+    setLoadingMore(true)
+    api.getArticles(nextCursor)
+      .then(data => {
+        setArticles(prev => [...prev, ...data.items])
+        setNextCursor(data.nextCursor)
+      })
+      .catch(() => {})
+      .finally(() => setLoadingMore(false))
+  }
+
+  // В списке с сервера только отрывок — полный текст загружаем при открытии
+  const openArticle = (article) => {
+    setSelectedArticle(article)
+    // Отметка для карточки дня; у локальных статей id строковые
+    if (typeof article.id === 'number') {
+      api.markArticleRead(article.id).catch(() => {})
+    }
+    if (article.content) return
+    api.getArticle(article.id)
+      .then(full => setSelectedArticle(current => (current && current.id === full.id ? full : current)))
+      .catch(() => {})
+  }
+
   // Отображение статьи
   if (selectedArticle) {
     return (
@@ -51,7 +78,7 @@ export function Articles() {
             {selectedArticle.title}
           </h1>
           <div className="prose prose-slate max-w-none">
-            {selectedArticle.content.split('\n\n').map((paragraph, idx) => (
+            {(selectedArticle.content || selectedArticle.excerpt).split('\n\n').map((paragraph, idx) => (
               <p key={idx} className="text-slate-600 leading-relaxed mb-4">
                 {paragraph.split('**').map((part, i) => 
                   i % 2 === 1 
@@ -84,7 +111,7 @@ export function Articles() {
         {articles.map((article, index) => (
           <button
             key={article.id}
-            onClick={() => setSelectedArticle(article)}
+            onClick={() => openArticle(article)}
             className="w-full text-left bg-white rounded-2xl p-5 shadow-sm border border-slate-100 active:scale-98 transition-transform animate-slide-up"
             style={{ animationDelay: `${index * 50}ms` }}
           >
@@ -96,13 +123,23 @@ export function Articles() {
             </div>
             <h3 className="font-bold text-slate-800 text-lg mb-2">{article.title}</h3>
             <p className="text-slate-500 text-sm line-clamp-2 mb-3">
-              {article.content.substring(0, 100)}...
+              {article.excerpt || `${article.content.substring(0, 100)}...`}
             </p>
             <div className="flex items-center text-brand-600 text-sm font-medium">
               Читать <ArrowRight size={16} className="ml-1" />
             </div>
           </button>
         ))}
+
+        {nextCursor && (
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="w-full py-3 text-brand-600 font-medium disabled:opacity-50"
+          >
+            {loadingMore ? 'Загрузка...' : 'Показать ещё'}
+          </button>
+        )}
       </div>
 
       {/* Empty State */}
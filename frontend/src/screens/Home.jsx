@@ -36,8 +36,8 @@ export function Home() {
   const [randomArticle, setRandomArticle] = useState(null)
 
   useEffect(() => {
-    // Пробуем загрузить случайную статью с сервера
-    api.getRandomArticle()
+    // Карточка дня с сервера (одна и та же до конца дня)
+    api.getDailyArticle()
       .then(article => setRandomArticle(article))
       .catch(() => {
         // Если не получилось, берём из констант
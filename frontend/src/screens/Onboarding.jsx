@@ -89,8 +89,8 @@ export function Onboarding() {
       console.error('Failed to submit test:', error)
     }
 
-    // Считаем score для локального отображения
-    const score = Object.values(answers).reduce((acc, val) =>
+    // Балл считает сервер (веса, обратные шкалы); локальная сумма — только если он недоступен
+    const score = submitResult?.interpretation?.score ?? Object.values(answers).reduce((acc, val) =>
       acc + (typeof val === 'number' ? val : 0), 0
     )
 
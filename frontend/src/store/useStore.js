@@ -7,6 +7,9 @@ import { create } from 'zustand'
 import { persist, createJSONStorage } from 'zustand/middleware'
 import * as api from '../api/client'
 
+// Сколько чек-инов принимает POST /checkins/batch за раз
+const CHECKIN_BATCH_SIZE = 100
+
 export const useStore = create(
   persist(
     (set, get) => ({
@@ -14,6 +17,7 @@ export const useStore = create(
       // AUTH STATE
       // =============================================
       token: null,
+      refreshToken: null,
       userId: null,
       recoveryCode: null,
       isLoading: false,
@@ -29,6 +33,7 @@ export const useStore = create(
       // DATA
       // =============================================
       checkins: [],
+      pendingCheckins: [],  // чек-ины, не отправленные из-за сети
       streak: { current: 0, best: 0, lastCheckinDate: null },
       moneySettings: {
         enabled: false,
@@ -64,6 +69,7 @@ export const useStore = create(
           
           set({
             token: result.token,
+            refreshToken: result.refresh_token || null,
             userId: result.user_id,
             recoveryCode: result.recovery_code || null,
             isAuthenticated: true,
@@ -91,6 +97,7 @@ export const useStore = create(
           
           set({
             token: result.token,
+            refreshToken: result.refresh_token || null,
             userId: result.user_id,
             isAuthenticated: true,
             isLoading: false,
@@ -111,11 +118,13 @@ export const useStore = create(
        */
       loadUserData: async () => {
         try {
-          // Загружаем профиль
-          const me = await api.getMe()
+          // Профиль, настройки и сводка главного экрана — одним запросом
+          const bootstrap = await api.getBootstrap()
+          const me = bootstrap.me
           
           set({
             profile: me,
+            moneySettings: bootstrap.moneySettings,
             recoveryCode: me.recoveryCode,
             streak: me.streak || { current: 0, best: 0, lastCheckinDate: null },
             isOnboarding: !me.onboardingCompleted,
@@ -125,14 +134,15 @@ export const useStore = create(
             },
           })
           
-          // Загружаем настройки финансов
-          try {
-            const moneySettings = await api.getMoneySettings()
-            set({ moneySettings })
-          } catch (e) {
-            console.log('Money settings not available')
+          // Часовой пояс устройства — для границ дня в сериях
+          const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone
+          if (timezone && me.timezone !== timezone) {
+            api.updateTimezone(timezone).catch(() => {})
           }
           
+          // Досылаем офлайн-чек-ины одним запросом
+          await get().flushPendingCheckins()
+
           // Загружаем чек-ины
           try {
             const checkins = await api.getCheckins(7)
@@ -153,12 +163,14 @@ export const useStore = create(
         localStorage.removeItem('tochka-opory-storage')
         set({
           token: null,
+          refreshToken: null,
           userId: null,
           recoveryCode: null,
           isAuthenticated: false,
           profile: null,
           isOnboarding: true,
           checkins: [],
+          pendingCheckins: [],
           streak: { current: 0, best: 0, lastCheckinDate: null },
           moneySettings: {
             enabled: false,
@@ -227,9 +239,51 @@ export const useStore = create(
           return result
         } catch (error) {
           console.error('Failed to create checkin:', error)
+          // Сеть недоступна (fetch бросает TypeError) — ставим в очередь
+          if (error instanceof TypeError) {
+            set((state) => ({
+              pendingCheckins: [
+                ...state.pendingCheckins,
+                {
+                  ...data,
+                  clientId: crypto.randomUUID(),
+                  createdAt: new Date().toISOString(),
+                },
+              ],
+            }))
+          }
           throw error
         }
       },
+
+      /**
+       * Отправка очереди офлайн-чек-инов пачками по CHECKIN_BATCH_SIZE.
+       * Отправленные убираются из очереди после каждой пачки,
+       * поэтому при обрыве сети следующая попытка продолжит с остатка.
+       */
+      flushPendingCheckins: async () => {
+        if (!get().pendingCheckins.length) return null
+
+        let result = null
+        try {
+          while (get().pendingCheckins.length) {
+            const batch = get().pendingCheckins.slice(0, CHECKIN_BATCH_SIZE)
+            result = await api.syncCheckins(batch)
+            const synced = new Set(result.results.map((r) => r.clientId))
+            // Пачка не ушла целиком — не зацикливаемся, остаток до следующего раза
+            const drained = batch.every((c) => synced.has(c.clientId))
+            set((state) => ({
+              pendingCheckins: state.pendingCheckins.filter((c) => !synced.has(c.clientId)),
+              streak: result.streak,
+            }))
+            if (!drained) break
+          }
+          return result
+        } catch (error) {
+          console.error('Failed to sync pending checkins:', error)
+          return null
+        }
+      },
       
       // =============================================
       // MONEY ACTIONS
@@ -360,12 +414,14 @@ export const useStore = create(
       storage: createJSONStorage(() => localStorage),
       partialize: (state) => ({
         token: state.token,
+        refreshToken: state.refreshToken,
         userId: state.userId,
         recoveryCode: state.recoveryCode,
         isAuthenticated: state.isAuthenticated,
         profile: state.profile,
         isOnboarding: state.isOnboarding,
         streak: state.streak,
+        pendingCheckins: state.pendingCheckins,
         moneySettings: state.moneySettings,
         reminderSettings: state.reminderSettings,
       }),
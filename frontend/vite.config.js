@@ -13,6 +13,8 @@ export default defineConfig({
       '/tests': 'http://localhost:8000',
       '/diary': 'http://localhost:8000',
       '/money': 'http://localhost:8000',
+      '/bootstrap': 'http://localhost:8000',
+      '/search': 'http://localhost:8000',
     }
   },
   build: {